@@ -1,72 +1,137 @@
 # ========================== bridge_workers.py ==========================
 # - DetectionWorker: 오디오 감지/추론(QThread 워커)
+#   · 겹치는 윈도우(hop_sec < seg_sec) + PosteriorTracker로 확정된 이벤트만 emit
 # - CameraWorker   : 카메라 프레임 캡처(QThread 워커, 15fps로 emit)
+#   · 해상도/emit fps는 set_profile()로 런타임 변경(governor)
+#   · preroll(video_ring.PrerollCamera)이 같은 장치를 이미 스트리밍 중이면 장치를 새로 열지 않고
+#     링에서 이벤트 pre_sec초 전부터 재생(catchup 배속으로 실시간 따라잡기, 보여줄 프레임만 디코드)
 # - SingleShotSTTWorker: MIC 클릭 시 1회만 STT 수행(QThread 워커)
+# - 단계별 지연/카운터는 metrics.METRICS로 기록(audio_callback/segment/resample/gammatone/inference/doa,
+#   camera_open/camera_first_frame)
+# - flight recorder(옵션): 원본 오디오/특징/확률/DOA를 링에 계속 보관, 이벤트 확정 시 스냅샷
+# - 모델: .npz(BN 접힘, numpy_cnn.NumpyCNN)면 TensorFlow 없이 추론, 그 외 경로는 Keras SavedModel
+#   · screener_path가 있으면 cascade.CascadeModel(소형 스크리너 → 임계 통과 시에만 본 모델)
+# - registry(옵션): 감지 마이크가 분리되면 스트림을 닫고 다시 꽂힐 때까지 대기 → 앱 재시작 없이 재부착
+# - DOA: 윈도우마다 읽어 doa_tracker.BearingTracker로 융합(대상 클래스 확률 가중) → 감지 시 추적 방위·신뢰도·각속도 emit
+# - 전처리(int32 스케일 → 147/160 리샘플 → 감마톤 64x60)는 features.FeatureExtractor(feature_store.py와 공유)
+#   · 오디오 링/세그먼트/스케일/모델 입력 텐서 모두 float32 사전 할당 → 세그먼트마다 새 배열을 만들지 않음
+#   · EARS_ALLOC_AUDIT=1: 세그먼트별 tracemalloc peak/net + GC 정지 시간(alloc_audit.AllocAudit)
+# - 트레이스(EARS_TRACE=1): 세그먼트마다 cid를 붙여 같은 구간을 tracing.TRACER에도 기록
 
 from PySide6.QtCore import QObject, Signal, Slot
 import numpy as np
-import cv2, time
-from collections import deque
-from scipy.signal import resample_poly
+import cv2, os, time
 import sounddevice as sd
-from gammatone.gtgram import gtgram
+from features import FeatureExtractor
+from doa_tracker import BearingTracker, LN_TO_DB
+from posterior_tracker import PosteriorTracker
+from metrics import METRICS, process_age, rss_mb
+from tracing import TRACER
+from video_ring import decode, save_clip_async
+from alloc_audit import AllocAudit, ENABLED as ALLOC_AUDIT
 
 class DetectionWorker(QObject):
-    sig_detection = Signal(str, float, int)  # class, prob, angle
+    # class, confidence, angle(추적 방위), onset_ts, det_ts, cid, doa_conf, doa_rate(도/s), level_rate(dB/s)
+    sig_detection = Signal(str, float, int, float, float, int, float, float, float)
     sig_status = Signal(str)
     sig_error = Signal(str)
+    sig_ready = Signal()       # 모델 로드 + 첫 오디오 스트림 오픈 완료(1회)
 
     def __init__(self, model_path, mic_rate, model_rate, seg_sec,
-                 win_t, hop_t, nfilt, fmin, device_name, mic_tuning_provider, class_names):
+                 win_t, hop_t, nfilt, fmin, device_name, mic_tuning_provider, class_names,
+                 hop_sec=None, tracker=None, recorder=None, screener_path=None, screen_thr=0.15,
+                 registry=None, ring_sec=10.0):
         super().__init__()
         self.model_path = model_path
         self.mic_rate = mic_rate
         self.model_rate = model_rate
         self.seg_samples = int(mic_rate * seg_sec)
+        # 윈도우 이동 간격(기본: 겹침 없음). seg_sec보다 작으면 세그먼트가 겹쳐서 추론됨
+        self.hop_samples = min(self.seg_samples, int(mic_rate * (hop_sec or seg_sec)))
         self.win_t, self.hop_t, self.nfilt, self.fmin = win_t, hop_t, nfilt, fmin
         self.device_name = device_name
+        self.registry = registry          # device_registry.DeviceRegistry (옵션): 분리/재연결 시 스트림 재부착
+        self._reattach = False
+        self._ready = False
         self.class_names = class_names
-
-        # --- 변경: 샘플 단위 대신 '청크(np.ndarray)' 단위 버퍼
-        self.chunks = deque(maxlen=64)    # 최근 오디오 블록들
-        self.total_samples = 0            # chunks에 누적된 전체 샘플 수
+        self.tracker = tracker if tracker is not None else PosteriorTracker(class_names)
+        # 윈도우마다 DOA를 읽어 대상 클래스 확률로 가중 융합 → 확정 시 추적 방위를 emit
+        self.doa = BearingTracker()
+        self._doa_t = 0.0                 # 마지막 DOA 측정 반영 시각(time.time)
+        self._doa_idx = [list(class_names).index(c) for c in self.tracker.targets]
+        self.recorder = recorder
+
+        # 오디오 링(float32, 사전 할당): 콜백이 L 채널을 바로 기록, 추론 루프는 읽기 위치만 hop씩 이동
+        self._ring = np.zeros(max(int(mic_rate * ring_sec), 4 * self.seg_samples), dtype=np.float32)
+        self._w = 0                       # 누적 기록 샘플 수(콜백 스레드만 증가)
+        self._r = 0                       # 다음 세그먼트 시작 위치(추론 스레드만 변경)
+        self._reset_pending = False       # reset_buffer 요청 → 추론 스레드가 세그먼트 사이에서 처리
+        self._seg = np.empty(self.seg_samples, dtype=np.float32)   # 링 끝에 걸친 세그먼트만 여기로 복사
+        self.stream_t0 = None             # 읽기 위치 샘플의 시각(onset 계산용)
+        self.audit = None                 # alloc_audit.AllocAudit (EARS_ALLOC_AUDIT=1)
+        self.heartbeat = 0.0              # 마지막 세그먼트 처리(또는 스트림 시작) 시각(monotonic) → 데몬 watchdog
 
         self.audio_enabled = True
         self._running = False
-        self._target_frames = int(seg_sec / hop_t)
         self.mic_tuning_provider = mic_tuning_provider
         self.mic_tuning = None
         self.model = None
-        # 48k -> 44.1k ≈ 147/160
-        self.up, self.down = 147, 160
+        self.screener_path = screener_path
+        self.screen_thr = screen_thr
+        # 48k -> 44.1k = 147/160 리샘플 + 감마톤(features.py, 오프라인 도구와 같은 코드)
+        self.features = FeatureExtractor(mic_rate, model_rate, seg_sec, win_t, hop_t, nfilt, fmin)
+
+    @property
+    def total_samples(self):
+        # 아직 읽지 않은 샘플 수
+        return self._w - self._r
 
     def _preprocess(self, segment: np.ndarray):
-        gtg = gtgram(segment, self.model_rate, self.win_t, self.hop_t, self.nfilt, self.fmin)
-        gtg = np.log(gtg + 1e-6)
-        if gtg.shape[1] < self._target_frames:
-            pad = np.zeros((gtg.shape[0], self._target_frames - gtg.shape[1]), dtype=gtg.dtype)
-            gtg = np.concatenate([gtg, pad], axis=1)
-        elif gtg.shape[1] > self._target_frames:
-            gtg = gtg[:, :self._target_frames]
-        return gtg[..., np.newaxis]
+        # 결과는 재사용 텐서 features.x(1, 64, 60, 1) — 다음 세그먼트에서 덮어씀
+        self.features.gammatone(segment)
+        return self.features.x
 
     def _cb(self, indata, frames, time_info, status):
         # 정지 중이면 버퍼가 쌓이지 않게 즉시 반환
         if not self._running or not self.audio_enabled:
             return
+        t0 = time.perf_counter()
+        if status:
+            METRICS.inc("audio_status_flags")   # overflow 등 PortAudio 경고
         try:
-            # L 채널을 float32로 복사해 청크로 저장
-            ch0 = indata[:, 0].astype(np.float32).copy()
-            self.chunks.append(ch0)
-            self.total_samples += ch0.shape[0]
+            # L 채널(int32)을 float32 링에 바로 기록(변환+복사 1회, 임시 배열 없음)
+            ch0 = indata[:, 0]
+            n = ch0.shape[0]
+            if self.stream_t0 is None:
+                self.stream_t0 = time.time() - frames / self.mic_rate
+            ring = self._ring
+            p = self._w % ring.shape[0]
+            first = min(n, ring.shape[0] - p)
+            np.copyto(ring[p:p + first], ch0[:first], casting='unsafe')
+            if first < n:
+                np.copyto(ring[:n - first], ch0[first:], casting='unsafe')
+            self._w += n
+            if self.recorder is not None:
+                now = time.time()
+                self.recorder.push_audio(ring[p:p + first], now - (n - first) / self.mic_rate)
+                if first < n:
+                    self.recorder.push_audio(ring[:n - first], now)
         except Exception:
             pass
+        t1 = time.perf_counter()
+        METRICS.observe("audio_callback", t1 - t0)
+        TRACER.complete("audio_callback", t0, t1)
 
     @Slot()
     def start(self):
+        TRACER.name_thread("DetectionWorker")
         try:
-            import tensorflow as tf
-            self.model = tf.keras.models.load_model(self.model_path)
+            from numpy_cnn import load_model
+            self.model = load_model(self.model_path)
+            if self.screener_path:
+                from cascade import CascadeModel
+                self.model = CascadeModel(load_model(self.screener_path), self.model,
+                                          self.class_names, self.screen_thr)
             self.sig_status.emit("모델 로드 완료")
         except Exception as e:
             self.sig_error.emit(f"모델 로드 실패: {e}")
@@ -79,66 +144,189 @@ class DetectionWorker(QObject):
             self.sig_error.emit(f"DOA 모듈 연결 실패: {e}")
             return
 
+        if ALLOC_AUDIT and self.audit is None:
+            self.audit = AllocAudit()
+            self.sig_status.emit("할당 감사 모드(EARS_ALLOC_AUDIT=1): 지연 수치는 참고용")
         self._running = True
+        while self._running:
+            device = self._audio_device()
+            if device is None:
+                # 감지 마이크 분리 → 레지스트리가 새 장치를 볼 때까지 대기 후 재부착
+                if not self._wait_for_device():
+                    return
+                continue
+            self._reattach = False
+            try:
+                with sd.InputStream(device=device,
+                                    samplerate=self.mic_rate,
+                                    channels=2,
+                                    dtype='int32',
+                                    callback=self._cb,
+                                    blocksize=self.seg_samples):
+                    self.sig_status.emit(f"오디오 스트림 시작: {device}")
+                    self.heartbeat = time.monotonic()
+                    if not self._ready:
+                        self._ready = True
+                        age, _ = process_age()
+                        if age is not None: METRICS.gauge("pipeline_ready_s", round(age, 3))
+                        mb = rss_mb()
+                        if mb is not None: METRICS.gauge("rss_mb", mb)
+                        self.sig_ready.emit()
+                    while self._running and not self._reattach:
+                        if not self.audio_enabled:
+                            sd.sleep(5)
+                            continue
+                        if not self._drain_segments():
+                            sd.sleep(5)
+            except Exception as e:
+                self.sig_error.emit(f"오디오 스트림 오류: {e}")
+                if self.registry is None:
+                    return
+            # 스트림이 닫힌 상태: 남은 버퍼/추적 상태는 새 스트림과 시간이 맞지 않으므로 비움
+            self.reset_buffer()
+            if self._running and not self._wait_for_device():
+                return
+
+    def _audio_device(self):
+        if self.registry is None:
+            return self.device_name
+        return self.registry.audio_index(self.device_name)
+
+    def _wait_for_device(self):
+        # 레지스트리 재조회(generation 변화)마다 PortAudio를 재초기화해 다시 꽂힌 마이크를 찾음
+        if self.registry is None:
+            return False
+        self.sig_status.emit(f"감지 마이크 대기: {self.device_name}")
+        METRICS.inc("audio_reattach_wait")
+        seen = -1
+        while self._running:
+            if self.registry.generation != seen:
+                if not self.registry.reinit_audio():
+                    time.sleep(0.5)             # 다른 스트림(STT 녹음) 사용 중 → 끝난 뒤 재시도
+                    continue
+                seen = self.registry.generation
+                if self.registry.audio_index(self.device_name) is not None:
+                    METRICS.inc("audio_reattach")
+                    return True
+            time.sleep(0.5)
+        return False
+
+    def _check_device(self):
+        # 스트림 오류 없이 카드만 사라진 경우(일부 USB 분리)도 레지스트리 캐시로 감지
+        if self.registry is not None and not self.registry.present("audio", self.device_name):
+            self._reattach = True
+
+    def _drain_segments(self):
+        processed_any = False
+
+        # 누적 샘플 수 기준으로 정확히 seg_samples만큼 추출
+        METRICS.gauge("det_backlog_samples", self.total_samples)
+        cap, n = self._ring.shape[0], self.seg_samples
+        self._apply_reset()
+        while self.total_samples >= n:
+            processed_any = True
+            cid = TRACER.next_cid()
+            if self.audit is not None:
+                self.audit.begin()
+            t0 = time.perf_counter()
+            lag = self.total_samples
+            if lag > cap - n:
+                # 추론이 못 따라가 콜백이 곧 덮어쓸 구간: 가장 오래된 샘플을 버리고 시각 보정 + 기록
+                dropped = lag - (cap - n)
+                self._r += dropped
+                if self.stream_t0 is not None:
+                    self.stream_t0 += dropped / self.mic_rate
+                METRICS.inc("audio_dropped_samples", dropped)
+            r = self._r % cap
+            if r + n <= cap:
+                seg = self._ring[r:r + n]          # 복사 없이 링 view(리샘플 단계에서 바로 스케일 복사됨)
+            else:
+                k = cap - r
+                self._seg[:k] = self._ring[r:]
+                self._seg[k:] = self._ring[:n - k]
+                seg = self._seg
+            t_start = self.stream_t0 if self.stream_t0 is not None else time.time()
+            # 겹침 구간(seg - hop)은 읽기 위치를 hop만큼만 옮겨 다음 윈도우에서 다시 읽음
+            hop = self.hop_samples   # governor가 바꿀 수 있으므로 한 번만 읽음
+            self._r += hop
+            if self.stream_t0 is not None:
+                self.stream_t0 += hop / self.mic_rate
+            t1 = time.perf_counter()
+            METRICS.observe("segment", t1 - t0)
+            TRACER.complete("segment", t0, t1, cid)
+
+            # int32 스케일 → float, 경량 리샘플
+            seg = self.features.resample(seg)
+            t2 = time.perf_counter()
+            METRICS.observe("resample", t2 - t1)
+            TRACER.complete("resample", t1, t2, cid)
+
+            x = self._preprocess(seg)
+            t3 = time.perf_counter()
+            METRICS.observe("gammatone", t3 - t2)
+            TRACER.complete("gammatone", t2, t3, cid)
+            try:
+                pred = self.model.predict(x, verbose=0)[0]
+                t4 = time.perf_counter()
+                METRICS.observe("inference", t4 - t3)
+                TRACER.complete("inference", t3, t4, cid)
+                METRICS.inc("segments")
+                self.heartbeat = time.monotonic()
+                if hasattr(self.model, "pass_rate"):
+                    METRICS.gauge("cascade_pass_rate", round(self.model.pass_rate, 4))
+                # DOA는 지금 읽은 값 → 세그먼트 시각(t_start, 백로그 시 수 초 전)이 아니라 읽은 시각으로 갱신
+                # 백로그로 세그먼트가 연달아 처리되면 같은 값을 중복 반영하지 않도록 hop/2 이내 재측정은 건너뜀
+                raw = self._read_doa()
+                t_doa = time.time()
+                if t_doa - self._doa_t >= 0.5 * self.hop_samples / self.mic_rate:
+                    self._doa_t = t_doa
+                    self.doa.update(raw, t_doa, max(float(pred[i]) for i in self._doa_idx),
+                                    float(self.features.feat.mean()) * LN_TO_DB)
+                t5 = time.perf_counter()
+                METRICS.observe("doa", t5 - t4)
+                TRACER.complete("doa", t4, t5, cid)
+                if self.recorder is not None:
+                    self.recorder.push_window(t_start, x[0, ..., 0], pred, raw)
+                event = self.tracker.update(pred, t_start)
+                if event is None:
+                    continue
+                cls, conf, onset = event
+                b = self.doa.estimate()
+                angle, doa_conf, doa_rate, level_rate = (b.angle, b.conf, b.rate, b.level_rate) if b else (raw, 0.0, 0.0, 0.0)
+                METRICS.gauge("doa_conf", doa_conf)
+                METRICS.inc("detections")
+                TRACER.flow_start("sig_detection", cid)
+                self.sig_detection.emit(cls, conf, angle, onset, time.time(), cid, doa_conf, doa_rate, level_rate)
+                if self.recorder is not None:
+                    self.recorder.snapshot(cls, conf=conf, angle=angle, raw_angle=raw, doa_conf=doa_conf,
+                                           doa_rate=doa_rate, onset_ts=onset, cid=cid)
+            except Exception as e:
+                self.sig_error.emit(f"추론 오류: {e}")
+                break
+            finally:
+                if self.audit is not None:
+                    self.audit.end()
+                self._apply_reset()       # 이 세그먼트 처리 중 들어온 초기화 요청
+        self._check_device()
+        return processed_any
+
+    def _read_doa(self):
         try:
-            with sd.InputStream(device=self.device_name,
-                                samplerate=self.mic_rate,
-                                channels=2,
-                                dtype='int32',
-                                callback=self._cb,
-                                blocksize=self.seg_samples):
-                while self._running:
-                    if not self.audio_enabled:
-                        sd.sleep(5)
-                        continue
-
-                    processed_any = False
-
-                    # --- 변경: 누적 샘플 수 기준으로 정확히 seg_samples만큼 추출
-                    while self.total_samples >= self.seg_samples:
-                        processed_any = True
-                        need = self.seg_samples
-                        collected = []
-                        while need > 0 and self.chunks:
-                            block = self.chunks.popleft()
-                            n = block.shape[0]
-                            if n <= need:
-                                collected.append(block)
-                                need -= n
-                            else:
-                                collected.append(block[:need])
-                                remain = block[need:]
-                                self.chunks.appendleft(remain)
-                                need = 0
-                        if not collected:
-                            break
-                        seg = np.concatenate(collected, axis=0)
-                        self.total_samples -= self.seg_samples
-
-                        # int32 스케일 → float, 경량 리샘플
-                        seg = (seg / (2**31)) * 0.1
-                        seg = resample_poly(seg, self.up, self.down).astype(np.float32)
-
-                        x = self._preprocess(seg)[None, ...]
-                        try:
-                            pred = self.model.predict(x, verbose=0)[0]
-                            idx = int(np.argmax(pred))
-                            cls = self.class_names[idx]
-                            prob = float(pred[idx])
-                            angle = getattr(self.mic_tuning, 'direction', 0)
-                            try:
-                                angle = int(angle) % 360
-                            except Exception:
-                                angle = 0
-                            self.sig_detection.emit(cls, prob, angle)
-                        except Exception as e:
-                            self.sig_error.emit(f"추론 오류: {e}")
-                            break
-
-                    if not processed_any:
-                        sd.sleep(5)
-        except Exception as e:
-            self.sig_error.emit(f"오디오 스트림 오류: {e}")
+            return int(getattr(self.mic_tuning, 'direction', 0)) % 360
+        except Exception:
+            return 0
+
+    # ---- governor knob ----
+    def backlog_sec(self):
+        # 아직 추론하지 못한 오디오 길이(초): 실시간을 못 따라가면 계속 증가
+        return max(0, self.total_samples - self.seg_samples) / self.mic_rate
+
+    def set_hop_sec(self, hop_sec):
+        self.hop_samples = max(1, min(self.seg_samples, int(self.mic_rate * hop_sec)))
+
+    def set_screen_boost(self, boost):
+        if hasattr(self.model, "threshold"):
+            self.model.threshold = min(0.95, self.screen_thr + boost)
 
     @Slot(bool)
     def set_audio_enabled(self, enabled: bool):
@@ -146,8 +334,19 @@ class DetectionWorker(QObject):
 
     @Slot()
     def reset_buffer(self):
-        self.chunks.clear()
-        self.total_samples = 0
+        # GUI 스레드/데몬 루프에서 호출됨 → 플래그만 세우고, 링·추적기 초기화는 추론 스레드가 수행
+        # (PosteriorTracker/BearingTracker는 스레드 안전하지 않음)
+        self._reset_pending = True
+
+    def _apply_reset(self):
+        if not self._reset_pending:
+            return
+        self._reset_pending = False
+        self._r = self._w
+        self.stream_t0 = None
+        self.tracker.reset()
+        self.doa.reset()
+        self._doa_t = 0.0
 
     @Slot()
     def stop(self):
@@ -162,41 +361,60 @@ class CameraWorker(QObject):
     def __init__(self):
         super().__init__()
         self._running = False
-
-    @Slot(str, int)
-    def start_capture(self, device_path: str, duration_ms: int):
+        self.width, self.height, self.emit_fps = 640, 480, 15
+        self.preroll = None      # video_ring.PrerollCamera (옵션)
+        self.pre_sec = 3.0       # 이벤트 몇 초 전부터 보여줄지
+        self.catchup = 2.0       # 링 재생 배속(실시간 따라잡기)
+        self.clip_dir = None     # 지정 시 이벤트 직전 구간을 .mjpeg로 비동기 저장
+
+    def set_profile(self, width, height, emit_fps):
+        # 다음 start_capture부터 적용
+        self.width, self.height, self.emit_fps = int(width), int(height), max(1, int(emit_fps))
+
+    @Slot(str, int, int)
+    def start_capture(self, device_path: str, duration_ms: int, cid: int = 0):
+        TRACER.name_thread("CameraWorker")
+        TRACER.flow_end("camera_request", cid or None)
+        if self.preroll is not None and self.preroll.device == device_path and self.preroll.is_running():
+            self._play_preroll(device_path, duration_ms, cid)
+            return
         self._running = True
         cap = None
         try:
+            t0 = time.perf_counter()
             cap = cv2.VideoCapture(device_path, cv2.CAP_V4L2)
+            t1 = time.perf_counter()
+            METRICS.observe("camera_open", t1 - t0)
+            TRACER.complete("camera_open", t0, t1, cid or None)
             if not cap.isOpened():
                 self.sig_error.emit(f"카메라 열기 실패: {device_path}")
                 self.sig_done.emit()
                 return
 
             cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
             cap.set(cv2.CAP_PROP_FPS, 30)
 
             deadline = time.time() + (duration_ms / 1000.0)
-            from PySide6.QtGui import QImage
             last_emit = 0.0
-            emit_interval = 1.0 / 15.0   # --- 변경: 15fps로 GUI emit 제한
+            first = True
+            emit_interval = 1.0 / self.emit_fps   # 기본 15fps로 GUI emit 제한(governor가 조정)
 
             while self._running and time.time() < deadline:
                 ok, frame = cap.read()
                 if not ok:
                     continue
+                if first:
+                    t1 = time.perf_counter()
+                    METRICS.observe("camera_first_frame", t1 - t0)
+                    TRACER.complete("camera_first_frame", t0, t1, cid or None)
+                    first = False
                 now = time.time()
                 if now - last_emit < emit_interval:
                     continue
                 last_emit = now
-
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb.shape
-                qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888).copy()
-                self.sig_frame.emit(qimg)
+                self._emit_bgr(frame)
         except Exception as e:
             self.sig_error.emit(f"카메라 오류: {e}")
         finally:
@@ -207,6 +425,52 @@ class CameraWorker(QObject):
             self._running = False
             self.sig_done.emit()
 
+    def _emit_bgr(self, frame):
+        from PySide6.QtGui import QImage
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w, ch = rgb.shape
+        qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888).copy()
+        self.sig_frame.emit(qimg)
+
+    def _play_preroll(self, device_path, duration_ms, cid):
+        self._running = True
+        try:
+            t0 = time.perf_counter()
+            t_alert = time.time()
+            cursor = t_alert - self.pre_sec
+            ring = self.preroll.ring
+            if self.clip_dir:
+                name = time.strftime("clip_%Y%m%d_%H%M%S", time.localtime(t_alert))
+                save_clip_async(ring.since(cursor), os.path.join(self.clip_dir, f"{name}_{os.path.basename(device_path)}.mjpeg"))
+            deadline = t_alert + duration_ms / 1000.0
+            emit_interval = 1.0 / self.emit_fps
+            last_wall, last_ts, first = t_alert, None, True
+            while self._running and time.time() < deadline:
+                now = time.time()
+                # 재생 커서는 catchup 배속으로 진행하다 실시간(now)에 도달하면 라이브로 전환
+                cursor = min(now, cursor + (now - last_wall) * self.catchup)
+                last_wall = now
+                f = ring.at_or_before(cursor)
+                if f is None or f[0] == last_ts:
+                    time.sleep(0.005)
+                    continue
+                last_ts = f[0]
+                frame = decode(f[1])
+                if frame is None:
+                    continue
+                if first:
+                    t1 = time.perf_counter()
+                    METRICS.observe("camera_first_frame", t1 - t0)
+                    TRACER.complete("camera_first_frame", t0, t1, cid or None)
+                    first = False
+                self._emit_bgr(frame)
+                time.sleep(max(0.0, emit_interval - (time.time() - now)))
+        except Exception as e:
+            self.sig_error.emit(f"카메라(preroll) 오류: {e}")
+        finally:
+            self._running = False
+            self.sig_done.emit()
+
 
 class SingleShotSTTWorker(QObject):
     sig_text = Signal(str)
@@ -10,15 +10,29 @@
 # - 스플래시가 끝난 "이후"에만 무거운 초기화 시작(모델/오디오/카메라/Tx 등) → HELLO GIF 끊김 완화
 # - 마이크 토글: 클릭 시 마이크 GIF ON + SPEAK 이미지 표시, 다시 클릭 시 OFF + SPEAK 숨김
 #   (STT는 토글 ON에서 1회 수행, 기존 로직 유지)
-
-import os, sys, io, wave, time, serial
+# - 감지 확정: 고정 임계(0.94) 단발 판정 대신 PosteriorTracker(EMA + N-of-M + 히스테리시스)
+# - 지표: metrics.METRICS 단계별 지연 히스토그램 → http://127.0.0.1:9108/metrics + 회전 파일(p50/p99 sound→LED/카메라)
+# - 트레이스(EARS_TRACE=1): 숨김 버튼 1.5초 길게 누르기 또는 SIGUSR1 → Chrome trace JSON 덤프
+# - governor: SoC 온도/클럭/감지 백로그 기반으로 hop·스레드·카메라 해상도/fps·게이팅 강도 자동 조정
+# - (옵션) preroll 카메라: 직전 이벤트 방향 카메라의 원본 MJPEG을 링에 보관 → 경보 시 몇 초 전부터 재생
+# - flight recorder: 최근 10초 오디오/특징/확률/DOA 보관, 감지 확정·길게 누르기 시 NPZ 스냅샷(백그라운드 저장)
+# - HUD 렌더링: 구분선/아이콘은 캐시된 배경 pixmap 1장(ChromeLayer), GIF는 표시 크기로 미리 디코드한 프레임(FrameAtlas)
+#   아이콘/GIF는 원본 해시+표시 크기별로 미리 축소된 캐시(asset_cache)에서 읽고, 미스 시 백그라운드로 생성
+#   EARS_PROFILE_UI=1이면 repaint 횟수/GUI 루프 지연/RSS를 지표로 기록(HUD_CACHED_RENDER=False로 이전 방식과 비교)
+# - 장치 레지스트리: 마이크/카메라/tty를 1회 조회 후 캐시(O(1) 조회), /dev inotify로 핫플러그 감지
+#   → 분리된 카메라는 경보 전에 인접 방향 카메라로 대체, 시리얼은 재연결 시 자동 재오픈, 감지 마이크는 워커가 재부착
+# - 감지 이벤트 팬아웃: EventBus로 Arduino/BT/로그는 sink별 전용 스레드, 카메라/GUI는 GUI 스레드 inline
+# - 방향: 워커가 윈도우마다 DOA를 추적(doa_tracker)해 넘긴 추적 방위로 카메라 선택/CLASS,ANGLE 전송,
+#   음량이 APPROACH_DB_S 이상 증가 중이면 방향 캡션에 '접근' 표시
+
+import os, sys, io, wave, time, serial, signal, threading
 from queue import Queue
 
 # ====== 자동실행 설정 상수 ======
 AUTOSTART_ENABLE = True  # 부팅 후 자동실행을 원치 않으면 False
 AUTOSTART_NAME = "hearo-ui.desktop"
 
-from PySide6.QtCore import Qt, QRect, QTimer, Signal, Slot, QThread, QObject
+from PySide6.QtCore import Qt, QRect, QSize, QTimer, Signal, Slot, QThread, QObject
 from PySide6.QtGui import QPixmap, QMovie, QPainter, QPen, QFont
 from PySide6.QtWidgets import QApplication, QMainWindow, QLabel, QMenuBar, QStatusBar, QWidget, QPushButton
 
@@ -30,6 +44,24 @@ import sounddevice as sd
 from google.cloud import speech
 from hi import DetectionWorker, CameraWorker, SingleShotSTTWorker
 from tuning import find as MicFind
+from posterior_tracker import PosteriorTracker
+from event_bus import EventBus, DetectionEvent
+from metrics import METRICS
+from tracing import TRACER
+from flight_recorder import FlightRecorder
+from governor import Governor, SysfsProbe, set_blas_threads
+from video_ring import PrerollCamera
+from hud_render import ChromeLayer, FrameAtlas, AtlasMovieWidget, AtlasToggleLabel, PaintProfiler, FirstPaintProbe
+from asset_cache import AssetCache
+from device_registry import DeviceRegistry
+# 모델/오디오/감지 확정/포트/flight·governor·지표 설정은 데몬과 공용(config.py)
+from config import (CLASS_NAMES, MODEL_PATH, MODEL_NPZ, SCREENER_NPZ, SCREEN_THR, CLASS_ID_MAP,
+                    DETECT_DEVICE, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE, WIN_TIME, HOP_TIME, N_FILTERS, FMIN,
+                    SEGMENT_SECONDS, SEGMENT_HOP_SECONDS,
+                    TRACK_TARGETS, TRACK_ALPHA, TRACK_ON_THR, TRACK_OFF_THR, TRACK_N, TRACK_M, ALERT_HOLD_SEC,
+                    ARDUINO_PORT, BT_PORT, BAUDRATE, RX_DRAIN_SEC,
+                    FLIGHT_ENABLE, FLIGHT_DIR, FLIGHT_SECONDS, FLIGHT_QUOTA_MB,
+                    GOVERNOR_ENABLE, GOVERNOR_SYSFS_ROOT, TRACE_DIR, METRICS_PORT)
 
 # ===== 경로 =====
 HEARO_ANIM      = "/home/yong/projects/ears_system/Image/hearo_logo_merged_v5_black.gif"
@@ -41,6 +73,9 @@ WAVE_ICON_GIF   = "/home/yong/projects/ears_system/Image/new_wave.gif"
 DIRECTION_ICON  = "/home/yong/projects/ears_system/Image/direction_1.png"
 SOUND_ICON      = "/home/yong/projects/ears_system/Image/sound_1.jpg"
 HELLO_GIF       = "/home/yong/projects/ears_system/Image/new_hello.gif"
+METRICS_FILE    = "/home/yong/projects/ears_system/logs/metrics.prom"
+CLIP_DIR        = "/home/yong/projects/ears_system/logs/clips"
+ASSET_CACHE_DIR = "/home/yong/projects/ears_system/Image/.cache"   # 표시 크기로 미리 축소된 이미지/프레임 시트
 
 HEARO_ANIM_RECT      = (205, 33, 400, 400)
 MIC_TOGGLE_RECT      = (738, 405, 48, 48)
@@ -53,46 +88,67 @@ GREEN_CIRCLE_RECT    = (509, 208, 38, 38)
 WAVE_BOTTOM_Y = WAVE_TOGGLE_RECT[1] + WAVE_TOGGLE_RECT[3]
 MIC_TOP_Y     = 395
 
+# ==== HUD 렌더링 ====
+HUD_CACHED_RENDER = True     # False: 위젯별 paintEvent + QMovie(이전 방식, 비교 측정용)
+HUD_ANIM_BUDGET_MB = 24      # 로고 애니메이션 프레임 메모리 한도(초과 시 프레임 솎기)
+HUD_ICON_BUDGET_MB = 4       # 마이크/웨이브 아이콘 GIF 각각의 한도
+HUD_PROFILE = os.environ.get("EARS_PROFILE_UI", "0") == "1"
+ASSETS = AssetCache(ASSET_CACHE_DIR)
+
 # ==== 백엔드 설정 ====
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/home/yong/stt_project/speech_stt_key.json"
-CLASS_NAMES = ['Horn', 'None', 'Siren']
-MODEL_PATH = "/home/yong/projects/ears_system/CNN_Model/gamma_cnn_main5_timeframe"
-CLASS_ID_MAP = { 'INIT': "INIT", 'None': "NONE", 'Siren': "SIREN", 'Horn': "HORN" }  # Arduino 전용 토큰
-
-DETECT_DEVICE = 'voicehat'
 STT_DEVICE    = 'uacdemo'
-MIC_SAMPLE_RATE   = 48000
-MODEL_SAMPLE_RATE = 44100
 SAMPLE_RATE_STT   = 48000
 STT_DURATION      = 5
-WIN_TIME = 0.025
-HOP_TIME = 0.010
-N_FILTERS = 64
-FMIN = 50
-SEGMENT_SECONDS = 0.6
+
+# ==== 방향 추적(BearingTracker) 표시 ====
+APPROACH_DB_S   = 1.5    # 음량 추세(dB/s) 이상이면 접근 중으로 표시
 
 CAMERA_FRONT = '/dev/webcam_front'
 CAMERA_LEFT  = '/dev/webcam_left'
 CAMERA_BACK  = '/dev/webcam_back'
 CAMERA_RIGHT = '/dev/webcam_right'
 
-# ==== 통신 포트 ====
-ARDUINO_PORT = '/dev/ttyACM0'
-BAUDRATE = 9600
-try:
-    arduino = serial.Serial(ARDUINO_PORT, BAUDRATE, timeout=0, write_timeout=0.1)
-    time.sleep(2)
-    print(f"[아두이노 연결] {ARDUINO_PORT}")
-except Exception as e:
-    print(f"[아두이노 실패] {e}")
-    arduino = None
-
-try:
-    bt_serial = serial.Serial('/dev/ttyAMA0', baudrate=9600, timeout=0, write_timeout=0.1)
-    print("[블루투스 연결] HC-06 OK")
-except Exception as e:
-    print(f"[블루투스 실패] {e}")
-    bt_serial = None
+# ==== preroll 카메라(이벤트 직전 영상) ====
+PREROLL_ENABLE  = False      # 카메라 1대를 상시 스트리밍(USB 대역폭/전력 사용) → 기본 비활성
+PREROLL_SECONDS = 4.0        # 링 보관 길이
+PREROLL_PRE_SEC = 3.0        # 경보 시 몇 초 전부터 재생
+PREROLL_MAX_MB  = 8          # 링 메모리 한도
+PREROLL_SAVE    = True       # 이벤트 직전 클립을 CLIP_DIR에 저장
+
+# ==== 지표 내보내기 ====
+METRICS_DUMP_SEC = 10        # 회전 파일 덤프 주기
+
+# ==== 통신 포트(ARDUINO_PORT/BT_PORT/BAUDRATE는 config.py) ====
+def _open_arduino():
+    try:
+        s = serial.Serial(ARDUINO_PORT, BAUDRATE, timeout=0, write_timeout=0.1)
+        time.sleep(2)   # 포트 오픈 시 아두이노 리셋 대기
+        print(f"[아두이노 연결] {ARDUINO_PORT}")
+        return s
+    except Exception as e:
+        print(f"[아두이노 실패] {e}")
+        return None
+
+def _open_bt():
+    try:
+        s = serial.Serial(BT_PORT, baudrate=9600, timeout=0, write_timeout=0.1)
+        print("[블루투스 연결] HC-06 OK")
+        return s
+    except Exception as e:
+        print(f"[블루투스 실패] {e}")
+        return None
+
+arduino = _open_arduino()
+bt_serial = _open_bt()
+# 시리얼 포트 접근/교체 직렬화(pyserial은 스레드 안전하지 않음): 포트별 락
+# GUI RX 드레인 · EventBus sink/TxWorker 전송 · 핫플러그 재오픈/핸드셰이크가 해당 포트의 락만 사용
+# → 아두이노 핸드셰이크(~2초) 동안에도 BT 전송은 막히지 않음
+ARDUINO_LOCK = threading.RLock()
+BT_LOCK = threading.RLock()
+
+# ==== 장치 레지스트리(첫 조회 시 1회 스캔, 감시는 _start_heavy_init에서 시작) ====
+DEVICES = DeviceRegistry()
 
 # ==== 전송 워커(QThread) (백업용 큐) ====
 class TxWorker(QObject):
@@ -111,14 +167,18 @@ class TxWorker(QObject):
             except Exception:
                 continue
             try:
-                if kind == "bt" and self.bt:
-                    self.bt.write(payload)
-                    try: self.bt.flush()
-                    except: pass
-                elif kind == "arduino" and self.arduino:
-                    self.arduino.write(payload)
-                    try: self.arduino.flush()
-                    except: pass
+                if kind == "bt":
+                    with BT_LOCK:
+                        if self.bt:
+                            self.bt.write(payload)
+                            try: self.bt.flush()
+                            except: pass
+                elif kind == "arduino":
+                    with ARDUINO_LOCK:
+                        if self.arduino:
+                            self.arduino.write(payload)
+                            try: self.arduino.flush()
+                            except: pass
             except Exception as e:
                 self.sig_error.emit(f"TX 오류: {e}")
     @Slot()
@@ -127,28 +187,19 @@ class TxWorker(QObject):
 
 # ==== STT 장치 탐색 ====
 def _resolve_device(name_or_index):
-    try:
-        devices = sd.query_devices()
-        for i, d in enumerate(devices):
-            if d.get('max_input_channels', 0) > 0 and (str(i) == str(name_or_index) or d.get('name') == name_or_index):
-                return i
-        low = str(name_or_index).lower()
-        for i, d in enumerate(devices):
-            if d.get('max_input_channels', 0) > 0 and (low in str(d.get('name','')).lower()):
-                return i
-    except Exception as e:
-        print("[STT 장치 조회 실패]", e)
-    return None
+    # 이름/인덱스 → 입력 장치 인덱스(레지스트리 캐시, 분리된 장치는 None)
+    return DEVICES.audio_index(name_or_index)
 
 # ==== STT 함수 ====
 def record_audio():
     idx = _resolve_device(STT_DEVICE)
     if idx is None:
         raise RuntimeError("STT 장치 인식 실패 — sd.query_devices()로 이름/인덱스를 확인하세요.")
-    rec = sd.rec(int(STT_DURATION * SAMPLE_RATE_STT),
-                 samplerate=SAMPLE_RATE_STT,
-                 channels=1, dtype='int16', device=idx)
-    sd.wait()
+    with DEVICES.audio_stream():   # 녹음 중에는 감지 워커의 PortAudio 재초기화를 미룸
+        rec = sd.rec(int(STT_DURATION * SAMPLE_RATE_STT),
+                     samplerate=SAMPLE_RATE_STT,
+                     channels=1, dtype='int16', device=idx)
+        sd.wait()
     return rec
 
 def convert_to_wav_bytes(audio_np):
@@ -232,12 +283,15 @@ class ClickableLabel(QLabel):
             self.clicked.emit()
 
 class MovieLabel(QLabel):
-    def __init__(self, gif_path: str, loop=True, parent=None, cache_mode=QMovie.CacheAll, defer_start=False, *a, **kw):
+    def __init__(self, gif_path: str, loop=True, parent=None, cache_mode=QMovie.CacheAll, defer_start=False,
+                 scaled_size=None, *a, **kw):
         super().__init__(parent, *a, **kw)
         self.setScaledContents(True)
         self.setStyleSheet("background: transparent;")
         self.movie = QMovie(gif_path)
         self.movie.setCacheMode(cache_mode)
+        if scaled_size:
+            self.movie.setScaledSize(QSize(*scaled_size))   # 디코드 시 표시 크기로(페인트마다 재축소 없음)
         if loop:
             self.movie.finished.connect(self.movie.start)
         self.setMovie(self.movie)
@@ -270,6 +324,7 @@ class VRule(QWidget):
         p.drawLine(0, 0, 0, self.height()); p.end()
 
 class InvisibleButton(QPushButton):
+    long_pressed = Signal()   # 1.5초 이상 누르고 있으면 발생(트레이스 덤프용)
     def __init__(self, parent, rect: QRect):
         super().__init__(parent)
         self.setGeometry(rect)
@@ -279,7 +334,11 @@ class InvisibleButton(QPushButton):
         self._clicks = 0
         self._window = QTimer(self); self._window.setSingleShot(True); self._window.setInterval(2000)
         self._window.timeout.connect(self._reset_clicks)
+        self._hold = QTimer(self); self._hold.setSingleShot(True); self._hold.setInterval(1500)
+        self._hold.timeout.connect(self.long_pressed.emit)
         self.pressed.connect(self._on_pressed)
+        self.pressed.connect(self._hold.start)
+        self.released.connect(self._hold.stop)
     def _on_pressed(self):
         if not self._window.isActive():
             self._clicks = 0; self._window.start()
@@ -292,7 +351,12 @@ class Ui_MainWindow(object):
         MainWindow.setFixedSize(800, 480)
         self.centralwidget = QWidget(MainWindow); MainWindow.setCentralWidget(self.centralwidget)
         bg = QLabel(self.centralwidget); bg.setGeometry(0,0,800,480); bg.setStyleSheet("background:#000;")
-        self.hearo_anim = MovieLabel(HEARO_ANIM, loop=True, parent=self.centralwidget)
+        if HUD_CACHED_RENDER:
+            atlas = FrameAtlas(HEARO_ANIM, HEARO_ANIM_RECT[2:], HUD_ANIM_BUDGET_MB << 20, ASSETS).load_async()
+            self.hearo_anim = AtlasMovieWidget(atlas, parent=self.centralwidget)
+            self.hearo_anim.start()
+        else:
+            self.hearo_anim = MovieLabel(HEARO_ANIM, loop=True, parent=self.centralwidget)
         self.hearo_anim.setGeometry(QRect(*HEARO_ANIM_RECT))
         self.menubar = QMenuBar(MainWindow); MainWindow.setMenuBar(self.menubar)
         self.statusbar = QStatusBar(MainWindow); MainWindow.setStatusBar(self.statusbar)
@@ -301,7 +365,9 @@ class Ui_MainWindow(object):
 
 # ==== 메인 앱 ====
 class App(QMainWindow):
-    camera_request = Signal(str, int)
+    camera_request = Signal(str, int, int)   # device, duration_ms, cid
+    sig_status = Signal(str)   # 워커/sink 스레드 → 상태바 메시지
+    sig_device = Signal(str, str, bool)   # 레지스트리 감시 스레드 → GUI 스레드 (kind, key, present)
 
     def __init__(self):
         super().__init__()
@@ -314,6 +380,8 @@ class App(QMainWindow):
         self.ui = Ui_MainWindow(); self.ui.setupUi(self)
         # 메시지는 보되 상태바는 보이지 않음
         self.statusBar().showMessage("편집 제거 · 백엔드 연동")
+        self.sig_status.connect(self.statusBar().showMessage)
+        self.sig_device.connect(self._on_device_change)
 
         # 표시 라벨
         self.camera_label = QLabel(self.ui.centralwidget)
@@ -330,6 +398,9 @@ class App(QMainWindow):
         # UI 구성(스플래시 중 숨김)
         self._build_main_ui(visible=False)
         self._build_splash()
+        # 첫 화면(스플래시)/메인 HUD 첫 paint 시각 → 지표(autostart 이후 체감 기동 시간)
+        FirstPaintProbe(self.ui.centralwidget, "first_paint")
+        FirstPaintProbe(self.mic, "hud_first_paint")
 
         # ---- 무거운 초기화 객체들은 일단 None으로 두고, 스플래시 종료 뒤에 시작 ----
         self.det_thread = None
@@ -338,6 +409,10 @@ class App(QMainWindow):
         self.cam = None
         self.tx_thread = None
         self.tx = None
+        self.bus = None
+        self.flight = None
+        self.governor = None
+        self.preroll = None
         self._rx_timer = None
 
         # STT(단발성)
@@ -348,6 +423,8 @@ class App(QMainWindow):
 
         # 상태
         self._camera_active = False
+        self._cam_onset_ts = None
+        self._last_cam_path = None
         self._frozen_detection = False
         self._frozen_class = None
         self._frozen_angle = None
@@ -364,7 +441,8 @@ class App(QMainWindow):
         self._hide_all_main_widgets()
         # 스플래시만 CacheNone + defer_start로 부드럽게
         self.splash = MovieLabel(HELLO_GIF, loop=False, parent=self.ui.centralwidget,
-                                 cache_mode=QMovie.CacheNone, defer_start=True)
+                                 cache_mode=QMovie.CacheNone, defer_start=True,
+                                 scaled_size=HELLO_GIF_RECT[2:] if HUD_CACHED_RENDER else None)
         self.splash.setGeometry(QRect(*HELLO_GIF_RECT))
         self.splash.raise_()
         self.ui.hearo_anim.hide()
@@ -411,9 +489,26 @@ class App(QMainWindow):
         # 감지/카메라 스레드/워커
         self.det_thread = QThread(self)
         self.cam_thread = QThread(self)
-        self.det = DetectionWorker(MODEL_PATH, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE, SEGMENT_SECONDS,
-                                   WIN_TIME, HOP_TIME, N_FILTERS, FMIN, DETECT_DEVICE, MicFind, CLASS_NAMES)
+        tracker = PosteriorTracker(CLASS_NAMES, TRACK_TARGETS, TRACK_ALPHA,
+                                   TRACK_ON_THR, TRACK_OFF_THR, TRACK_N, TRACK_M)
+        if FLIGHT_ENABLE:
+            self.flight = FlightRecorder(FLIGHT_DIR, MIC_SAMPLE_RATE, CLASS_NAMES, FLIGHT_SECONDS,
+                                         SEGMENT_HOP_SECONDS, (N_FILTERS, int(SEGMENT_SECONDS / HOP_TIME)),
+                                         FLIGHT_QUOTA_MB)
+        model_path = MODEL_NPZ if os.path.exists(MODEL_NPZ) else MODEL_PATH
+        self.det = DetectionWorker(model_path, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE, SEGMENT_SECONDS,
+                                   WIN_TIME, HOP_TIME, N_FILTERS, FMIN, DETECT_DEVICE, MicFind, CLASS_NAMES,
+                                   hop_sec=SEGMENT_HOP_SECONDS, tracker=tracker, recorder=self.flight,
+                                   screener_path=SCREENER_NPZ if os.path.exists(SCREENER_NPZ) else None,
+                                   screen_thr=SCREEN_THR, registry=DEVICES)
         self.cam = CameraWorker()
+        if PREROLL_ENABLE:
+            # 사이렌은 주로 후방에서 접근 → 기본은 후방, 이후에는 직전 이벤트 방향 카메라
+            self.preroll = PrerollCamera(CAMERA_BACK, PREROLL_SECONDS, max_bytes=PREROLL_MAX_MB << 20)
+            self.preroll.start()
+            self.cam.preroll = self.preroll
+            self.cam.pre_sec = PREROLL_PRE_SEC
+            self.cam.clip_dir = CLIP_DIR if PREROLL_SAVE else None
         self.det.moveToThread(self.det_thread)
         self.cam.moveToThread(self.cam_thread)
         self.det_thread.started.connect(self.det.start)
@@ -435,9 +530,40 @@ class App(QMainWindow):
         self.tx.sig_error.connect(lambda e: self.statusBar().showMessage(e))
         self.tx_thread.start()
 
+        # 감지 이벤트 버스: 전송 → 카메라 → GUI 순서 유지, 느린 sink가 다른 sink를 막지 않음
+        self.bus = EventBus(on_error=self.sig_status.emit)
+        self.bus.subscribe("arduino", self._on_arduino_event)
+        self.bus.subscribe("bt",      self._on_bt_event)
+        self.bus.subscribe("log",     self._log_detection, maxsize=32)
+        self.bus.subscribe("camera",  self._on_camera_event, inline=True)
+        self.bus.subscribe("gui",     self._on_gui_event, inline=True)
+
+        # 장치 핫플러그 감시: 카메라/시리얼/감지 마이크 연결 상태 변화 → GUI 스레드로 전달
+        for cam_path in (CAMERA_FRONT, CAMERA_LEFT, CAMERA_BACK, CAMERA_RIGHT):
+            if not DEVICES.watch("camera", cam_path): print(f"[DEV] 카메라 없음: {cam_path}")
+        DEVICES.watch("tty", ARDUINO_PORT)
+        DEVICES.watch("tty", BT_PORT)
+        DEVICES.watch("audio", DETECT_DEVICE)
+        DEVICES.subscribe(self.sig_device.emit)
+        DEVICES.start()
+
+        # 연산 governor: 스로틀/백로그 시 knob을 낮춰 실시간 유지
+        if GOVERNOR_ENABLE:
+            self.governor = Governor(SysfsProbe(GOVERNOR_SYSFS_ROOT), self.det.backlog_sec, self._apply_governor)
+            self.governor.start()
+
+        # 지표: 큐 깊이는 스크랩 시점에 수집, HTTP/파일 내보내기 실패는 앱 동작에 영향 없음
+        METRICS.add_collector(self._collect_queue_depths)
+        try:
+            if METRICS_PORT: METRICS.serve_http(METRICS_PORT)
+            os.makedirs(os.path.dirname(METRICS_FILE), exist_ok=True)
+            METRICS.start_file_dump(METRICS_FILE, METRICS_DUMP_SEC)
+        except Exception as e:
+            print("[METRICS] 내보내기 시작 실패:", e)
+
         # (중요) 주기적 RX 드레인: 아두이노 + BT (50Hz)
         self._rx_timer = QTimer(self)
-        self._rx_timer.setInterval(20)
+        self._rx_timer.setInterval(int(RX_DRAIN_SEC * 1000))
         self._rx_timer.timeout.connect(self._drain_serial_rx)
         self._rx_timer.start()
 
@@ -445,9 +571,9 @@ class App(QMainWindow):
         self._handshake_and_init()
 
     # ===== 메인 UI =====
-    def _add_side_text(self, right_of_vrule: QWidget, anchor_rect, text, max_w=160, h=16, x_pad=6):
+    def _add_side_text(self, vx: int, anchor_rect, text, max_w=160, h=16, x_pad=6):
+        # vx: 왼쪽 세로선의 오른쪽 끝 x
         ax, ay, aw, ah = anchor_rect
-        vx = right_of_vrule.geometry().x() + right_of_vrule.width()
         rx = vx + x_pad
         ry = ay + (ah - h) // 2
         if rx + max_w > 800: max_w = max(40, 800 - rx)
@@ -460,50 +586,64 @@ class App(QMainWindow):
 
     def _build_main_ui(self, visible: bool):
         widgets = []
-        self.mic = SimpleToggleLabel(ICON_STILL, ICON_GIF, self.ui.centralwidget)
+        if HUD_CACHED_RENDER:
+            mic_wh, wave_wh = MIC_TOGGLE_RECT[2:], WAVE_TOGGLE_RECT[2:]
+            self.mic = AtlasToggleLabel(ASSETS.image(ICON_STILL, mic_wh, keep_aspect=False),
+                                        FrameAtlas(ICON_GIF, mic_wh, HUD_ICON_BUDGET_MB << 20, ASSETS).load_async(),
+                                        self.ui.centralwidget)
+            self.wave = AtlasToggleLabel(ASSETS.image(WAVE_ICON_STILL, wave_wh, keep_aspect=False),
+                                         FrameAtlas(WAVE_ICON_GIF, wave_wh, HUD_ICON_BUDGET_MB << 20, ASSETS).load_async(),
+                                         self.ui.centralwidget)
+        else:
+            self.mic = SimpleToggleLabel(ICON_STILL, ICON_GIF, self.ui.centralwidget)
+            self.wave = SimpleToggleLabel(WAVE_ICON_STILL, WAVE_ICON_GIF, self.ui.centralwidget)
         self.mic.setGeometry(QRect(*MIC_TOGGLE_RECT)); widgets.append(self.mic)
-        self.wave = SimpleToggleLabel(WAVE_ICON_STILL, WAVE_ICON_GIF, self.ui.centralwidget)
         self.wave.setGeometry(QRect(*WAVE_TOGGLE_RECT)); widgets.append(self.wave)
 
         self.result_img = QLabel(self.ui.centralwidget)
         self.result_img.setGeometry(QRect(*RESULT_IMAGE_RECT))
         self.result_img.setStyleSheet("background:transparent;")
-        self.result_img.setPixmap(QPixmap(RESULT_IMG).scaled(self.result_img.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        if not HUD_CACHED_RENDER:
+            self.result_img.setPixmap(QPixmap(RESULT_IMG).scaled(self.result_img.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        # 캐시 경로에서는 SPEAK 이미지를 처음 표시할 때 로드(_on_mic_clicked_for_stt)
         self.result_img.hide()
 
         # MIC 토글 → STT + SPEAK 토글 (원래 동작 유지)
         self.mic.toggled.connect(self._on_mic_clicked_for_stt)
 
+        # 구분선 좌표: (y, 굵기) / (x, y0, y1, 굵기)
+        rule_t = 2
+        wave_right_x = WAVE_TOGGLE_RECT[0] + WAVE_TOGGLE_RECT[2]
+        sound_left_x, sound_right_x = SOUND_ICON_RECT[0], SOUND_ICON_RECT[0] + SOUND_ICON_RECT[2]
+        dir_left_x, dir_right_x = DIRECTION_ICON_RECT[0], DIRECTION_ICON_RECT[0] + DIRECTION_ICON_RECT[2]
+        hrules = [(WAVE_BOTTOM_Y, rule_t), (MIC_TOP_Y, rule_t)]
+        v_wave_r, v_sound_r, v_dir_r = wave_right_x + 5, sound_right_x + 5, dir_right_x + 5
+        vrules = [(x, 0, WAVE_BOTTOM_Y, rule_t) for x in (v_wave_r, sound_left_x - 5, v_sound_r, dir_left_x - 5, v_dir_r)]
+
         self.sound_icon = ClickableLabel(self.ui.centralwidget)
         self.sound_icon.setGeometry(QRect(*SOUND_ICON_RECT))
-        self.sound_icon.setPixmap(QPixmap(SOUND_ICON).scaled(SOUND_ICON_RECT[2], SOUND_ICON_RECT[3], Qt.KeepAspectRatio, Qt.SmoothTransformation))
         widgets.append(self.sound_icon)
-
         self.direction_icon = ClickableLabel(self.ui.centralwidget)
         self.direction_icon.setGeometry(QRect(*DIRECTION_ICON_RECT))
-        self.direction_icon.setPixmap(QPixmap(DIRECTION_ICON).scaled(DIRECTION_ICON_RECT[2], DIRECTION_ICON_RECT[3], Qt.KeepAspectRatio, Qt.SmoothTransformation))
         widgets.append(self.direction_icon)
 
-        self.rule_wave_bottom = HRule(y=WAVE_BOTTOM_Y, parent=self.ui.centralwidget)
-        self.rule_mic_top     = HRule(y=MIC_TOP_Y,     parent=self.ui.centralwidget)
-        widgets.extend([self.rule_wave_bottom, self.rule_mic_top])
-
-        wave_right_x = WAVE_TOGGLE_RECT[0] + WAVE_TOGGLE_RECT[2]
-        self.v_wave_r = VRule(x=wave_right_x + 5, y0=0, y1=WAVE_BOTTOM_Y, parent=self.ui.centralwidget)
-        sound_left_x  = SOUND_ICON_RECT[0]
-        sound_right_x = SOUND_ICON_RECT[0] + SOUND_ICON_RECT[2]
-        self.v_sound_l = VRule(x=sound_left_x - 5, y0=0, y1=WAVE_BOTTOM_Y, parent=self.ui.centralwidget)
-        self.v_sound_r = VRule(x=sound_right_x + 5, y0=0, y1=WAVE_BOTTOM_Y, parent=self.ui.centralwidget)
-        dir_left_x  = DIRECTION_ICON_RECT[0]
-        dir_right_x = DIRECTION_ICON_RECT[0] + DIRECTION_ICON_RECT[2]
-        self.v_dir_l = VRule(x=dir_left_x - 5, y0=0, y1=WAVE_BOTTOM_Y, parent=self.ui.centralwidget)
-        self.v_dir_r = VRule(x=dir_right_x + 5, y0=0, y1=WAVE_BOTTOM_Y, parent=self.ui.centralwidget)
-        widgets.extend([self.v_wave_r, self.v_sound_l, self.v_sound_r, self.v_dir_l, self.v_dir_r])
+        if HUD_CACHED_RENDER:
+            # 정적 요소는 배경 pixmap에 1회 렌더링, 아이콘 라벨은 클릭 영역으로만 사용(그리지 않음)
+            self.chrome = ChromeLayer(self.ui.centralwidget, hrules=hrules, vrules=vrules,
+                                      icons=[(SOUND_ICON, SOUND_ICON_RECT), (DIRECTION_ICON, DIRECTION_ICON_RECT)],
+                                      assets=ASSETS)
+            self.chrome.stackUnder(self.ui.hearo_anim)
+            widgets.append(self.chrome)
+        else:
+            self.sound_icon.setPixmap(QPixmap(SOUND_ICON).scaled(SOUND_ICON_RECT[2], SOUND_ICON_RECT[3], Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            self.direction_icon.setPixmap(QPixmap(DIRECTION_ICON).scaled(DIRECTION_ICON_RECT[2], DIRECTION_ICON_RECT[3], Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            widgets.extend(HRule(y=y, thickness=t, parent=self.ui.centralwidget) for y, t in hrules)
+            widgets.extend(VRule(x=x, y0=y0, y1=y1, thickness=t, parent=self.ui.centralwidget) for x, y0, y1, t in vrules)
 
         # ==== 텍스트 표시용 라벨(초기 기본값 표시) ====
-        self.wave_caption  = self._add_side_text(self.v_wave_r, WAVE_TOGGLE_RECT, "후방 감지 센서", max_w=140)
-        self.sound_caption = self._add_side_text(self.v_sound_r, SOUND_ICON_RECT, "소리 종류", max_w=120)
-        self.dir_caption   = self._add_side_text(self.v_dir_r, DIRECTION_ICON_RECT, "소리 방향", max_w=120)
+        self.wave_caption  = self._add_side_text(v_wave_r + rule_t, WAVE_TOGGLE_RECT, "후방 감지 센서", max_w=140)
+        self.sound_caption = self._add_side_text(v_sound_r + rule_t, SOUND_ICON_RECT, "소리 종류", max_w=120)
+        self.dir_caption   = self._add_side_text(v_dir_r + rule_t, DIRECTION_ICON_RECT, "소리 방향", max_w=120)
 
         # 아이콘 클릭 시 보이기/숨기기 토글 (기본 표시)
         self.sound_icon.clicked.connect(lambda: self.sound_caption.setVisible(not self.sound_caption.isVisible()))
@@ -522,6 +662,8 @@ class App(QMainWindow):
         gx, gy, gw, gh = GREEN_CIRCLE_RECT
         self.hidden_button = InvisibleButton(self.ui.centralwidget, QRect(gx, gy, gw, gh))
         self.hidden_button.raise_(); self.hidden_button.show()
+        self.hidden_button.long_pressed.connect(self.dump_trace)
+        self.hidden_button.long_pressed.connect(self.snapshot_flight)
 
     # ===== 카메라 표시영역: 두 가로선 사이(세로), 가로 전폭(0~800) =====
     def _apply_camera_bounds(self):
@@ -535,14 +677,17 @@ class App(QMainWindow):
 
     # ===== (중요) 주기적 RX 드레인: 아두이노 + BT =====
     def _drain_serial_rx(self):
-        try:
-            if arduino and arduino.in_waiting:
-                arduino.read(arduino.in_waiting)  # 모두 버리기
-        except: pass
-        try:
-            if bt_serial and bt_serial.in_waiting:
-                bt_serial.read(bt_serial.in_waiting)  # 모두 버리기
-        except: pass
+        # 포트별로: 핸드셰이크/재오픈/전송 중(락 보유)이면 그 포트만 이번 주기 건너뜀 → pong을 가로채지 않고 GUI도 막지 않음
+        for lock, name in ((ARDUINO_LOCK, "arduino"), (BT_LOCK, "bt_serial")):
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                port = globals()[name]
+                if port and port.in_waiting:
+                    port.read(port.in_waiting)  # 모두 버리기
+            except: pass
+            finally:
+                lock.release()
 
     # ===== 전송 페이로드 생성 (분리) =====
     def _build_payloads(self, pred_class: str, angle):
@@ -557,36 +702,38 @@ class App(QMainWindow):
         # BT: 원문 케이스 (Siren/Horn)
         cls_bt = pred_class if pred_class in ("Siren", "Horn") else "None"
         msg_bt = f"{cls_bt},{ang}\n".encode('utf-8')
-
-        print(f"[TX-READY] {token_arduino},{ang}")
         return msg_arduino, msg_bt
 
     # ===== 즉시 전송 함수(직접 write+flush, 실패 시 큐 폴백) =====
+    # EventBus sink 스레드에서 호출됨 → RX 읽기는 GUI 스레드의 _rx_timer만 수행(pyserial 동시 접근 방지)
+    # 전송 로그는 _log_detection(로그 sink)이 남김 → 여기서는 print 하지 않음(쓰기 지연 방지)
     def _send_arduino_now(self, payload: bytes):
-        self._drain_serial_rx()  # 전송 직전 RX 드레인
         try:
-            if arduino:
-                arduino.write(payload)
-                try: arduino.flush()
-                except: pass
-                print(f"[ARDUINO<=] {payload!r}")
-                return True
+            with ARDUINO_LOCK:
+                if arduino:
+                    t0 = time.perf_counter()
+                    arduino.write(payload)
+                    try: arduino.flush()
+                    except: pass
+                    METRICS.observe("serial_write_arduino", time.perf_counter() - t0)
+                    return True
         except Exception as e:
-            self.statusBar().showMessage(f"아두이노 전송 오류: {e}")
+            self.sig_status.emit(f"아두이노 전송 오류: {e}")
         if hasattr(self, 'tx') and self.tx: self.tx.q.put(("arduino", payload))
         return False
 
     def _send_bt_now(self, payload: bytes):
-        self._drain_serial_rx()  # 전송 직전 RX 드레인
         try:
-            if bt_serial:
-                bt_serial.write(payload)
-                try: bt_serial.flush()
-                except: pass
-                print(f"[BT<=] {payload!r}")
-                return True
+            with BT_LOCK:
+                if bt_serial:
+                    t0 = time.perf_counter()
+                    bt_serial.write(payload)
+                    try: bt_serial.flush()
+                    except: pass
+                    METRICS.observe("serial_write_bt", time.perf_counter() - t0)
+                    return True
         except Exception as e:
-            self.statusBar().showMessage(f"BT 전송 오류: {e}")
+            self.sig_status.emit(f"BT 전송 오류: {e}")
         if hasattr(self, 'tx') and self.tx: self.tx.q.put(("bt", payload))
         return False
 
@@ -599,6 +746,8 @@ class App(QMainWindow):
             return
 
         # 토글 ON: 마이크 GIF는 SimpleToggleLabel이 이미 ON, SPEAK 표시 후 1회 STT
+        if self.result_img.pixmap().isNull():
+            self.result_img.setPixmap(QPixmap.fromImage(ASSETS.image(RESULT_IMG, RESULT_IMAGE_RECT[2:])))
         self.result_img.show()
 
         if self._stt_busy:
@@ -657,6 +806,9 @@ class App(QMainWindow):
     @Slot(object)
     def on_cam_frame(self, qimg):
         self.camera_label.setPixmap(QPixmap.fromImage(qimg))
+        if self._cam_onset_ts is not None:
+            METRICS.observe("sound_to_camera", time.time() - self._cam_onset_ts)
+            self._cam_onset_ts = None
 
     @Slot()
     def on_cam_done(self):
@@ -664,6 +816,10 @@ class App(QMainWindow):
         self.camera_label.hide()
         self.ui.hearo_anim.show()
 
+        # preroll 카메라를 직전 이벤트 방향으로 옮김(장치 재오픈은 별도 스레드에서)
+        if self.preroll and self._last_cam_path and self._last_cam_path != self.preroll.device:
+            threading.Thread(target=self.preroll.switch, args=(self._last_cam_path,), daemon=True).start()
+
         # 표시 리셋(다음 감지 대기)
         self.sound_caption.setText("소리 종류")
         self.dir_caption.setText("소리 방향")
@@ -676,29 +832,68 @@ class App(QMainWindow):
             self.det.set_audio_enabled(True)
         self.statusBar().showMessage("카메라 종료 — 감지 재개")
 
-    # ===== 감지 시그널: 전송 → 카메라 → GUI =====
-    @Slot(str, float, int)
-    def on_detection(self, pred_class, prob, angle):
+    # ===== 감지 시그널: 래치 → EventBus 팬아웃(전송/로그 비동기, 카메라/GUI inline) =====
+    @Slot(str, float, int, float, float, int, float, float, float)
+    def on_detection(self, pred_class, conf, angle, onset_ts, det_ts, cid,
+                     doa_conf=0.0, doa_rate=0.0, level_rate=0.0):
+        TRACER.flow_end("sig_detection", cid)
         # 스플래시 중(워커 시작 전) 보호
-        if self.det is None:
+        if self.det is None or self.bus is None:
             return
 
         # 이미 카메라 동작 중이면 새 이벤트는 무시(7초 윈도우)
         if self._camera_active or self._frozen_detection:
             return
 
-        # 임계 체크(클래스별) + None 무시
-        thr_map = {'Horn': 0.94, 'Siren': 0.94}
-        if pred_class not in thr_map or prob < thr_map[pred_class]:
+        # 임계/확정은 워커의 PosteriorTracker가 담당 → 여기서는 대상 클래스만 통과
+        if pred_class not in TRACK_TARGETS:
             return
 
-        # === 1) 먼저 전송 (Arduino/BT 각각 형식 분리) ===
-        payload_arduino, payload_bt = self._build_payloads(pred_class, angle)
-        self._send_arduino_now(payload_arduino)
-        self._send_bt_now(payload_bt)
+        try:
+            ang = int(angle) % 360
+        except Exception:
+            ang = 0
+
+        # 라치: 이번 7초 동안 같은 이벤트 재처리 방지
+        self._frozen_detection = True
+        self._frozen_class = pred_class
+        self._frozen_angle = f"{ang}°"
 
-        # === 2) 카메라 즉시 시작 ===
-        cam_path, _ = self._select_camera_safe(angle)
+        with METRICS.time("dispatch"), TRACER.span("dispatch", cid):
+            self.bus.publish(DetectionEvent(pred_class, conf, ang, onset_ts, det_ts, cid,
+                                            doa_conf, doa_rate, level_rate))
+
+    # ===== governor knob 적용(governor 스레드에서 호출, 값 대입만 수행) =====
+    def _apply_governor(self, knobs):
+        if self.det:
+            self.det.set_hop_sec(knobs["hop_sec"])
+            self.det.set_screen_boost(knobs["screen_boost"])
+        if self.cam:
+            self.cam.set_profile(knobs["cam_w"], knobs["cam_h"], knobs["cam_fps"])
+        set_blas_threads(knobs["threads"])
+
+    # --- sink: Arduino/BT 전송 (각 전용 스레드) ---
+    def _on_arduino_event(self, ev):
+        if self._send_arduino_now(self._build_payloads(ev.cls, ev.angle)[0]):
+            METRICS.observe("sound_to_led", time.time() - ev.onset_ts)
+
+    def _on_bt_event(self, ev):
+        if self._send_bt_now(self._build_payloads(ev.cls, ev.angle)[1]):
+            METRICS.observe("sound_to_hud", time.time() - ev.onset_ts)
+
+    def _collect_queue_depths(self):
+        out = {"tx_queue_depth": self.tx.q.qsize() if self.tx else 0}
+        if self.bus:
+            for name, st in self.bus.stats().items():
+                out[f"sink_{name}_queue_depth"] = st["queue"]
+                out[f"sink_{name}_dropped"] = st["dropped"]
+                if st["p50_ms"] is not None:
+                    out[f"sink_{name}_latency_p50_ms"] = round(st["p50_ms"], 3)
+        return out
+
+    # --- sink: 카메라 즉시 시작 (GUI 스레드 inline) ---
+    def _on_camera_event(self, ev):
+        cam_path, _ = self._select_camera_safe(ev.angle)
         if cam_path:
             self.det.set_audio_enabled(False)  # 카메라 동안 감지 정지(마이크 STT에는 영향 없음)
             self.det.reset_buffer()
@@ -706,22 +901,39 @@ class App(QMainWindow):
             self.ui.hearo_anim.hide()
             self.camera_label.show()
             self._camera_active = True
+            self._cam_onset_ts = ev.onset_ts
+            self._last_cam_path = cam_path
             self.statusBar().showMessage("카메라 동작(7초)")
-            self.camera_request.emit(cam_path, 7000)
+            TRACER.flow_start("camera_request", ev.cid)
+            self.camera_request.emit(cam_path, int(ALERT_HOLD_SEC * 1000), ev.cid)
+
+    # --- sink: GUI 텍스트 갱신 (GUI 스레드 inline) ---
+    def _on_gui_event(self, ev):
+        self.sound_caption.setText(f"{ev.cls}")
+        self.dir_caption.setText(f"{ev.angle}° 접근" if ev.level_rate >= APPROACH_DB_S else f"{ev.angle}°")
 
-        # === 3) GUI 텍스트 즉시 갱신 ===
+    # --- sink: 로그 (전용 스레드) ---
+    def _log_detection(self, ev):
+        print(f"[DET] {ev.cls},{ev.angle} conf={ev.conf:.2f} doa_conf={ev.doa_conf:.2f} "
+              f"{ev.doa_rate:+.0f}°/s {ev.level_rate:+.1f}dB/s onset→det={(ev.det_ts - ev.onset_ts) * 1000:.0f}ms")
+
+    # ===== 트레이스 덤프(숨김 버튼 길게 누르기 / SIGUSR1) =====
+    @Slot()
+    def dump_trace(self):
+        if not TRACER.enabled:
+            self.statusBar().showMessage("트레이스 비활성(EARS_TRACE=1로 실행)")
+            return
         try:
-            ang = int(angle) % 360
-            ang_text = f"{ang}°"
-        except Exception:
-            ang_text = ""
-        self.sound_caption.setText(f"{pred_class}")
-        self.dir_caption.setText(ang_text)
+            path = TRACER.dump(os.path.join(TRACE_DIR, time.strftime("trace_%Y%m%d_%H%M%S.json")))
+            print("[TRACE] 저장:", path)
+        except Exception as e:
+            print("[TRACE] 저장 실패:", e)
 
-        # 라치: 이번 7초 동안 같은 이벤트 재처리 방지
-        self._frozen_detection = True
-        self._frozen_class = pred_class
-        self._frozen_angle = ang_text
+    # ===== flight recorder 수동 스냅샷(오탐/미탐 현장 기록) =====
+    @Slot()
+    def snapshot_flight(self):
+        if self.flight and self.flight.snapshot("manual"):
+            self.statusBar().showMessage("flight 스냅샷 저장 요청")
 
     # ===== 각도 안전 정규화 + 카메라 선택 =====
     def _select_camera_safe(self, angle):
@@ -729,27 +941,73 @@ class App(QMainWindow):
             angle = int(angle) % 360
         except Exception:
             angle = 0
-        if 0 <= angle <= 90:   return CAMERA_FRONT, "전방좌측"
-        if 91 <= angle <= 180: return CAMERA_LEFT,  "후방좌측"
-        if 181 <= angle <= 270:return CAMERA_BACK,  "후방우측"
-        if 271 <= angle <= 360:return CAMERA_RIGHT, "전방우측"
-        return None, "잘못된 각도"
+        if 0 <= angle <= 90:   i = 0
+        elif angle <= 180:     i = 1
+        elif angle <= 270:     i = 2
+        else:                  i = 3
+        cams = ((CAMERA_FRONT, "전방좌측"), (CAMERA_LEFT, "후방좌측"), (CAMERA_BACK, "후방우측"), (CAMERA_RIGHT, "전방우측"))
+        # 분리된 카메라면 인접 방향(가까운 쪽 먼저) → 반대 방향 순으로 대체(레지스트리 캐시 조회)
+        for k in (0, 1, -1, 2):
+            path, label = cams[(i + k) % 4]
+            if DEVICES.present("camera", path):
+                return path, label if k == 0 else f"{label}(대체)"
+        return cams[i]
+
+    # ===== 장치 핫플러그 =====
+    @Slot(str, str, bool)
+    def _on_device_change(self, kind, key, present):
+        self.statusBar().showMessage(f"{kind} {key} {'연결됨' if present else '분리됨'}")
+        if kind == "camera" and self.preroll and key == self.preroll.device:
+            # 분리 → 정지, 재연결 → 다시 시작(재열기 한도를 넘겨 종료된 스레드도 여기서 복구)
+            target = self.preroll.start if present else self.preroll.stop
+            threading.Thread(target=target, daemon=True).start()
+        elif kind == "tty" and key in (ARDUINO_PORT, BT_PORT):
+            # 아두이노는 오픈 시 2초 리셋 대기 → GUI 스레드 밖에서 재오픈
+            threading.Thread(target=self._reopen_serial, args=(key, present), daemon=True).start()
+
+    def _reopen_serial(self, port, present):
+        # 별도 스레드에서 실행: 교체/핸드셰이크는 해당 포트 락 안에서(sink 전송·RX 드레인과 겹치지 않게),
+        # 아두이노 리셋 대기(2초)가 있는 오픈 자체는 락 밖에서
+        global arduino, bt_serial
+        lock = ARDUINO_LOCK if port == ARDUINO_PORT else BT_LOCK
+        with lock:
+            old = arduino if port == ARDUINO_PORT else bt_serial
+            if port == ARDUINO_PORT:
+                arduino = None
+                if self.tx: self.tx.arduino = None
+            else:
+                bt_serial = None
+                if self.tx: self.tx.bt = None
+            try:
+                if old: old.close()
+            except Exception: pass
+        new = (_open_arduino() if port == ARDUINO_PORT else _open_bt()) if present else None
+        with lock:
+            if port == ARDUINO_PORT:
+                arduino = new
+                if self.tx: self.tx.arduino = new
+                if new: self._handshake_and_init()
+            else:
+                bt_serial = new
+                if self.tx: self.tx.bt = new
 
     # ===== 스플래시/아두이노 =====
     def _handshake_and_init(self):
-        if not arduino: return
-        try:
-            ok = False
-            for _ in range(10):
-                arduino.write(b'ping\n'); time.sleep(0.2)
-                if arduino.in_waiting:
-                    res = arduino.readline().decode('utf-8', 'ignore').strip()
-                    if res == 'pong': ok = True; break
-            print("[아두이노 핸드셰이크]", "성공" if ok else "실패")
-            if ok:
-                arduino.write(b"INIT\n"); time.sleep(0.05); arduino.reset_input_buffer()
-        except Exception as e:
-            print("[아두이노 핸드셰이크 오류]", e)
+        # 아두이노 락만 보유 → _drain_serial_rx는 아두이노만 건너뛰어 pong을 가로채지 않고, BT 전송은 계속됨
+        with ARDUINO_LOCK:
+            if not arduino: return
+            try:
+                ok = False
+                for _ in range(10):
+                    arduino.write(b'ping\n'); time.sleep(0.2)
+                    if arduino.in_waiting:
+                        res = arduino.readline().decode('utf-8', 'ignore').strip()
+                        if res == 'pong': ok = True; break
+                print("[아두이노 핸드셰이크]", "성공" if ok else "실패")
+                if ok:
+                    arduino.write(b"INIT\n"); time.sleep(0.05); arduino.reset_input_buffer()
+            except Exception as e:
+                print("[아두이노 핸드셰이크 오류]", e)
 
     def closeEvent(self, e):
         try:
@@ -767,6 +1025,19 @@ class App(QMainWindow):
         if self.stt_thread:
             try: self.stt_thread.quit(); self.stt_thread.wait(1500)
             except: pass
+        try:
+            if self.bus: self.bus.stop()
+        except: pass
+        try:
+            if self.flight: self.flight.stop()
+        except: pass
+        try:
+            if self.governor: self.governor.stop()
+        except: pass
+        DEVICES.stop()
+        try:
+            if self.preroll: self.preroll.stop()
+        except: pass
         try:
             if self.tx: self.tx.stop()
             if self.tx_thread: self.tx_thread.quit(); self.tx_thread.wait(1500)
@@ -823,7 +1094,12 @@ if __name__ == "__main__":
     # (선택) 전역 커서 숨김이 필요하면 주석 해제
     # app.setOverrideCursor(Qt.BlankCursor)
 
+    # repaint/GUI 루프 지연/RSS 측정(before/after 비교: HUD_CACHED_RENDER 전환 후 /metrics 확인)
+    if HUD_PROFILE: PaintProfiler(app)
+
     win = App()
+    # SIGUSR1 → 트레이스 덤프(kill -USR1 <pid>)
+    signal.signal(signal.SIGUSR1, lambda *_: QTimer.singleShot(0, win.dump_trace))
 
     # 완전 전체화면으로 표시(상태바/패널까지 덮음)
     win.showFullScreen()
@@ -0,0 +1,132 @@
+# ========================== alloc_audit.py ==========================
+# - AllocAudit: (EARS_ALLOC_AUDIT=1) 감지 루프의 세그먼트별 메모리 할당 감사
+#   · begin()/end()로 세그먼트 1개를 감싸면 tracemalloc peak(일시 할당)·net(남은 증가량)을 KB로 기록
+#     → METRICS 게이지 alloc_seg_peak_kb / alloc_seg_net_kb, 누적 alloc_seg_peak_kb_max
+#   · every 세그먼트마다 스냅샷 비교로 할당 위치 상위 top개 출력(churn/누수 위치 확인)
+#   · gc.callbacks로 GC 세대별 횟수(gc_gen0..2)와 정지 시간(gc_pause) 기록
+#   · tracemalloc 자체가 느리므로(수 배) 지연 측정과 함께 켜지 말 것
+# - CLI(회귀 확인): 합성 int32 세그먼트로 전처리(+모델) 경로만 실행해 세그먼트당 peak/net/GC 출력
+#   python alloc_audit.py [--n 200] [--model model.npz] [--max-kb 0]   # max-kb 초과 시 종료 코드 1
+
+import gc, os, sys, time, tracemalloc
+from collections import deque
+from metrics import METRICS
+
+ENABLED = os.environ.get("EARS_ALLOC_AUDIT", "0") == "1"
+
+
+class AllocAudit:
+    def __init__(self, every=200, top=5, keep=4096):
+        self.every, self.top = every, top
+        self.n = 0
+        self.peaks = deque(maxlen=keep)    # KB
+        self.nets = deque(maxlen=keep)     # KB
+        self.gc_counts = [0, 0, 0]
+        self.gc_pause_max = 0.0
+        self._cur0 = 0
+        self._gc_t0 = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._snap = self._snapshot() if every else None
+        gc.callbacks.append(self._on_gc)
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),          # 감사 자체의 기록(deque 등)
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def begin(self):
+        tracemalloc.reset_peak()
+        self._cur0 = tracemalloc.get_traced_memory()[0]
+
+    def end(self):
+        cur, peak = tracemalloc.get_traced_memory()
+        peak_kb = (peak - self._cur0) / 1024.0
+        net_kb = (cur - self._cur0) / 1024.0
+        self.peaks.append(peak_kb)
+        self.nets.append(net_kb)
+        self.n += 1
+        METRICS.gauge("alloc_seg_peak_kb", round(peak_kb, 1))
+        METRICS.gauge("alloc_seg_net_kb", round(net_kb, 1))
+        METRICS.gauge("alloc_seg_peak_kb_max", round(max(self.peaks), 1))
+        if self.every and self.n % self.every == 0:
+            self.report_top()
+        return peak_kb, net_kb
+
+    def report_top(self):
+        snap = self._snapshot()
+        diff = snap.compare_to(self._snap, "lineno")[:self.top]
+        self._snap = snap
+        print(f"[ALLOC] 세그먼트 {self.n}: 직전 스냅샷 대비 상위 {len(diff)}개 할당 위치")
+        for st in diff:
+            fr = st.traceback[0]
+            print(f"  {os.path.basename(fr.filename)}:{fr.lineno}  {st.size_diff / 1024:+.1f} KB "
+                  f"({st.count_diff:+d} blocks, 현재 {st.size / 1024:.1f} KB)")
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_t0 = time.perf_counter()
+        elif self._gc_t0 is not None:
+            dt = time.perf_counter() - self._gc_t0
+            self._gc_t0 = None
+            gen = info.get("generation", 0)
+            self.gc_counts[gen] += 1
+            self.gc_pause_max = max(self.gc_pause_max, dt)
+            METRICS.observe("gc_pause", dt)
+            METRICS.inc(f"gc_gen{gen}")
+
+    def summary(self):
+        p = sorted(self.peaks)
+        return dict(segments=self.n,
+                    peak_kb_p50=p[len(p) // 2] if p else 0.0, peak_kb_max=p[-1] if p else 0.0,
+                    net_kb_sum=sum(self.nets), gc=list(self.gc_counts),
+                    gc_pause_max_ms=self.gc_pause_max * 1000)
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        tracemalloc.stop()
+
+
+def _run(n=200, model_path=None, max_kb=0.0):
+    import numpy as np
+    from features import FeatureExtractor
+    fx = FeatureExtractor()
+    model = None
+    if model_path:
+        from numpy_cnn import load_model
+        model = load_model(model_path)
+    rng = np.random.default_rng(0)
+    # 마이크 콜백이 넘기는 것과 같은 float32(int32 스케일) 세그먼트
+    segs = [(rng.standard_normal(fx.seg_samples) * 2e8).astype(np.float32) for _ in range(8)]
+    fx(segs[0])                                   # 워밍업(지연 초기화 할당 제외)
+    if model is not None:
+        model.predict(fx.x, verbose=0)
+    audit = AllocAudit(every=max(1, n // 2))
+    for i in range(n):
+        audit.begin()
+        fx(segs[i % len(segs)])
+        if model is not None:
+            model.predict(fx.x, verbose=0)
+        audit.end()
+    s = audit.summary()
+    audit.close()
+    print(f"[alloc] segments {s['segments']} | peak/seg p50 {s['peak_kb_p50']:.1f} KB max {s['peak_kb_max']:.1f} KB "
+          f"| net {s['net_kb_sum']:+.1f} KB | gc {s['gc']} (max pause {s['gc_pause_max_ms']:.2f} ms)")
+    return not max_kb or s["peak_kb_max"] <= max_kb
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    opts = {}
+    for k in ("--n", "--model", "--max-kb"):
+        if k in args:
+            i = args.index(k); opts[k] = args[i + 1]; del args[i:i + 2]
+    if args:
+        print("usage: alloc_audit.py [--n 200] [--model model.npz] [--max-kb 0]")
+        sys.exit(2)
+    ok = _run(int(opts.get("--n", 200)), opts.get("--model"), float(opts.get("--max-kb", 0)))
+    sys.exit(0 if ok else 1)
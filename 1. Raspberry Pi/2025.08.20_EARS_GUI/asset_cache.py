@@ -0,0 +1,201 @@
+# ========================== asset_cache.py ==========================
+# - AssetCache: 원본 이미지(PNG/JPG) → 표시 사각형 크기로 미리 축소한 PNG
+#               GIF → 표시 크기 프레임을 세로로 이어 붙인 시트(PNG) + 프레임 지연(JSON)
+#   · 캐시 키 = 원본 내용 sha1 + 목표 크기 + 모드 → 원본 교체/사각형 변경 시 자동으로 새로 생성
+#   · 원본 sha1은 (경로, 크기, mtime)별로 index.json에 기억 → 부팅 때 원본을 다시 읽지 않음
+#   · 캐시 미스: 그 자리에서 축소해 반환 + 백그라운드로 파일 기록(다음 부팅부터 적중)
+#   · QImage만 다룸(스레드 안전) → QPixmap 변환은 GUI 스레드에서
+# - decode_frames(path, size): GIF 프레임을 표시 크기로 디코드 [(QImage, delay_ms)]
+# - CLI (설치 시 미리 생성)
+#   python asset_cache.py build <cache_dir> <src>:<W>x<H>[:keep|stretch|frames] ...
+#   python asset_cache.py stats <cache_dir>
+
+import hashlib, json, os, sys, threading, time
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageReader, QPainter
+from metrics import METRICS
+
+MODES = ("keep", "stretch", "frames")
+
+
+def decode_frames(path, size):
+    w, h = size
+    reader = QImageReader(path)
+    frames = []
+    while True:
+        img = reader.read()
+        if img.isNull():
+            break
+        delay = max(20, reader.nextImageDelay() or 100)
+        img = img.scaled(w, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        frames.append((img.convertToFormat(QImage.Format_ARGB32_Premultiplied), delay))
+        if not reader.canRead():
+            break
+    return frames
+
+
+class AssetCache:
+    def __init__(self, cache_dir):
+        self.dir = cache_dir
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(cache_dir, "index.json")
+        try:
+            with open(self._index_path) as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    # ---------- 키 ----------
+    def _src_hash(self, src):
+        st = os.stat(src)
+        k = f"{os.path.abspath(src)}|{st.st_size}|{st.st_mtime_ns}"
+        with self._lock:
+            h = self._index.get(k)
+        if h is None:
+            sha = hashlib.sha1()
+            with open(src, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(chunk)
+            h = sha.hexdigest()
+            with self._lock:
+                self._index[k] = h
+            self._write_async(self._index_path, self._save_index)
+        return h
+
+    def _base(self, src, size, mode):
+        return os.path.join(self.dir, f"{self._src_hash(src)[:16]}_{size[0]}x{size[1]}_{mode}")
+
+    # ---------- 기록(.part → os.replace) ----------
+    def _save_index(self, tmp):
+        with self._lock:
+            data = json.dumps(self._index)
+        with open(tmp, "w") as f:
+            f.write(data)
+        return True
+
+    def _write_async(self, path, write_fn):
+        def _run():
+            try:
+                os.makedirs(self.dir, exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.part"
+                if write_fn(tmp):
+                    os.replace(tmp, path)
+                elif os.path.exists(tmp):
+                    os.remove(tmp)
+            except Exception as e:
+                print("[ASSET] 캐시 기록 실패:", path, e)
+        t = threading.Thread(target=_run, name="asset-writer", daemon=True)
+        t.start()
+        return t
+
+    # ---------- 조회 ----------
+    def image(self, src, size, keep_aspect=True):
+        """size(w, h)로 축소된 QImage. 원본이 없으면 null QImage."""
+        mode = "keep" if keep_aspect else "stretch"
+        t0 = time.perf_counter()
+        try:
+            path = self._base(src, size, mode) + ".png"
+        except OSError:
+            return QImage()
+        img = QImage(path) if os.path.exists(path) else QImage()
+        if img.isNull():
+            METRICS.inc("asset_cache_miss")
+            img = QImage(src)
+            if img.isNull():
+                return img
+            img = img.scaled(size[0], size[1], Qt.KeepAspectRatio if keep_aspect else Qt.IgnoreAspectRatio,
+                             Qt.SmoothTransformation)
+            out = img.copy()
+            self._write_async(path, lambda tmp: out.save(tmp, "PNG"))
+        else:
+            METRICS.inc("asset_cache_hit")
+        METRICS.observe("asset_load", time.perf_counter() - t0)
+        return img
+
+    def frames(self, src, size):
+        """GIF → [(QImage(size), delay_ms)]. 캐시가 있으면 시트 1장만 디코드."""
+        t0 = time.perf_counter()
+        try:
+            base = self._base(src, size, "frames")
+        except OSError:
+            return []
+        w, h = size
+        frames = []
+        if os.path.exists(base + ".json") and os.path.exists(base + ".png"):
+            try:
+                with open(base + ".json") as f:
+                    delays = json.load(f)["delays"]
+                sheet = QImage(base + ".png").convertToFormat(QImage.Format_ARGB32_Premultiplied)
+                if sheet.height() == h * len(delays):
+                    frames = [(sheet.copy(0, i * h, w, h), d) for i, d in enumerate(delays)]
+            except (OSError, ValueError, KeyError):
+                frames = []
+        if frames:
+            METRICS.inc("asset_cache_hit")
+        else:
+            METRICS.inc("asset_cache_miss")
+            frames = decode_frames(src, size)
+            if frames:
+                self._write_sheet(base, frames, size)
+        METRICS.observe("asset_load", time.perf_counter() - t0)
+        return frames
+
+    def _write_sheet(self, base, frames, size):
+        w, h = size
+        sheet = QImage(w, h * len(frames), QImage.Format_ARGB32_Premultiplied)
+        sheet.fill(Qt.transparent)
+        p = QPainter(sheet)
+        for i, (img, _) in enumerate(frames):
+            p.drawImage(0, i * h, img)
+        p.end()
+        delays = [d for _, d in frames]
+        # PNG 먼저 기록 후 JSON → JSON이 있으면 시트도 완성된 상태
+        t = self._write_async(base + ".png", lambda tmp: sheet.save(tmp, "PNG"))
+        def _meta(tmp):
+            t.join()
+            with open(tmp, "w") as f:
+                json.dump({"delays": delays}, f)
+            return True
+        self._write_async(base + ".json", _meta)
+
+    def build(self, specs):
+        # specs: [(src, (w, h), mode)] — 없는 항목만 생성(이미 있으면 적중만 확인)
+        for src, size, mode in specs:
+            if mode == "frames":
+                self.frames(src, size)
+            else:
+                self.image(src, size, keep_aspect=(mode == "keep"))
+
+
+def _parse_spec(arg):
+    parts = arg.rsplit(":", 2)
+    if len(parts) == 3 and parts[2] in MODES:
+        src, wh, mode = parts
+    else:
+        (src, wh), mode = arg.rsplit(":", 1), "keep"
+    w, h = (int(v) for v in wh.lower().split("x"))
+    if mode == "keep" and src.lower().endswith(".gif"):
+        mode = "frames"
+    return src, (w, h), mode
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == "build":
+        from PySide6.QtGui import QGuiApplication
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QGuiApplication(sys.argv[:1])
+        cache = AssetCache(sys.argv[2])
+        t0 = time.perf_counter()
+        cache.build([_parse_spec(a) for a in sys.argv[3:]])
+        for t in threading.enumerate():
+            if t.name == "asset-writer": t.join()
+        print(f"[build] {len(sys.argv) - 3} assets in {(time.perf_counter() - t0) * 1000:.0f} ms → {sys.argv[2]}")
+    elif len(sys.argv) == 3 and sys.argv[1] == "stats":
+        files = [f for f in os.listdir(sys.argv[2]) if f.endswith(".png")]
+        total = sum(os.path.getsize(os.path.join(sys.argv[2], f)) for f in files)
+        print(f"[stats] {len(files)} images, {total / 1024:.0f} KiB")
+        for f in sorted(files): print("  ", f)
+    else:
+        print("usage: asset_cache.py build <cache_dir> <src>:<W>x<H>[:keep|stretch|frames] ...\n"
+              "       asset_cache.py stats <cache_dir>")
+        sys.exit(2)
@@ -0,0 +1,189 @@
+# ========================== cascade.py ==========================
+# - CascadeModel: 소형 스크리닝 모델 → (Siren+Horn 점수 ≥ 임계일 때만) 본 감마톤 CNN
+#   · 스크리너 입력은 본 모델 특징(64x60)을 평균 풀링한 저해상도(예: 32x30) → 감마톤 재계산 없음
+#   · predict()는 Keras/NumpyCNN과 같은 인터페이스: 통과 못 한 윈도우는 스크리너 확률을 그대로 반환
+#   · target_idx / screen_score(): 대상 클래스 인덱스와 스크리너 점수(오프라인 tune/report도 같은 값 사용)
+# - CLI (개발 PC)
+#   python cascade.py distill <teacher> <features...> <out.npz>      # 본 모델 soft label로 스크리너 학습(TF 필요)
+#   python cascade.py tune    <teacher> <screener.npz> <features...> [--recall 0.99]   # 임계 자동 선택
+#   python cascade.py report  <teacher> <screener.npz> <features...> [--thr 0.15] [--hop 0.3]
+#       → 오디오 1초당 평균 추론 비용, 통과율, 단일 모델 대비 recall(윈도우/이벤트)
+#   features: flight recorder 스냅샷(.npz, 'features') 또는 (N, 64, 60) .npy
+
+import sys, time
+import numpy as np
+from numpy_cnn import load_model
+
+TARGETS = ('Horn', 'Siren')
+
+
+class CascadeModel:
+    def __init__(self, screener, full, class_names, threshold=0.15, targets=TARGETS):
+        self.screener, self.full = screener, full
+        self.threshold = threshold
+        self.target_idx = np.array([list(class_names).index(c) for c in targets], dtype=np.intp)
+        H, W = _hw(full)
+        h, w = _hw(screener)
+        if H % h or W % w:
+            raise ValueError(f"스크리너 입력 {h}x{w}는 본 입력 {H}x{W}의 정수배 축소여야 합니다")
+        self._fh, self._fw = H // h, W // w
+        self._small = np.empty((1, h, w, 1), dtype=np.float32)
+        self.calls = 0
+        self.passed = 0
+
+    def screen(self, x):
+        # x: (1, H, W, 1) → 평균 풀링한 저해상도 입력으로 스크리너 실행
+        h, w = self._small.shape[1:3]
+        x[0, :, :, 0].reshape(h, self._fh, w, self._fw).mean(axis=(1, 3), out=self._small[0, :, :, 0])
+        return self.screener.predict(self._small, verbose=0)
+
+    def screen_score(self, p):
+        # 스크리너 확률 → 대상 클래스(Siren+Horn) 합
+        return float(p[0, self.target_idx].sum())
+
+    def predict(self, x, verbose=0):
+        self.calls += 1
+        p = self.screen(x)
+        if self.screen_score(p) < self.threshold:
+            return p
+        self.passed += 1
+        return self.full.predict(x, verbose=0)
+
+    @property
+    def pass_rate(self):
+        return self.passed / self.calls if self.calls else 0.0
+
+
+def _hw(model):
+    # Keras: (None, H, W, C) / NumpyCNN: (H, W, C)
+    shape = tuple(model.input_shape)
+    if shape[0] is None: shape = shape[1:]
+    return shape[0], shape[1]
+
+
+# ===================== 오프라인 도구 =====================
+def _load_features(paths):
+    # 파일별 (N, 64, 60) 시퀀스 목록(이벤트 단위 평가를 위해 파일 경계 유지)
+    seqs = []
+    for p in paths:
+        if p.endswith(".npz"):
+            with np.load(p, allow_pickle=False) as z:
+                f = z["features"]
+        else:
+            f = np.load(p, mmap_mode="r")
+        if len(f):
+            seqs.append(np.asarray(f, dtype=np.float32))
+    return seqs
+
+
+def distill(teacher_path, feature_paths, out_path, small=(32, 30), epochs=20, T=2.0):
+    import tensorflow as tf
+    from numpy_cnn import export_npz
+    teacher = load_model(teacher_path)
+    x = np.concatenate(_load_features(feature_paths))[..., None]
+    y = teacher.predict(x, verbose=0)
+    # 온도 T로 부드럽게 만든 teacher 확률을 타깃으로 사용
+    y = np.exp(np.log(np.clip(y, 1e-7, 1.0)) / T); y /= y.sum(axis=1, keepdims=True)
+    fh, fw = x.shape[1] // small[0], x.shape[2] // small[1]
+    xs = x[..., 0].reshape(len(x), small[0], fh, small[1], fw).mean(axis=(2, 4))[..., None]
+
+    L = tf.keras.layers
+    model = tf.keras.Sequential([
+        L.Conv2D(8, 3, padding="same", input_shape=(small[0], small[1], 1)),
+        L.BatchNormalization(), L.Activation("relu"), L.MaxPooling2D(2),
+        L.Conv2D(16, 3, padding="same"), L.BatchNormalization(), L.Activation("relu"), L.MaxPooling2D(2),
+        L.Flatten(), L.Dense(16, activation="relu"), L.Dense(y.shape[1], activation="softmax"),
+    ])
+    model.compile(optimizer="adam", loss="categorical_crossentropy")
+    model.fit(xs, y, epochs=epochs, batch_size=64, validation_split=0.1, verbose=2)
+
+    # export_npz는 SavedModel 경로를 받으므로 임시 디렉터리에 저장 후 변환(BN 접기 포함)
+    import tempfile, os
+    with tempfile.TemporaryDirectory() as d:
+        sm = os.path.join(d, "screener")
+        model.save(sm)
+        return export_npz(sm, out_path)
+
+
+def _scores(full, screener, seqs, class_names, on_thr):
+    # 윈도우별 단일 모델 hit 여부 + 스크리너 점수(Siren+Horn)
+    casc = CascadeModel(screener, full, class_names)
+    hits, scores = [], []
+    for seq in seqs:
+        for f in seq:
+            x = f[None, :, :, None]
+            hits.append(full.predict(x, verbose=0)[0, casc.target_idx].max() >= on_thr)
+            scores.append(casc.screen_score(casc.screen(x)))
+    return np.array(hits, dtype=bool), np.array(scores)
+
+
+def tune(teacher_path, screener_path, feature_paths, recall=0.99, class_names=None):
+    from posterior_tracker import PosteriorTracker
+    class_names = class_names or ['Horn', 'None', 'Siren']
+    on_thr = PosteriorTracker(class_names).on_thr
+    hits, scores = _scores(load_model(teacher_path), load_model(screener_path),
+                           _load_features(feature_paths), class_names, on_thr)
+    if not hits.any():
+        print("[tune] 양성 윈도우가 없어 임계를 정할 수 없습니다"); return None
+    # 양성 윈도우 점수의 (1-recall) 분위수 → 이 값 이상이면 목표 recall 유지
+    thr = float(np.quantile(scores[hits], 1.0 - recall))
+    print(f"[tune] threshold {thr:.4f} (recall ≥ {recall * 100:.1f}%), "
+          f"본 모델 통과율 {np.mean(scores >= thr) * 100:.1f}%")
+    return thr
+
+
+def report(teacher_path, screener_path, feature_paths, threshold=0.15, hop_sec=0.3, class_names=None):
+    from posterior_tracker import PosteriorTracker
+    class_names = class_names or ['Horn', 'None', 'Siren']
+    full = load_model(teacher_path)
+    screener = load_model(screener_path)
+    casc = CascadeModel(screener, full, class_names, threshold)
+    idx = casc.target_idx
+    seqs = _load_features(feature_paths)
+
+    t_single = t_casc = 0.0
+    n = tp = pos = 0
+    ev_single = ev_casc = ev_match = 0
+    for seq in seqs:
+        tr_s, tr_c = PosteriorTracker(class_names), PosteriorTracker(class_names)
+        on_s, on_c = [], []
+        for i, f in enumerate(seq):
+            x = f[None, :, :, None]
+            t0 = time.perf_counter(); ps = full.predict(x, verbose=0)[0]; t1 = time.perf_counter()
+            pc = casc.predict(x, verbose=0)[0]; t2 = time.perf_counter()
+            t_single += t1 - t0; t_casc += t2 - t1; n += 1
+            # 윈도우 recall: 단일 모델이 hit(on_thr)인 윈도우를 캐스케이드도 hit로 보는지
+            if ps[idx].max() >= tr_s.on_thr:
+                pos += 1; tp += int(pc[idx].max() >= tr_s.on_thr)
+            es = tr_s.update(ps, i * hop_sec); ec = tr_c.update(pc, i * hop_sec)
+            if es is not None: on_s.append((i, es[0]))
+            if ec is not None: on_c.append((i, ec[0]))
+        # 이벤트 recall: 같은 클래스가 ±2 윈도우 안에 확정되면 일치
+        ev_single += len(on_s); ev_casc += len(on_c)
+        ev_match += sum(any(c == cs and abs(i - j) <= 2 for j, cs in on_c) for i, c in on_s)
+    audio_sec = max(n * hop_sec, 1e-9)
+    print(f"[report] windows {n} ({audio_sec:.0f} s audio), threshold {threshold}")
+    print(f"  single : {t_single / audio_sec * 1000:.1f} ms CPU / s audio")
+    print(f"  cascade: {t_casc / audio_sec * 1000:.1f} ms CPU / s audio, 본 모델 통과율 {casc.pass_rate * 100:.1f}%")
+    print(f"  window recall {tp}/{pos} = {tp / pos * 100 if pos else 100:.1f}%")
+    print(f"  event  recall {ev_match}/{ev_single} = {ev_match / ev_single * 100 if ev_single else 100:.1f}% "
+          f"(cascade events {ev_casc})")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    opts = {}
+    for k in ("--thr", "--hop", "--recall"):
+        if k in args:
+            i = args.index(k); opts[k] = float(args[i + 1]); del args[i:i + 2]
+    if len(args) >= 4 and args[0] == "distill":
+        print("[distill]", distill(args[1], args[2:-1], args[-1]))
+    elif len(args) >= 4 and args[0] == "tune":
+        tune(args[1], args[2], args[3:], opts.get("--recall", 0.99))
+    elif len(args) >= 4 and args[0] == "report":
+        report(args[1], args[2], args[3:], opts.get("--thr", 0.15), opts.get("--hop", 0.3))
+    else:
+        print("usage: cascade.py distill <teacher> <features...> <out.npz>\n"
+              "       cascade.py tune <teacher> <screener.npz> <features...> [--recall 0.99]\n"
+              "       cascade.py report <teacher> <screener.npz> <features...> [--thr 0.15] [--hop 0.3]")
+        sys.exit(2)
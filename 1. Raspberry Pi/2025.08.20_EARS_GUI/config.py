@@ -0,0 +1,58 @@
+# ========================== config.py ==========================
+# - GUI(2025.08_20_Hear-O_ui_controller.py)와 헤드리스 데몬(ears_daemon.py)이 함께 쓰는 설정
+#   · Qt/하드웨어 모듈을 임포트하지 않음 → 어느 진입점에서든 가볍게 임포트
+#   · 모델/스크리너 경로, 감지 오디오 파라미터, 감지 확정(TRACK_*), 통신 포트,
+#     flight recorder / governor / 트레이스 / 지표 설정
+# - 화면 배치·아이콘·STT·카메라 경로 등 GUI 전용 값은 UI 컨트롤러에 그대로 둠
+
+import os
+
+# ==== 모델 ====
+CLASS_NAMES = ['Horn', 'None', 'Siren']
+MODEL_PATH = "/home/yong/projects/ears_system/CNN_Model/gamma_cnn_main5_timeframe"
+# BN 접힌 NumPy 가중치(numpy_cnn.py export로 생성). 있으면 TensorFlow 없이 추론
+MODEL_NPZ  = "/home/yong/projects/ears_system/CNN_Model/gamma_cnn_main5_timeframe.npz"
+# 캐스케이드 스크리너(cascade.py distill로 생성). 있으면 Siren+Horn 점수가 SCREEN_THR 이상일 때만 본 모델 실행
+SCREENER_NPZ = "/home/yong/projects/ears_system/CNN_Model/gamma_screener_32x30.npz"
+SCREEN_THR   = 0.15   # cascade.py tune 결과로 갱신
+CLASS_ID_MAP = { 'INIT': "INIT", 'None': "NONE", 'Siren': "SIREN", 'Horn': "HORN" }  # Arduino 전용 토큰
+
+# ==== 감지 오디오 ====
+DETECT_DEVICE = 'voicehat'
+MIC_SAMPLE_RATE   = 48000
+MODEL_SAMPLE_RATE = 44100
+WIN_TIME = 0.025
+HOP_TIME = 0.010
+N_FILTERS = 64
+FMIN = 50
+SEGMENT_SECONDS = 0.6
+SEGMENT_HOP_SECONDS = 0.3   # 0.6s 윈도우를 0.3s 간격으로 겹쳐서 추론
+
+# ==== 감지 확정(PosteriorTracker) ====
+TRACK_TARGETS   = ('Horn', 'Siren')
+TRACK_ALPHA     = 0.6    # EMA 계수
+TRACK_ON_THR    = 0.8    # 윈도우 hit 임계(EMA 기준)
+TRACK_OFF_THR   = 0.5    # 해제(히스테리시스) 임계
+TRACK_N, TRACK_M = 2, 3  # 최근 3개 윈도우 중 2개 hit이면 확정
+
+ALERT_HOLD_SEC = 7.0     # 경보 래치 길이(GUI 카메라 표시 시간과 같음)
+
+# ==== 통신 포트 ====
+ARDUINO_PORT = os.environ.get("EARS_ARDUINO_PORT", '/dev/ttyACM0')   # serial_sim.py serve 링크로 대체 가능
+BT_PORT = os.environ.get("EARS_BT_PORT", '/dev/ttyAMA0')
+BAUDRATE = 9600
+RX_DRAIN_SEC = 0.02      # 시리얼 RX 드레인 주기(50Hz): 아두이노 에코/BT 입력이 호스트 버퍼에 쌓이지 않게
+
+# ==== flight recorder ====
+FLIGHT_ENABLE   = True
+FLIGHT_DIR      = "/home/yong/projects/ears_system/logs/flight"
+FLIGHT_SECONDS  = 10.0       # 이벤트 직전 보관 길이
+FLIGHT_QUOTA_MB = 512        # 스냅샷 디스크 한도(초과 시 오래된 것부터 삭제)
+
+# ==== 연산 governor ====
+GOVERNOR_ENABLE = True
+GOVERNOR_SYSFS_ROOT = "/"    # 시뮬레이션 시 가짜 sysfs 디렉터리
+
+# ==== 트레이스 / 지표 ====
+TRACE_DIR    = "/home/yong/projects/ears_system/logs"
+METRICS_PORT = 9108          # Prometheus text (localhost 전용), 0이면 비활성
@@ -0,0 +1,338 @@
+# ========================== device_registry.py ==========================
+# - DeviceRegistry: 오디오 입력(sounddevice), V4L2 카메라(/dev/video*, /dev/webcam_* 링크), tty 링크를
+#   한 번 조회해 캐시 → audio_index()/camera()/present()는 dict 조회(O(1))
+#   · 오디오: PortAudio 이름의 (hw:N,..) → /proc/asound/cardN/id 로 분리 여부 확인(PortAudio 재초기화 없이)
+#             지원 샘플레이트는 audio_info()를 처음 부를 때 1회만 check_input_settings로 확인(기동 시간 영향 없음)
+#   · 카메라: VIDIOC_QUERYCAP/VIDIOC_ENUM_FMT ioctl로 캡처 가능 여부/픽셀 포맷(MJPG, YUYV...) 캐시
+#   · 핫플러그: /dev, /dev/snd inotify(ctypes, 추가 패키지 없음) → 0.5초 안정화 후 재조회
+#               inotify를 못 쓰면 /dev 목록 주기 비교로 대체
+#   · watch(kind, key)로 등록한 장치의 연결/분리가 바뀌면 구독자 콜백(kind, key, present) — 감시 스레드에서 호출
+#   · reinit_audio(): 다시 꽂힌 마이크는 PortAudio 재초기화가 필요 → 해당 장치의 스트림을 닫은 워커가 호출
+#     다른 오디오 스트림(STT 녹음 등)은 audio_stream()으로 감싸 두면, 열려 있는 동안 재초기화를 미루고 False 반환
+
+import ctypes, ctypes.util, fcntl, glob, os, re, select, struct, threading, time
+from contextlib import contextmanager
+from metrics import METRICS
+
+AUDIO_RATES = (16000, 44100, 48000)
+TTY_GLOBS = ("ttyACM*", "ttyUSB*", "ttyAMA*", "serial*", "rfcomm*")
+
+# linux/videodev2.h
+VIDIOC_QUERYCAP = 0x80685600        # _IOR('V', 0, struct v4l2_capability[104])
+VIDIOC_ENUM_FMT = 0xC0405602        # _IOWR('V', 2, struct v4l2_fmtdesc[64])
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+
+
+def v4l2_caps(path):
+    """{'card', 'capture', 'formats'} 또는 None(열기 실패). 다른 프로세스가 스트리밍 중이어도 조회 가능."""
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        buf = bytearray(104)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, buf)
+        card = bytes(buf[16:48]).split(b"\0", 1)[0].decode(errors="replace")
+        caps, dcaps = struct.unpack_from("<II", buf, 84)
+        if caps & V4L2_CAP_DEVICE_CAPS:
+            caps = dcaps                    # 노드별 기능(메타데이터 노드 구분)
+        formats = []
+        if caps & V4L2_CAP_VIDEO_CAPTURE:
+            for i in range(32):
+                desc = bytearray(64)
+                struct.pack_into("<II", desc, 0, i, 1)   # index, V4L2_BUF_TYPE_VIDEO_CAPTURE
+                try:
+                    fcntl.ioctl(fd, VIDIOC_ENUM_FMT, desc)
+                except OSError:
+                    break
+                formats.append(bytes(desc[44:48]).decode("ascii", "replace"))
+        return {"card": card, "capture": bool(caps & V4L2_CAP_VIDEO_CAPTURE), "formats": formats}
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+class _Inotify:
+    IN_ATTRIB, IN_MOVED_TO, IN_CREATE, IN_DELETE, IN_MOVED_FROM = 0x4, 0x80, 0x100, 0x200, 0x40
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        mask = self.IN_ATTRIB | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE | self.IN_MOVED_FROM
+        for p in paths:
+            if os.path.isdir(p):
+                libc.inotify_add_watch(self.fd, p.encode(), mask)
+
+    def wait(self, timeout):
+        r, _, _ = select.select([self.fd], [], [], timeout)
+        if not r:
+            return False
+        self.drain()
+        return True
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DeviceRegistry:
+    def __init__(self, dev_root="/dev", proc_root="/proc", settle=0.5, poll_sec=2.0):
+        self.dev_root, self.proc_root = dev_root, proc_root
+        self.settle, self.poll_sec = settle, poll_sec
+        self._lock = threading.Lock()
+        self._pa_lock = threading.Lock()   # PortAudio 재초기화 ↔ 다른 스트림 열기 직렬화
+        self._audio_users = 0    # audio_stream()으로 열려 있는 스트림 수
+        self.audio = {}          # index -> info
+        self.cameras = {}        # 경로(링크 포함) -> caps
+        self.ttys = set()        # 존재하는 tty 경로(링크 포함)
+        self._audio_caps = {}    # 이름 -> 지원 rate(최초 1회)
+        self._resolved = {}      # 조회 키 -> index (scan마다 무효화)
+        self._watch = {}         # (kind, key) -> 마지막 present
+        self._subs = []
+        self.generation = 0      # 재조회 횟수(워커가 변화 감지에 사용)
+        self._scanned = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- 조회(핫패스) ----------
+    def _ensure(self):
+        if not self._scanned:
+            self.scan()
+
+    def audio_index(self, name_or_index):
+        self._ensure()
+        key = str(name_or_index)
+        if key in self._resolved:
+            return self._resolved[key]
+        with self._lock:
+            items = list(self.audio.items())
+        idx = next((i for i, d in items if str(i) == key or d["name"] == key), None)
+        if idx is None:
+            low = key.lower()
+            idx = next((i for i, d in items if low in d["name"].lower()), None)
+        if idx is not None and not self._card_alive(self.audio[idx]):
+            idx = None
+        self._resolved[key] = idx
+        return idx
+
+    def audio_info(self, name_or_index):
+        idx = self.audio_index(name_or_index)
+        if idx is None:
+            return None
+        info = dict(self.audio[idx])
+        if info["name"] not in self._audio_caps:
+            import sounddevice as sd
+            rates = []
+            for r in AUDIO_RATES:
+                try:
+                    sd.check_input_settings(device=idx, samplerate=r, channels=min(2, info["channels"]))
+                    rates.append(r)
+                except Exception:
+                    pass
+            self._audio_caps[info["name"]] = rates
+        info["rates"] = self._audio_caps[info["name"]]
+        return info
+
+    def camera(self, path):
+        self._ensure()
+        return self.cameras.get(path)
+
+    def present(self, kind, key):
+        self._ensure()
+        if kind == "audio":
+            return self.audio_index(key) is not None
+        if kind == "camera":
+            c = self.cameras.get(key)
+            return bool(c and c["capture"])
+        if kind == "tty":
+            return key in self.ttys
+        raise ValueError(f"알 수 없는 장치 종류: {kind}")
+
+    # ---------- 구독 ----------
+    def watch(self, kind, key):
+        self._watch[(kind, key)] = self.present(kind, key)
+        return self._watch[(kind, key)]
+
+    def subscribe(self, fn):
+        self._subs.append(fn)
+
+    # ---------- 조회(전체) ----------
+    def _card_id(self, card):
+        if card is None:
+            return None
+        try:
+            with open(os.path.join(self.proc_root, "asound", f"card{card}", "id")) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _card_alive(self, info):
+        # 가상 장치(default/pulse 등)는 카드 번호가 없으므로 항상 존재로 간주
+        return info["card"] is None or self._card_id(info["card"]) == info["card_id"]
+
+    def _scan_audio(self):
+        try:
+            import sounddevice as sd
+            devices = sd.query_devices()
+        except Exception as e:
+            print("[DEV] 오디오 장치 조회 실패:", e)
+            return {}
+        out = {}
+        for i, d in enumerate(devices):
+            ch = d.get("max_input_channels", 0)
+            if ch <= 0:
+                continue
+            name = str(d.get("name", ""))
+            m = re.search(r"\(hw:(\d+),", name)
+            card = int(m.group(1)) if m else None
+            out[i] = dict(index=i, name=name, channels=ch, card=card, card_id=self._card_id(card),
+                          default_rate=d.get("default_samplerate"))
+        return out
+
+    def _scan_cameras(self):
+        paths = set(glob.glob(os.path.join(self.dev_root, "video*")))
+        paths.update(glob.glob(os.path.join(self.dev_root, "webcam_*")))
+        paths.update(k for kind, k in self._watch if kind == "camera")
+        old = self.cameras
+        by_real, out = {}, {}
+        for p in sorted(paths):
+            if not os.path.exists(p):
+                continue
+            real = os.path.realpath(p)
+            if real not in by_real:
+                # 같은 노드는 이전 결과 재사용(ioctl은 새로 나타난 노드만)
+                prev = next((c for q, c in old.items() if c and c.get("real") == real), None)
+                caps = prev if prev is not None else v4l2_caps(real)
+                by_real[real] = dict(caps, real=real) if caps else None
+            if by_real[real] is not None:
+                out[p] = by_real[real]
+        return out
+
+    def _scan_ttys(self):
+        out = set()
+        for g in TTY_GLOBS:
+            out.update(glob.glob(os.path.join(self.dev_root, g)))
+        out.update(k for kind, k in self._watch if kind == "tty" and os.path.exists(k))
+        return out
+
+    def scan(self, audio=True):
+        t0 = time.perf_counter()
+        audio_map = self._scan_audio() if audio or not self._scanned else None
+        cameras, ttys = self._scan_cameras(), self._scan_ttys()
+        with self._lock:
+            if audio_map is not None:
+                self.audio = audio_map
+            self.cameras, self.ttys = cameras, ttys
+            self._resolved = {}
+            self._scanned = True
+            self.generation += 1
+        METRICS.observe("device_scan", time.perf_counter() - t0)
+        METRICS.gauge("devices_audio", len(self.audio))
+        METRICS.gauge("devices_camera", sum(1 for c in cameras.values() if c["capture"]))
+        METRICS.gauge("devices_tty", len(ttys))
+        self._notify()
+
+    @contextmanager
+    def audio_stream(self):
+        # 감지 스트림 외의 PortAudio 사용 구간(STT 녹음 등): 그동안 reinit_audio()는 건너뜀
+        with self._pa_lock:
+            self._audio_users += 1
+        try:
+            yield
+        finally:
+            with self._pa_lock:
+                self._audio_users -= 1
+
+    def reinit_audio(self):
+        # PortAudio는 시작 시 장치 목록을 고정 → 새로 꽂힌 장치를 보려면 재초기화
+        # (sounddevice 비공개 API: 열린 스트림이 있으면 무효화되므로 사용 중이면 미루고 False)
+        with self._pa_lock:
+            if self._audio_users:
+                METRICS.inc("audio_reinit_deferred")
+                return False
+            try:
+                import sounddevice as sd
+                sd._terminate(); sd._initialize()
+            except Exception as e:
+                print("[DEV] PortAudio 재초기화 실패:", e)
+        self.scan(audio=True)
+        return True
+
+    def _notify(self):
+        changed = []
+        for (kind, key), was in list(self._watch.items()):
+            now = self.present(kind, key)
+            if now != was:
+                self._watch[(kind, key)] = now
+                changed.append((kind, key, now))
+        missing = sum(1 for v in self._watch.values() if not v)
+        METRICS.gauge("devices_missing", missing)
+        for kind, key, now in changed:
+            METRICS.inc("device_attach" if now else "device_detach")
+            print(f"[DEV] {kind} {key} {'연결' if now else '분리'}")
+            for fn in self._subs:
+                try:
+                    fn(kind, key, now)
+                except Exception as e:
+                    print("[DEV] 구독자 오류:", e)
+
+    # ---------- 핫플러그 감시 ----------
+    def _listing(self):
+        names = []
+        for d in (self.dev_root, os.path.join(self.dev_root, "snd")):
+            try:
+                names.extend(os.path.join(d, n) for n in os.listdir(d))
+            except OSError:
+                pass
+        return frozenset(names)
+
+    def _loop(self):
+        try:
+            ino = _Inotify([self.dev_root, os.path.join(self.dev_root, "snd")])
+        except (OSError, AttributeError) as e:
+            print("[DEV] inotify 사용 불가 → 폴링:", e)
+            ino = None
+        last = self._listing()
+        try:
+            while not self._stop.is_set():
+                if ino is not None:
+                    if not ino.wait(self.poll_sec):
+                        continue
+                else:
+                    if self._stop.wait(self.poll_sec):
+                        break
+                    cur = self._listing()
+                    if cur == last:
+                        continue
+                    last = cur
+                # udev가 노드 → 심볼릭 링크/권한을 만드는 동안 기다렸다가 한 번만 재조회
+                if self._stop.wait(self.settle):
+                    break
+                if ino is not None:
+                    ino.drain()
+                METRICS.inc("hotplug_events")
+                # 오디오 목록은 PortAudio 캐시라 그대로, 카드 존재 여부는 /proc/asound로 재확인
+                self.scan(audio=False)
+        finally:
+            if ino is not None:
+                ino.close()
+
+    def start(self):
+        self._ensure()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="device-registry", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,165 @@
+# ========================== doa_tracker.py ==========================
+# - BearingTracker: 세그먼트마다 들어오는 마이크 어레이 DOA(도)를 시간축으로 융합해 방향을 추적
+#   · 원형 Kalman(상태 = 방위 θ, 각속도 ω, 등가속 잡음 모델) — 혁신(z - θ)을 ±180°로 감아서 0/360 경계 처리
+#   · 측정 가중치 = 그 윈도우의 대상 클래스(Horn/Siren) 확률 → 측정 분산 R = (sigma_doa)² / w
+#     (사이렌이 안 들리는 윈도우의 DOA는 주변 소음 방향이므로 거의 반영하지 않음)
+#   · 3σ 게이트: 반사/순간 튐은 버림, 연속 max_outliers회 벗어나면 음원이 바뀐 것으로 보고 재초기화
+#   · 신뢰도 = 가중 단위벡터 EMA의 평균 합성 길이 R̄(원형 통계, 0~1) × 추정 표준편차 감쇠
+#     EMA는 0에서 시작 → 일관된 측정이 쌓일수록 1에 접근(1개면 ≈ r_alpha·w)
+#   · 접근/이탈 = 윈도우 음량(로그 감마톤 평균, dB)의 α-β 추세(dB/s, +면 접근)
+#   · stale_sec 동안 유효 측정이 없으면 다음 측정에서 새로 시작
+# - 갱신 1회 = 스칼라 연산 수십 개(O(1), 할당 없음) → 오디오 윈도우(hop 0.3s)마다 호출
+# - CLI: python doa_tracker.py replay <flight_snapshot.npz>   # 원시 DOA vs 추적 방위 비교 출력
+
+import math, sys
+from collections import namedtuple
+
+Bearing = namedtuple("Bearing", "angle conf rate sigma level_rate")   # 도, 0~1, 도/s, 도, dB/s
+LN_TO_DB = 10.0 / math.log(10.0)     # 로그 감마톤(자연로그 파워) → dB
+
+
+def _wrap(d):
+    # (-180, 180]
+    return (d + 180.0) % 360.0 - 180.0
+
+
+class BearingTracker:
+    def __init__(self, sigma_doa=15.0, accel=60.0, gate=3.0, max_outliers=3,
+                 min_weight=0.05, stale_sec=2.0, r_alpha=0.3, level_alpha=0.5, level_beta=0.2):
+        if not 0.0 < r_alpha <= 1.0:
+            raise ValueError("r_alpha는 (0, 1] 범위여야 합니다")
+        self.r0 = sigma_doa * sigma_doa      # 측정 분산(도², 대상 확률 1일 때)
+        self.q = accel * accel               # 각가속도 잡음 밀도(도²/s³)
+        self.gate, self.max_outliers = gate, max_outliers
+        self.min_weight, self.stale_sec = min_weight, stale_sec
+        self.r_alpha = r_alpha
+        self.level_alpha, self.level_beta = level_alpha, level_beta
+        self.reset()
+
+    def reset(self):
+        self._init = False
+        self._t = self._tm = None            # 마지막 예측 시각 / 마지막 유효 측정 시각
+        self.theta = self.omega = 0.0
+        self._p00 = self._p01 = self._p11 = 0.0
+        self._cx = self._cy = 0.0            # 가중 단위벡터 EMA(원형 평균/R̄)
+        self._lv = self._lv_rate = 0.0       # 음량 α-β 필터
+        self._lv_init = False
+        self._outliers = 0
+        self.updates = 0
+        self.rejected = 0
+
+    def _start(self, z, t, w):
+        self._init = True
+        self.theta, self.omega = z % 360.0, 0.0
+        self._p00, self._p01, self._p11 = self.r0 / w, 0.0, 90.0 * 90.0   # 각속도 사전: ±90°/s
+        a = self.r_alpha * w                  # 첫 측정도 EMA 1회 반영분만(단위벡터로 두면 1개로 conf≈0.9)
+        self._cx, self._cy = a * math.cos(math.radians(z)), a * math.sin(math.radians(z))
+        self._outliers = 0
+        self._t = self._tm = t
+
+    def _predict(self, dt):
+        # F = [[1, dt], [0, 1]], Q = q·[[dt³/3, dt²/2], [dt²/2, dt]]
+        self.theta = (self.theta + self.omega * dt) % 360.0
+        p00, p01, p11 = self._p00, self._p01, self._p11
+        q = self.q
+        self._p00 = p00 + 2.0 * dt * p01 + dt * dt * p11 + q * dt ** 3 / 3.0
+        self._p01 = p01 + dt * p11 + q * dt * dt / 2.0
+        self._p11 = p11 + q * dt
+
+    def update(self, doa, t, weight=1.0, level=None):
+        """
+        doa   : 측정 방위(도, 0~359)
+        t     : 윈도우 시각(초, time.time() 기준)
+        weight: 측정 신뢰 가중치(대상 클래스 확률 등, 0~1). min_weight 미만이면 예측만 진행
+        level : 윈도우 음량(dB 등 선형 척도, 옵션) → 접근/이탈 추세
+        """
+        if self._init and t - self._tm > self.stale_sec:
+            self.reset()
+        w = float(weight)
+        if w < self.min_weight:
+            if self._init:
+                self._predict(max(0.0, t - self._t)); self._t = t
+            return
+        r = self.r0 / w
+        if not self._init:
+            self._start(float(doa), t, w)
+            self._update_level(level, 0.0)
+            self.updates += 1
+            return
+        dt = max(0.0, t - self._t)
+        self._t = t
+        self._predict(dt)
+        y = _wrap(float(doa) - self.theta)
+        s = self._p00 + r
+        if y * y > self.gate * self.gate * s:
+            self._outliers += 1
+            self.rejected += 1
+            if self._outliers >= self.max_outliers:
+                self._start(float(doa), t, w)     # 새 음원/급격한 이동
+            return
+        self._outliers = 0
+        self._tm = t
+        k0, k1 = self._p00 / s, self._p01 / s
+        self.theta = (self.theta + k0 * y) % 360.0
+        self.omega += k1 * y
+        p00, p01 = self._p00, self._p01
+        self._p00 = (1.0 - k0) * p00
+        self._p01 = (1.0 - k0) * p01
+        self._p11 -= k1 * p01
+        a = self.r_alpha * w
+        rad = math.radians(float(doa))
+        self._cx += a * (math.cos(rad) - self._cx)
+        self._cy += a * (math.sin(rad) - self._cy)
+        self._update_level(level, dt)
+        self.updates += 1
+
+    def _update_level(self, level, dt):
+        if level is None:
+            return
+        if not self._lv_init:
+            self._lv, self._lv_rate, self._lv_init = float(level), 0.0, True
+            return
+        pred = self._lv + self._lv_rate * dt
+        res = float(level) - pred
+        self._lv = pred + self.level_alpha * res
+        if dt > 0:
+            self._lv_rate += self.level_beta * res / dt
+
+    def estimate(self):
+        if not self._init:
+            return None
+        sigma = math.sqrt(max(self._p00, 0.0))
+        rbar = math.hypot(self._cx, self._cy)
+        # R̄(측정 일관성) × 표준편차 감쇠(45°에서 절반)
+        conf = rbar / (1.0 + (sigma / 45.0) ** 2)
+        return Bearing(int(round(self.theta)) % 360, round(conf, 3), round(self.omega, 1),
+                       round(sigma, 1), round(self._lv_rate, 2))
+
+
+def replay(path, targets=('Horn', 'Siren')):
+    # flight recorder 스냅샷의 윈도우별 DOA/확률/특징으로 추적기를 다시 돌려 비교
+    import numpy as np
+    from flight_recorder import load_snapshot
+    s = load_snapshot(path)
+    idx = [s["class_names"].index(c) for c in targets if c in s["class_names"]]
+    tr = BearingTracker()
+    print(f"{'t(s)':>6} {'raw':>4} {'w':>5} {'track':>5} {'conf':>5} {'°/s':>6} {'σ':>5} {'dB/s':>6}")
+    t0 = float(s["window_ts"][0]) if len(s["window_ts"]) else 0.0
+    for ts, doa, post, feat in zip(s["window_ts"], s["doa"], s["posteriors"], s["features"]):
+        w = float(np.max(post[idx])) if idx else 1.0
+        tr.update(int(doa), float(ts), w, float(feat.mean()) * LN_TO_DB)
+        b = tr.estimate()
+        if b is None:
+            print(f"{ts - t0:6.2f} {int(doa):4d} {w:5.2f}     -")
+        else:
+            print(f"{ts - t0:6.2f} {int(doa):4d} {w:5.2f} {b.angle:5d} {b.conf:5.2f} {b.rate:6.1f} "
+                  f"{b.sigma:5.1f} {b.level_rate:6.2f}")
+    print(f"[replay] updates {tr.updates}, rejected {tr.rejected}, 스냅샷 각도 {s.get('angle')}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "replay":
+        replay(sys.argv[2])
+    else:
+        print("usage: doa_tracker.py replay <flight_snapshot.npz>")
+        sys.exit(2)
@@ -0,0 +1,427 @@
+# ========================== ears_daemon.py ==========================
+# - 헤드리스 감지/경보 서비스: 디스플레이 없는 유닛용, Qt GUI(QtGui/QtWidgets) 임포트 없음
+#   · DetectionWorker는 GUI와 같은 코드(QtCore 시그널만 사용, 이벤트 루프 없이 직접 호출) → 전용 스레드
+#   · asyncio 이벤트 루프: 감지 → 래치(ALERT_HOLD_SEC) → EventBus(arduino/bt/log 스레드 sink + socket inline sink)
+#   · 시리얼 RX 드레인(RX_DRAIN_SEC, GUI _rx_timer와 같은 50Hz): 아두이노 [RECEIVED]/[STATE]/[BLOCKED] 에코와
+#     BT 입력을 루프에서 주기적으로 버림 → 호스트 수신 버퍼가 차지 않음
+#   · 설정은 GUI와 공용(config.py)
+#   · systemd Type=notify: 파이프라인 준비(모델 로드 + 첫 오디오 스트림) 시 READY=1,
+#     WatchdogSec 설정 시 최근 HEARTBEAT_SEC 안에 세그먼트를 처리했을 때만 WATCHDOG=1
+#   · 로컬 구독 소켓(Unix, 줄 단위 JSON): 별도 UI 프로세스가 연결해 hello/detection 수신, "stats" 입력 시 지표 스냅샷
+#     느린 구독자는 자기 큐만 오래된 것부터 버림(감지 경로를 막지 않음)
+#   · SIGTERM/SIGINT 정상 종료, SIGUSR1 트레이스 덤프(EARS_TRACE=1)
+# - 실행: python ears_daemon.py [--socket PATH] [--bench]
+#   --bench: 준비 완료 시점의 임포트/기동 시간, RSS, 로드된 Qt 모듈을 출력하고 종료
+#            GUI 빌드는 같은 지표(pipeline_ready_s, rss_mb)를 /metrics에 기록 → 두 값을 비교
+# - systemd 예시
+#   [Service]
+#   Type=notify
+#   ExecStart=/usr/bin/python3 /home/yong/projects/ears_system/ears_daemon.py
+#   RuntimeDirectory=ears
+#   WatchdogSec=10
+#   Restart=on-failure
+
+import time
+_T_IMPORT0 = time.perf_counter()
+
+import asyncio, json, os, signal, socket, sys, threading
+import serial
+from hi import DetectionWorker
+from tuning import find as MicFind
+from posterior_tracker import PosteriorTracker
+from event_bus import EventBus, DetectionEvent
+from metrics import METRICS, process_age, rss_mb
+from tracing import TRACER
+from flight_recorder import FlightRecorder
+from governor import Governor, SysfsProbe, set_blas_threads
+from device_registry import DeviceRegistry
+from config import (CLASS_NAMES, MODEL_PATH, MODEL_NPZ, SCREENER_NPZ, SCREEN_THR, CLASS_ID_MAP,
+                    DETECT_DEVICE, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE, WIN_TIME, HOP_TIME, N_FILTERS, FMIN,
+                    SEGMENT_SECONDS, SEGMENT_HOP_SECONDS,
+                    TRACK_TARGETS, TRACK_ALPHA, TRACK_ON_THR, TRACK_OFF_THR, TRACK_N, TRACK_M, ALERT_HOLD_SEC,
+                    ARDUINO_PORT, BT_PORT, BAUDRATE, RX_DRAIN_SEC,
+                    FLIGHT_ENABLE, FLIGHT_DIR, FLIGHT_SECONDS, FLIGHT_QUOTA_MB,
+                    GOVERNOR_ENABLE, GOVERNOR_SYSFS_ROOT, TRACE_DIR, METRICS_PORT)
+
+_T_IMPORT1 = time.perf_counter()
+
+# ==== 데몬 전용 설정(공용 설정은 config.py) ====
+HEARTBEAT_SEC = 5.0          # 이 시간 동안 처리된 세그먼트가 없으면 WATCHDOG=1을 보내지 않음 → systemd 재시작
+
+SOCKET_PATH = os.path.join(os.environ.get("RUNTIME_DIRECTORY", "/tmp"), "ears_events.sock")
+
+
+# ===== systemd 알림(sd_notify 프로토콜, libsystemd 불필요) =====
+def sd_notify(state):
+    addr = os.environ.get("NOTIFY_SOCKET")
+    if not addr:
+        return False
+    if addr[0] == "@":
+        addr = "\0" + addr[1:]      # 추상 네임스페이스
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC) as s:
+            s.connect(addr)
+            s.sendall(state.encode())
+        return True
+    except OSError as e:
+        print("[DAEMON] sd_notify 실패:", e)
+        return False
+
+
+def build_payloads(pred_class, angle):
+    # App._build_payloads와 같은 형식: Arduino는 대문자 토큰, BT는 Siren/Horn 케이스 유지
+    try:
+        ang = int(angle) % 360
+    except Exception:
+        ang = 0
+    msg_arduino = f"{CLASS_ID_MAP.get(pred_class, 'NONE')},{ang}\n".encode('utf-8')
+    cls_bt = pred_class if pred_class in ("Siren", "Horn") else "None"
+    return msg_arduino, f"{cls_bt},{ang}\n".encode('utf-8')
+
+
+# ===== 로컬 구독 소켓 =====
+class Subscribers:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.clients = set()
+
+    @staticmethod
+    def _line(msg):
+        return (json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _put(q, line):
+        if q.full():
+            q.get_nowait()
+            METRICS.inc("socket_dropped")
+        q.put_nowait(line)
+
+    def broadcast(self, msg):
+        line = self._line(msg)
+        for q in list(self.clients):
+            self._put(q, line)
+
+    async def handle(self, reader, writer):
+        q = asyncio.Queue(self.maxsize)
+        self.clients.add(q)
+        METRICS.gauge("socket_clients", len(self.clients))
+        self._put(q, self._line({"type": "hello", "pid": os.getpid(), "classes": CLASS_NAMES}))
+
+        async def _pump():
+            while True:
+                writer.write(await q.get())
+                await writer.drain()
+
+        pump = asyncio.create_task(_pump())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip() == b"stats":
+                    self._put(q, self._line({"type": "stats", "metrics": METRICS.snapshot()}))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            pump.cancel()
+            self.clients.discard(q)
+            METRICS.gauge("socket_clients", len(self.clients))
+            writer.close()
+
+
+# ===== 데몬 =====
+class EarsDaemon:
+    def __init__(self, socket_path=SOCKET_PATH, bench=False, alert_hold_sec=ALERT_HOLD_SEC):
+        self.socket_path = socket_path
+        self.bench = bench
+        self.alert_hold_sec = alert_hold_sec
+        self.devices = DeviceRegistry()
+        self.subs = Subscribers()
+        self.arduino = None
+        self.bt = None
+        self.det = None
+        self.det_thread = None
+        self.bus = None
+        self.flight = None
+        self.governor = None
+        self._hold_until = 0.0
+        self._loop = None
+        self._stop = None
+        self._wd_task = None
+        self._rx_task = None
+        # 포트 교체(핫플러그 재오픈)와 sink 전송/핸드셰이크 직렬화(pyserial은 스레드 안전하지 않음)
+        # 포트별 락 → 아두이노 핸드셰이크(~2초) 중에도 BT 전송은 막히지 않음
+        self._locks = {"arduino": threading.RLock(), "bt": threading.RLock()}
+
+    # ---- 시리얼 ----
+    def _open_arduino(self):
+        try:
+            port = serial.Serial(ARDUINO_PORT, BAUDRATE, timeout=0, write_timeout=0.1)
+            time.sleep(2)   # 포트 오픈 시 아두이노 리셋 대기(락 밖)
+            with self._locks["arduino"]:
+                self.arduino = port
+                self._handshake()
+        except Exception as e:
+            print(f"[아두이노 실패] {e}")
+            self.arduino = None
+
+    def _open_bt(self):
+        try:
+            port = serial.Serial(BT_PORT, baudrate=9600, timeout=0, write_timeout=0.1)
+            with self._locks["bt"]:
+                self.bt = port
+        except Exception as e:
+            print(f"[블루투스 실패] {e}")
+            self.bt = None
+
+    def _open_serial(self):
+        self._open_arduino()
+        self._open_bt()
+
+    def _handshake(self):
+        with self._locks["arduino"]:
+            for _ in range(10):
+                self.arduino.write(b'ping\n'); time.sleep(0.2)
+                if self.arduino.in_waiting and self.arduino.readline().decode('utf-8', 'ignore').strip() == 'pong':
+                    self.arduino.write(b"INIT\n"); time.sleep(0.05); self.arduino.reset_input_buffer()
+                    print("[아두이노 핸드셰이크] 성공")
+                    return True
+            print("[아두이노 핸드셰이크] 실패")
+            return False
+
+    def _drain_rx(self):
+        # 포트별로: 핸드셰이크/재오픈/전송 중(락 보유)이면 그 포트만 이번 주기 건너뜀 → pong을 가로채지 않고 루프도 막지 않음
+        for attr, lock in self._locks.items():
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                port = getattr(self, attr)
+                n = port.in_waiting if port else 0
+                if n:
+                    port.read(n)  # 모두 버리기
+                    METRICS.inc("serial_rx_drained_bytes", n)
+            except Exception: pass
+            finally:
+                lock.release()
+
+    async def _drain_loop(self, interval=RX_DRAIN_SEC):
+        while not self._stop.is_set():
+            self._drain_rx()
+            await asyncio.sleep(interval)
+
+    def _write(self, attr, payload, metric):
+        # attr: "arduino" / "bt" — 포트 객체는 그 포트의 락 안에서 읽음(재오픈 중 닫힌 포트에 쓰지 않게)
+        with self._locks[attr]:
+            port = getattr(self, attr)
+            if port is None:
+                return False
+            try:
+                t0 = time.perf_counter()
+                port.write(payload)
+                METRICS.observe(metric, time.perf_counter() - t0)
+                return True
+            except Exception as e:
+                print(f"[{metric}] 전송 오류: {e}")
+                return False
+
+    # ---- sink ----
+    def _on_arduino_event(self, ev):
+        if self._write("arduino", build_payloads(ev.cls, ev.angle)[0], "serial_write_arduino"):
+            METRICS.observe("sound_to_led", time.time() - ev.onset_ts)
+
+    def _on_bt_event(self, ev):
+        if self._write("bt", build_payloads(ev.cls, ev.angle)[1], "serial_write_bt"):
+            METRICS.observe("sound_to_hud", time.time() - ev.onset_ts)
+
+    def _on_socket_event(self, ev):
+        # inline sink: publish가 루프 스레드에서 호출되므로 그대로 브로드캐스트
+        self.subs.broadcast({"type": "detection", "cls": ev.cls, "conf": round(ev.conf, 4), "angle": ev.angle,
+                             "onset_ts": ev.onset_ts, "det_ts": ev.det_ts, "cid": ev.cid,
+                             "doa_conf": ev.doa_conf, "doa_rate": ev.doa_rate, "level_rate": ev.level_rate})
+
+    def _log_detection(self, ev):
+        print(f"[DET] {ev.cls},{ev.angle} conf={ev.conf:.2f} doa_conf={ev.doa_conf:.2f} "
+              f"{ev.doa_rate:+.0f}°/s {ev.level_rate:+.1f}dB/s onset→det={(ev.det_ts - ev.onset_ts) * 1000:.0f}ms")
+
+    # ---- 감지(루프 스레드) ----
+    def on_detection(self, pred_class, conf, angle, onset_ts, det_ts, cid,
+                     doa_conf=0.0, doa_rate=0.0, level_rate=0.0):
+        TRACER.flow_end("sig_detection", cid)
+        now = time.time()
+        if now < self._hold_until or pred_class not in TRACK_TARGETS:
+            return
+        self._hold_until = now + self.alert_hold_sec
+        self._loop.call_later(self.alert_hold_sec, self.det.reset_buffer)
+        with METRICS.time("dispatch"), TRACER.span("dispatch", cid):
+            self.bus.publish(DetectionEvent(pred_class, conf, int(angle) % 360, onset_ts, det_ts, cid,
+                                            doa_conf, doa_rate, level_rate))
+
+    def _apply_governor(self, knobs):
+        self.det.set_hop_sec(knobs["hop_sec"])
+        self.det.set_screen_boost(knobs["screen_boost"])
+        set_blas_threads(knobs["threads"])
+
+    def _on_device_change(self, kind, key, present):
+        # 레지스트리 스레드 → 시리얼 재오픈(아두이노 리셋 대기 포함)은 그 스레드에서 수행
+        # 교체는 해당 포트 락 안에서(sink 스레드가 닫힌 포트에 쓰지 않게), 리셋 대기는 락 밖에서
+        if kind != "tty" or key not in (ARDUINO_PORT, BT_PORT):
+            return
+        attr = "arduino" if key == ARDUINO_PORT else "bt"
+        with self._locks[attr]:
+            old = getattr(self, attr)
+            setattr(self, attr, None)
+            try:
+                if old: old.close()
+            except Exception: pass
+        if present:
+            self._open_arduino() if attr == "arduino" else self._open_bt()
+
+    def dump_trace(self):
+        if not TRACER.enabled:
+            print("[TRACE] 비활성(EARS_TRACE=1로 실행)")
+            return
+        try:
+            print("[TRACE] 저장:", TRACER.dump(os.path.join(TRACE_DIR, time.strftime("trace_%Y%m%d_%H%M%S.json"))))
+        except Exception as e:
+            print("[TRACE] 저장 실패:", e)
+
+    # ---- 구성 ----
+    def _build(self):
+        tracker = PosteriorTracker(CLASS_NAMES, TRACK_TARGETS, TRACK_ALPHA,
+                                   TRACK_ON_THR, TRACK_OFF_THR, TRACK_N, TRACK_M)
+        if FLIGHT_ENABLE and not self.bench:
+            self.flight = FlightRecorder(FLIGHT_DIR, MIC_SAMPLE_RATE, CLASS_NAMES, FLIGHT_SECONDS,
+                                         SEGMENT_HOP_SECONDS, (N_FILTERS, int(SEGMENT_SECONDS / HOP_TIME)),
+                                         FLIGHT_QUOTA_MB)
+        model_path = MODEL_NPZ if os.path.exists(MODEL_NPZ) else MODEL_PATH
+        self.det = DetectionWorker(model_path, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE, SEGMENT_SECONDS,
+                                   WIN_TIME, HOP_TIME, N_FILTERS, FMIN, DETECT_DEVICE, MicFind, CLASS_NAMES,
+                                   hop_sec=SEGMENT_HOP_SECONDS, tracker=tracker, recorder=self.flight,
+                                   screener_path=SCREENER_NPZ if os.path.exists(SCREENER_NPZ) else None,
+                                   screen_thr=SCREEN_THR, registry=self.devices)
+        # Qt 이벤트 루프가 없으므로 시그널은 워커 스레드에서 직접 호출됨 → 루프 스레드로 넘김
+        loop = self._loop
+        self.det.sig_detection.connect(lambda *a: loop.call_soon_threadsafe(self.on_detection, *a))
+        self.det.sig_status.connect(lambda s: print("[DET]", s))
+        self.det.sig_error.connect(lambda e: print("[DET-ERR]", e))
+
+        self._build_bus()
+
+        self.devices.watch("tty", ARDUINO_PORT)
+        self.devices.watch("tty", BT_PORT)
+        self.devices.watch("audio", DETECT_DEVICE)
+        self.devices.subscribe(self._on_device_change)
+        self.devices.start()
+
+        if GOVERNOR_ENABLE and not self.bench:
+            self.governor = Governor(SysfsProbe(GOVERNOR_SYSFS_ROOT), self.det.backlog_sec, self._apply_governor)
+            self.governor.start()
+        if METRICS_PORT and not self.bench:
+            try: METRICS.serve_http(METRICS_PORT)
+            except Exception as e: print("[METRICS] 내보내기 시작 실패:", e)
+
+    def _build_bus(self, log=True, socket=True):
+        # 감지 팬아웃: arduino/bt(/log)는 전용 스레드 sink, socket은 루프 스레드 inline
+        # (serial_sim.py bench도 같은 구성을 사용 → log/socket만 끌 수 있음)
+        self.bus = EventBus(on_error=lambda m: print("[BUS]", m))
+        self.bus.subscribe("arduino", self._on_arduino_event)
+        self.bus.subscribe("bt",      self._on_bt_event)
+        if log:
+            self.bus.subscribe("log", self._log_detection, maxsize=32)
+        if socket:
+            self.bus.subscribe("socket", self._on_socket_event, inline=True)
+        return self.bus
+
+    async def _watchdog(self, interval):
+        # 스레드 생존만으로는 부족(장치 대기/멈춘 스트림도 살아 있음) → 최근 세그먼트 처리 시각으로 판단
+        while not self._stop.is_set():
+            if self.det_thread.is_alive() and time.monotonic() - self.det.heartbeat < HEARTBEAT_SEC:
+                sd_notify("WATCHDOG=1")
+            else:
+                METRICS.inc("watchdog_missed")
+            await asyncio.sleep(interval)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            self._loop.add_signal_handler(sig, self._stop.set)
+        self._loop.add_signal_handler(signal.SIGUSR1, self.dump_trace)
+
+        if not self.bench:
+            await self._loop.run_in_executor(None, self._open_serial)
+        self._build()
+        self._rx_task = asyncio.create_task(self._drain_loop())   # 참조 유지(GC 방지)
+        ready = asyncio.Event()
+        self.det.sig_ready.connect(lambda: self._loop.call_soon_threadsafe(ready.set))
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self.subs.handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+
+        self.det_thread = threading.Thread(target=self.det.start, name="DetectionWorker", daemon=True)
+        self.det_thread.start()
+        try:
+            while not ready.is_set() and not self._stop.is_set():
+                if not self.det_thread.is_alive():
+                    sd_notify("STATUS=감지 파이프라인 시작 실패")
+                    return 1
+                await asyncio.sleep(0.05)
+            if self._stop.is_set():
+                return 0
+
+            age, _ = process_age()
+            sd_notify(f"READY=1\nSTATUS=감지 중 ({self.socket_path})")
+            print(f"[DAEMON] 준비 완료: 프로세스 시작 후 {age:.2f}s, RSS {rss_mb()} MB, 구독 소켓 {self.socket_path}")
+            if self.bench:
+                self._print_bench(age)
+                return 0
+            wd = os.environ.get("WATCHDOG_USEC")
+            if wd:
+                self._wd_task = asyncio.create_task(self._watchdog(int(wd) / 2e6))   # 참조 유지(GC 방지)
+            await self._stop.wait()
+        finally:
+            sd_notify("STOPPING=1")
+            for task in (self._wd_task, self._rx_task):
+                if task: task.cancel()
+            self.det.stop()
+            await self._loop.run_in_executor(None, self.det_thread.join, 2.0)
+            for obj in (self.bus, self.flight, self.governor, self.devices):
+                try:
+                    if obj: obj.stop()
+                except Exception: pass
+            server.close()
+            try: os.unlink(self.socket_path)
+            except OSError: pass
+            for port in (self.arduino, self.bt):
+                try:
+                    if port: port.close()
+                except Exception: pass
+        return 0
+
+    @staticmethod
+    def _print_bench(age):
+        qt = sorted(m for m in sys.modules if m.startswith("PySide6."))
+        print(f"[bench] import {(_T_IMPORT1 - _T_IMPORT0) * 1000:.0f} ms | pipeline_ready {age:.2f} s "
+              f"| RSS {rss_mb()} MB | Qt 모듈 {', '.join(qt) or '-'}")
+        gui = [m for m in qt if m in ("PySide6.QtGui", "PySide6.QtWidgets")]
+        if gui:
+            print("[bench] 경고: GUI 모듈이 로드됨:", ", ".join(gui))
+
+
+def main(argv):
+    socket_path, bench = SOCKET_PATH, False
+    args = list(argv)
+    if "--socket" in args:
+        i = args.index("--socket"); socket_path = args[i + 1]; del args[i:i + 2]
+    if "--bench" in args:
+        args.remove("--bench"); bench = True
+    if args:
+        print("usage: ears_daemon.py [--socket PATH] [--bench]")
+        return 2
+    TRACER.name_thread("ears-daemon")
+    return asyncio.run(EarsDaemon(socket_path, bench).run())
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,119 @@
+# ========================== event_bus.py ==========================
+# - DetectionEvent: 확정된 감지 결과 1건(클래스/신뢰도/추적 방위/onset/확정 시각 + 방위 신뢰도·각속도·음량 추세)
+# - EventBus      : 감지 이벤트를 여러 sink(Arduino/BT/카메라/GUI/로그)로 팬아웃
+#   · 큐 sink   : sink마다 전용 스레드 + bounded Queue → 느린 sink가 다른 sink를 막지 않음
+#                 큐가 가득 차면 가장 오래된 이벤트를 버림(최신 경보 우선)
+#   · inline sink: publish한 스레드에서 바로 실행(Qt 위젯/시그널처럼 GUI 스레드가 곧 executor인 경우)
+#   · sink별 지연(det_ts → sink 완료)을 기록해 stats()로 조회
+#   · sink 실행 구간은 tracing.TRACER에 "sink:<name>" span으로 기록(cid로 원본 세그먼트와 연결)
+
+import threading, time
+from collections import deque
+from dataclasses import dataclass
+from queue import Queue, Full, Empty
+from tracing import TRACER
+
+
+@dataclass(frozen=True)
+class DetectionEvent:
+    cls: str          # 'Siren' / 'Horn'
+    conf: float       # PosteriorTracker 평활 신뢰도
+    angle: int        # 0~359
+    onset_ts: float   # 소리 시작 시각(time.time())
+    det_ts: float     # 확정(emit) 시각(time.time())
+    cid: int = 0      # 트레이스 correlation id(세그먼트 번호)
+    doa_conf: float = 0.0    # 방위 추적 신뢰도(0~1, doa_tracker.BearingTracker)
+    doa_rate: float = 0.0    # 각속도(도/s)
+    level_rate: float = 0.0  # 음량 추세(dB/s, +면 접근)
+
+
+class _Sink:
+    def __init__(self, name, handler, maxsize, inline):
+        self.name = name
+        self.handler = handler
+        self.inline = inline
+        self.q = None if inline else Queue(maxsize=maxsize)
+        self.thread = None
+        self.latency = deque(maxlen=256)   # 초 단위
+        self.handled = 0
+        self.dropped = 0
+        self.errors = 0
+
+
+class EventBus:
+    def __init__(self, on_error=None):
+        self._sinks = []
+        self._lock = threading.Lock()
+        self._running = True
+        self._on_error = on_error
+
+    def subscribe(self, name, handler, maxsize=8, inline=False):
+        sink = _Sink(name, handler, maxsize, inline)
+        if not inline:
+            sink.thread = threading.Thread(target=self._loop, args=(sink,),
+                                           name=f"sink-{name}", daemon=True)
+            sink.thread.start()
+        with self._lock:
+            # 큐 sink를 먼저 깨우고 inline sink는 뒤에 실행되도록 정렬
+            self._sinks.append(sink)
+            self._sinks.sort(key=lambda s: s.inline)
+        return sink
+
+    def publish(self, event):
+        with self._lock:
+            sinks = list(self._sinks)
+        for sink in sinks:
+            if sink.inline:
+                self._run(sink, event)
+                continue
+            try:
+                sink.q.put_nowait(event)
+            except Full:
+                try:
+                    sink.q.get_nowait(); sink.dropped += 1
+                except Empty:
+                    pass
+                try: sink.q.put_nowait(event)
+                except Full: sink.dropped += 1
+
+    def _loop(self, sink):
+        while self._running:
+            try:
+                event = sink.q.get(timeout=0.1)
+            except Empty:
+                continue
+            self._run(sink, event)
+
+    def _run(self, sink, event):
+        try:
+            with TRACER.span(f"sink:{sink.name}", event.cid or None):
+                sink.handler(event)
+        except Exception as e:
+            sink.errors += 1
+            if self._on_error:
+                try: self._on_error(f"[{sink.name}] {e}")
+                except Exception: pass
+            return
+        sink.handled += 1
+        sink.latency.append(time.time() - event.det_ts)
+
+    def stats(self):
+        out = {}
+        with self._lock:
+            sinks = list(self._sinks)
+        for s in sinks:
+            lat = sorted(s.latency)
+            out[s.name] = {
+                "handled": s.handled, "dropped": s.dropped, "errors": s.errors,
+                "queue": 0 if s.inline else s.q.qsize(),
+                "p50_ms": lat[len(lat) // 2] * 1000 if lat else None,
+                "max_ms": lat[-1] * 1000 if lat else None,
+            }
+        return out
+
+    def stop(self):
+        self._running = False
+        with self._lock:
+            sinks = list(self._sinks)
+        for s in sinks:
+            if s.thread: s.thread.join(timeout=0.5)
@@ -0,0 +1,301 @@
+# ========================== feature_store.py ==========================
+# - 오프라인 특징 추출(프로세스 풀) + 메모리 맵 특징 저장소 + 코퍼스 평가 CLI (개발 PC / Pi 공용)
+#   · 전처리는 features.FeatureExtractor = DetectionWorker와 같은 코드
+#     (int32 스케일 /2^31 × 0.1 → 147/160 리샘플 → gtgram(44100, 0.025, 0.010, 64, 50) → log(+1e-6) → 60프레임)
+#   · WAV는 먼저 마이크 경로와 같은 형태(int32 스케일, 48kHz, L 채널)로 맞춘 뒤 0.6s 윈도우(hop 0.3s)로 자름
+#   · 라벨 = 상위 폴더 이름(Horn/None/Siren, 대소문자 무시), 그 외 폴더는 -1(평가 제외)
+# - 저장소(<store>/)
+#   · shard_00000.npy ... : (N, 64, 60) float32 — 읽을 때 mmap_mode="r"(cascade.py tune/report 입력으로도 사용 가능)
+#   · index.json          : 전처리 파라미터 + 클립별 {path, sha1, label, shard, start, count, sec}
+#   · 내용 sha1이 색인에 있으면 재추출 생략(이름/위치만 바뀐 클립도 재사용), 사라진 클립은 색인에서 제거,
+#     어떤 클립도 참조하지 않는 shard 파일은 삭제. 전처리 파라미터가 바뀌면 전체 재추출
+# - CLI
+#   python feature_store.py extract <wav_dir> <store> [--workers N] [--hop 0.3] [--shard 4096]
+#   python feature_store.py eval    <store> <model> [--screener s.npz] [--thr 0.15] [--batch 64]
+#       model: Keras SavedModel 폴더 또는 NumpyCNN .npz (--screener → cascade.CascadeModel, 배치 1)
+#       → 윈도우/클립(평균 확률) 단위 혼동 행렬 + 추론 처리량(windows/s, 오디오 1초당 ms)
+#   python feature_store.py stats   <store>
+
+import hashlib, json, os, sys, time
+import numpy as np
+from features import FeatureExtractor, read_wav, windows
+
+CLASS_NAMES = ['Horn', 'None', 'Siren']
+MIC_RATE, MODEL_RATE = 48000, 44100
+SEG_SEC, HOP_SEC = 0.6, 0.3
+WIN_T, HOP_T, NFILT, FMIN = 0.025, 0.010, 64, 50
+INDEX_VERSION = 1
+
+_W = {}   # 풀 워커 전역(initializer에서 설정)
+
+
+def _sha1(path):
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _params(hop_sec):
+    return dict(mic_rate=MIC_RATE, model_rate=MODEL_RATE, seg_sec=SEG_SEC, hop_sec=hop_sec,
+                win_t=WIN_T, hop_t=HOP_T, nfilt=NFILT, fmin=FMIN)
+
+
+def _init_worker(params, known):
+    p = dict(params)
+    _W["seg"] = int(p["mic_rate"] * p["seg_sec"])
+    _W["hop"] = int(p["mic_rate"] * p.pop("hop_sec"))
+    _W["fx"] = FeatureExtractor(**p)
+    _W["known"] = known
+
+
+def _extract_one(path):
+    # → (path, sha1, features | None(캐시 적중) | 오류 문자열, 오디오 초)
+    try:
+        sha = _sha1(path)
+        if sha in _W["known"]:
+            return path, sha, None, 0.0
+        fx, seg = _W["fx"], _W["seg"]
+        x = read_wav(path, fx.mic_rate)
+        sec = len(x) / fx.mic_rate
+        if len(x) < seg:
+            x = np.pad(x, (0, seg - len(x)))
+        starts = windows(len(x), seg, _W["hop"])
+        feats = np.empty((len(starts),) + fx.shape, dtype=np.float32)
+        for i, s in enumerate(starts):
+            fx(x[s:s + seg], out=feats[i])
+        return path, sha, feats, sec
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}", 0.0
+
+
+def _label(path, class_names):
+    name = os.path.basename(os.path.dirname(path)).lower()
+    lower = [c.lower() for c in class_names]
+    return lower.index(name) if name in lower else -1
+
+
+class FeatureStore:
+    def __init__(self, root):
+        self.root = root
+        self._mm = {}
+        try:
+            with open(os.path.join(root, "index.json")) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {"version": INDEX_VERSION, "params": None, "class_names": CLASS_NAMES, "clips": []}
+
+    @property
+    def clips(self):
+        return self.index["clips"]
+
+    def __len__(self):
+        return sum(c["count"] for c in self.clips)
+
+    def _shard_path(self, i):
+        return os.path.join(self.root, f"shard_{i:05d}.npy")
+
+    def shard(self, i):
+        if i not in self._mm:
+            self._mm[i] = np.load(self._shard_path(i), mmap_mode="r")
+        return self._mm[i]
+
+    def features(self, clip):
+        return self.shard(clip["shard"])[clip["start"]:clip["start"] + clip["count"]]
+
+    # ---------- 기록(.part → os.replace) ----------
+    def _write_shard(self, i, arrays):
+        tmp = self._shard_path(i) + ".part"
+        with open(tmp, "wb") as f:
+            np.save(f, np.concatenate(arrays, axis=0))
+        os.replace(tmp, self._shard_path(i))
+
+    def _save_index(self):
+        tmp = os.path.join(self.root, "index.json.part")
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, os.path.join(self.root, "index.json"))
+
+    # ---------- 추출 ----------
+    def extract(self, wav_dir, workers=None, hop_sec=HOP_SEC, shard_size=4096, class_names=CLASS_NAMES):
+        os.makedirs(self.root, exist_ok=True)
+        params = _params(hop_sec)
+        old = {c["sha1"]: c for c in self.clips} if self.index.get("params") == params else {}
+        paths = sorted(os.path.join(d, f) for d, _, fs in os.walk(wav_dir)
+                       for f in fs if f.lower().endswith(".wav"))
+        used = [int(f[6:11]) for f in os.listdir(self.root) if f.startswith("shard_") and f.endswith(".npy")]
+        next_shard = max(used, default=-1) + 1
+        workers = workers or os.cpu_count() or 1
+
+        clips, pending, rows = [], [], 0
+        stats = dict(clips=0, reused=0, failed=0, windows=0, sec=0.0)
+
+        def _flush():
+            nonlocal next_shard, pending, rows
+            if pending:
+                self._write_shard(next_shard, [f for _, f in pending])
+                start = 0
+                for clip, f in pending:
+                    clip.update(shard=next_shard, start=start, count=len(f))
+                    start += len(f)
+                next_shard += 1
+                pending, rows = [], 0
+
+        t0 = time.perf_counter()
+        if workers > 1 and len(paths) > 1:
+            from multiprocessing import Pool
+            pool = Pool(workers, initializer=_init_worker, initargs=(params, frozenset(old)))
+            results = pool.imap_unordered(_extract_one, paths, chunksize=max(1, len(paths) // (workers * 8)))
+        else:
+            pool = None
+            _init_worker(params, frozenset(old))
+            results = map(_extract_one, paths)
+        try:
+            for n, (path, sha, feats, sec) in enumerate(results, 1):
+                if sha is None:
+                    stats["failed"] += 1
+                    print(f"[extract] 건너뜀 {path}: {feats}")
+                    continue
+                clip = {"path": os.path.relpath(path, wav_dir), "sha1": sha, "label": _label(path, class_names)}
+                if feats is None:
+                    prev = old[sha]
+                    clip.update({k: prev[k] for k in ("shard", "start", "count", "sec")})
+                    stats["reused"] += 1
+                else:
+                    clip["sec"] = round(sec, 3)
+                    pending.append((clip, feats))
+                    rows += len(feats)
+                    stats["windows"] += len(feats)
+                    stats["sec"] += sec
+                    if rows >= shard_size:
+                        _flush()
+                clips.append(clip)
+                stats["clips"] += 1
+                if n % 200 == 0:
+                    print(f"[extract] {n}/{len(paths)} ...")
+            _flush()
+        finally:
+            if pool is not None:
+                pool.close(); pool.join()
+        wall = time.perf_counter() - t0
+
+        clips.sort(key=lambda c: c["path"])
+        self.index = {"version": INDEX_VERSION, "params": params, "class_names": list(class_names), "clips": clips}
+        self._save_index()
+        # 참조되지 않는 shard 정리
+        live = {c["shard"] for c in clips}
+        self._mm.clear()
+        for i in used:
+            if i not in live:
+                os.remove(self._shard_path(i))
+        stats["wall"] = wall
+        print(f"[extract] clips {stats['clips']} (재사용 {stats['reused']}, 실패 {stats['failed']}), "
+              f"새 윈도우 {stats['windows']} / 오디오 {stats['sec']:.0f} s in {wall:.1f} s "
+              f"→ {stats['sec'] / max(wall, 1e-9):.1f}x 실시간, workers {workers}")
+        return stats
+
+    def _batches(self, batch):
+        # 클립 경계를 넘어 batch개씩 묶음 → (x(N, H, W, 1), 각 행의 클립 번호)
+        xs, owners, n = [], [], 0
+        for ci, clip in enumerate(self.clips):
+            f = self.features(clip)
+            for i in range(0, len(f), batch):
+                part = f[i:i + batch]
+                xs.append(part); owners.append(np.full(len(part), ci, dtype=np.intp)); n += len(part)
+                if n >= batch:
+                    yield np.concatenate(xs)[..., None].astype(np.float32, copy=False), np.concatenate(owners)
+                    xs, owners, n = [], [], 0
+        if n:
+            yield np.concatenate(xs)[..., None].astype(np.float32, copy=False), np.concatenate(owners)
+
+
+# ===================== 평가 =====================
+def evaluate(store, model, batch=64):
+    names = store.index.get("class_names", CLASS_NAMES)
+    k = len(names)
+    cm_win = np.zeros((k, k), dtype=np.int64)
+    cm_clip = np.zeros((k, k), dtype=np.int64)
+    psum = np.zeros((len(store.clips), k), dtype=np.float64)
+    labels = np.array([c["label"] for c in store.clips], dtype=np.intp)
+    t_pred, n = 0.0, 0
+    for x, owners in store._batches(batch):
+        t0 = time.perf_counter()
+        p = np.asarray(model.predict(x, verbose=0), dtype=np.float32).reshape(len(x), k)
+        t_pred += time.perf_counter() - t0
+        n += len(x)
+        np.add.at(psum, owners, p)
+        lab = labels[owners]
+        ok = lab >= 0
+        np.add.at(cm_win, (lab[ok], p[ok].argmax(-1)), 1)
+    ok = labels >= 0
+    np.add.at(cm_clip, (labels[ok], psum[ok].argmax(-1)), 1)
+    hop_sec = (store.index.get("params") or {}).get("hop_sec", HOP_SEC)
+    return dict(class_names=names, cm_window=cm_win, cm_clip=cm_clip, windows=n, predict_sec=t_pred,
+                audio_sec=n * hop_sec)
+
+
+def _print_cm(title, cm, names):
+    w = max(7, max(len(s) for s in names) + 1)
+    print(f"  {title} (행=정답, 열=예측)")
+    print("  " + " " * w + "".join(f"{s:>{w}}" for s in names) + f"{'recall':>{w}}")
+    for i, s in enumerate(names):
+        tot = cm[i].sum()
+        rec = f"{cm[i, i] / tot * 100:.1f}%" if tot else "-"
+        print("  " + f"{s:<{w}}" + "".join(f"{v:>{w}d}" for v in cm[i]) + f"{rec:>{w}}")
+    total = cm.sum()
+    print(f"  accuracy {np.trace(cm) / total * 100 if total else 0:.1f}% ({total})")
+
+
+def _report(r):
+    print(f"[eval] windows {r['windows']} ({r['audio_sec']:.0f} s audio)")
+    _print_cm("window", r["cm_window"], r["class_names"])
+    _print_cm("clip  ", r["cm_clip"], r["class_names"])
+    t = max(r["predict_sec"], 1e-9)
+    print(f"  throughput {r['windows'] / t:.0f} windows/s, {t / max(r['windows'], 1) * 1000:.2f} ms/window, "
+          f"{t / max(r['audio_sec'], 1e-9) * 1000:.1f} ms CPU / s audio")
+
+
+def _load_backend(model_path, screener_path=None, thr=0.15, class_names=CLASS_NAMES):
+    from cascade import CascadeModel
+    from numpy_cnn import load_model
+    model = load_model(model_path)
+    if screener_path:
+        model = CascadeModel(load_model(screener_path), model, class_names, thr)
+    return model
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    opts = {}
+    for k in ("--workers", "--hop", "--shard", "--screener", "--thr", "--batch"):
+        if k in args:
+            i = args.index(k); opts[k] = args[i + 1]; del args[i:i + 2]
+    if len(args) == 3 and args[0] == "extract":
+        FeatureStore(args[2]).extract(args[1], int(opts.get("--workers", 0)) or None,
+                                      float(opts.get("--hop", HOP_SEC)), int(opts.get("--shard", 4096)))
+    elif len(args) == 3 and args[0] == "eval":
+        store = FeatureStore(args[1])
+        names = store.index.get("class_names", CLASS_NAMES)
+        model = _load_backend(args[2], opts.get("--screener"), float(opts.get("--thr", 0.15)), names)
+        # CascadeModel은 윈도우 1개 단위 인터페이스
+        batch = 1 if "--screener" in opts else int(opts.get("--batch", 64))
+        r = evaluate(store, model, batch)
+        _report(r)
+        if hasattr(model, "pass_rate"):
+            print(f"  cascade 본 모델 통과율 {model.pass_rate * 100:.1f}%")
+    elif len(args) == 2 and args[0] == "stats":
+        store = FeatureStore(args[1])
+        names = store.index.get("class_names", CLASS_NAMES)
+        counts = {}
+        for c in store.clips:
+            key = names[c["label"]] if c["label"] >= 0 else "(unlabeled)"
+            counts[key] = counts.get(key, 0) + 1
+        print(f"[stats] clips {len(store.clips)}, windows {len(store)}, params {store.index.get('params')}")
+        for key, v in sorted(counts.items()):
+            print(f"  {key:<12} {v}")
+    else:
+        print("usage: feature_store.py extract <wav_dir> <store> [--workers N] [--hop 0.3] [--shard 4096]\n"
+              "       feature_store.py eval <store> <model> [--screener s.npz] [--thr 0.15] [--batch 64]\n"
+              "       feature_store.py stats <store>")
+        sys.exit(2)
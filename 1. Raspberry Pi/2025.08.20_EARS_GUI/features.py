@@ -0,0 +1,84 @@
+# ========================== features.py ==========================
+# - FeatureExtractor: DetectionWorker와 오프라인 도구(feature_store.py)가 공유하는 운영 전처리
+#   · resample(seg) : int32 스케일 마이크 샘플 → (/2^31 × 0.1) → 147/160 리샘플(48k → 44.1k) → float32
+#   · gammatone(x)  : gtgram(64 필터, 25ms/10ms, fmin 50) → log(+1e-6) → 60프레임 pad/crop → (64, 60)
+#   · __call__(seg, out=None) : 두 단계를 이어서 실행
+#   · 작업 버퍼(스케일 결과, 모델 입력 텐서 x(1, 64, 60, 1))와 리샘플 FIR 계수를 생성 시 1회 할당 → 세그먼트마다 재사용
+#     (반환값은 내부 버퍼 view: 다음 호출 전에 소비하거나 out=으로 받을 것)
+#   · 남는 할당은 resample_poly/gtgram 내부뿐(alloc_audit.py로 측정)
+#   · float32 스케일/FIR이라 이전 float64 경로와 비트 단위로 같다고 보장하지 않음(scipy 빌드에 따라 ~1e-8 차이)
+#     → 허용 오차 기준 동등성은 tests/test_features.py로 확인
+# - read_wav(path, mic_rate): WAV → 마이크 경로와 같은 int32 스케일 float32 모노(L 채널), mic_rate로 변환
+# - windows(x, seg, hop)    : 운영과 같은 겹침 윈도우(0.6s / 0.3s) 시작 인덱스
+
+from math import gcd
+import numpy as np
+from scipy.signal import firwin, resample_poly
+from gammatone.gtgram import gtgram
+
+
+class FeatureExtractor:
+    def __init__(self, mic_rate=48000, model_rate=44100, seg_sec=0.6,
+                 win_t=0.025, hop_t=0.010, nfilt=64, fmin=50):
+        self.mic_rate, self.model_rate = mic_rate, model_rate
+        g = gcd(model_rate, mic_rate)
+        self.up, self.down = model_rate // g, mic_rate // g     # 48k → 44.1k: 147/160
+        self.win_t, self.hop_t, self.nfilt, self.fmin = win_t, hop_t, nfilt, fmin
+        self.target_frames = int(seg_sec / hop_t)
+        self.shape = (nfilt, self.target_frames)
+        self.seg_samples = int(mic_rate * seg_sec)
+        # resample_poly 기본 필터(kaiser 5.0)와 같은 계수를 미리 설계(호출마다 firwin 재설계 방지)
+        half = 10 * max(self.up, self.down)
+        self._fir = firwin(2 * half + 1, 1.0 / max(self.up, self.down), window=('kaiser', 5.0)).astype(np.float32)
+        self._scaled = np.empty(self.seg_samples, dtype=np.float32)
+        self.x = np.zeros((1,) + self.shape + (1,), dtype=np.float32)   # 모델 입력(재사용)
+        self.feat = self.x[0, :, :, 0]
+
+    def resample(self, seg):
+        # int32 스케일 → float32(/2^31 × 0.1을 곱셈 1회로, 제자리), 경량 리샘플
+        n = seg.shape[0]
+        if n > self._scaled.shape[0]:
+            self._scaled = np.empty(n, dtype=np.float32)
+        s = self._scaled[:n]
+        np.multiply(seg, np.float32(0.1 / 2**31), out=s, casting='unsafe')
+        return resample_poly(s, self.up, self.down, window=self._fir)
+
+    def gammatone(self, x, out=None):
+        gtg = gtgram(x, self.model_rate, self.win_t, self.hop_t, self.nfilt, self.fmin)
+        # log(+1e-6) → 60프레임 pad/crop: 결과 버퍼에 바로 기록(부족한 프레임은 0)
+        feat = self.feat if out is None else out
+        n = min(gtg.shape[1], self.target_frames)
+        v = feat[:, :n]
+        np.add(gtg[:, :n], 1e-6, out=v, casting='same_kind')
+        np.log(v, out=v)
+        feat[:, n:] = 0.0
+        return feat
+
+    def __call__(self, seg, out=None):
+        return self.gammatone(self.resample(seg), out)
+
+
+def read_wav(path, mic_rate=48000):
+    from scipy.io import wavfile
+    sr, data = wavfile.read(path)
+    if data.ndim > 1:
+        data = data[:, 0]                       # 운영과 같이 L 채널만
+    if data.dtype == np.int16:
+        x = data.astype(np.float32) * 65536.0
+    elif data.dtype == np.uint8:
+        x = (data.astype(np.float32) - 128.0) * float(1 << 24)
+    elif data.dtype == np.int32:
+        x = data.astype(np.float32)
+    else:                                       # float WAV(-1~1)
+        x = data.astype(np.float32) * float(2**31)
+    if sr != mic_rate:
+        g = gcd(mic_rate, sr)
+        x = resample_poly(x, mic_rate // g, sr // g).astype(np.float32)
+    return x
+
+
+def windows(n, seg, hop):
+    # 길이 n 신호에서 seg 길이 윈도우 시작 위치(짧으면 0 하나 → 호출 측에서 0 패딩)
+    if n <= seg:
+        return [0]
+    return list(range(0, n - seg + 1, hop))
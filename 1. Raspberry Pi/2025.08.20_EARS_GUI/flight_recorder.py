@@ -0,0 +1,157 @@
+# ========================== flight_recorder.py ==========================
+# - FlightRecorder: 최근 N초의 원본 오디오 / 감마톤 특징 / 확률 / DOA 각도를 항상 보관
+#   · 모든 링버퍼는 시작 시 한 번만 할당 → 핫패스는 슬라이스 복사만 수행
+#   · snapshot(): 락 안에서는 링 원본 memcpy + 위치만 잡고 즉시 반환(디스크 I/O 없음)
+#                 → 시간순 재배열(concatenate)은 writer 스레드에서 수행(오디오 콜백의 락 대기 최소화)
+#   · writer 스레드: 압축 NPZ 저장 후 디스크 용량(quota) 초과 시 오래된 파일부터 삭제
+#   · writer 큐가 가득 차면 새 스냅샷은 버림(감지 루프를 절대 막지 않음)
+# - load_snapshot(path): 저장된 NPZ → dict (오프라인 재생/평가 도구 입력)
+
+import os, threading, time
+from queue import Queue, Full, Empty
+import numpy as np
+
+
+class FlightRecorder:
+    def __init__(self, out_dir, mic_rate, class_names, seconds=10.0, hop_sec=0.3,
+                 feat_shape=(64, 60), quota_mb=512, max_pending=4):
+        self.out_dir = out_dir
+        self.mic_rate = mic_rate
+        self.class_names = list(class_names)
+        self.quota_bytes = int(quota_mb * (1 << 20))
+
+        # 원본 오디오 링(L 채널, int32 스케일 float32 그대로)
+        self._audio = np.zeros(int(seconds * mic_rate), dtype=np.float32)
+        self._a_pos = 0          # 다음에 쓸 위치
+        self._a_filled = 0
+        self._a_t_end = 0.0      # 링 마지막 샘플의 시각
+        self._a_lock = threading.Lock()
+
+        # 윈도우 단위 링(특징/확률/DOA/시각)
+        k = max(1, int(np.ceil(seconds / hop_sec)))
+        self._feat = np.zeros((k,) + tuple(feat_shape), dtype=np.float32)
+        self._post = np.zeros((k, len(self.class_names)), dtype=np.float32)
+        self._doa = np.full(k, -1, dtype=np.int16)
+        self._w_ts = np.zeros(k, dtype=np.float64)
+        self._w_pos = 0
+        self._w_filled = 0
+        self._w_lock = threading.Lock()
+
+        self._q = Queue(maxsize=max_pending)
+        self.saved = 0
+        self.dropped = 0
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, name="flight-writer", daemon=True)
+        self._writer.start()
+
+    # ---- 핫패스: 오디오 콜백 ----
+    def push_audio(self, block, t_end):
+        n = block.shape[0]
+        cap = self._audio.shape[0]
+        if n >= cap:
+            block, n = block[-cap:], cap
+        with self._a_lock:
+            p = self._a_pos
+            first = min(n, cap - p)
+            self._audio[p:p + first] = block[:first]
+            if first < n:
+                self._audio[:n - first] = block[first:]
+            self._a_pos = (p + n) % cap
+            self._a_filled = min(cap, self._a_filled + n)
+            self._a_t_end = t_end
+
+    # ---- 핫패스: 추론 루프(윈도우 1개당 1회) ----
+    def push_window(self, t_start, feat, post, doa=-1):
+        with self._w_lock:
+            i = self._w_pos
+            self._feat[i] = feat
+            self._post[i] = post
+            self._doa[i] = doa
+            self._w_ts[i] = t_start
+            self._w_pos = (i + 1) % self._feat.shape[0]
+            self._w_filled = min(self._feat.shape[0], self._w_filled + 1)
+
+    @staticmethod
+    def _ordered(ring, pos, filled):
+        # 링 → 시간순 복사본
+        if filled < ring.shape[0]:
+            return ring[:filled].copy()
+        return np.concatenate([ring[pos:], ring[:pos]])
+
+    def snapshot(self, reason="manual", **meta):
+        if self._q.full():
+            self.dropped += 1
+            return False
+        # 락 안: 원본 링 복사(단일 memcpy)와 위치만 기록, 재배열은 writer에서
+        with self._a_lock:
+            a_raw = (self._audio.copy(), self._a_pos, self._a_filled)
+            a_t_end = self._a_t_end
+        with self._w_lock:
+            w_pos = (self._w_pos, self._w_filled)
+            w_raw = (self._feat.copy(), self._post.copy(), self._doa.copy(), self._w_ts.copy())
+        snap = dict(mic_rate=self.mic_rate, class_names=np.array(self.class_names),
+                    reason=reason, snap_ts=time.time(), **meta)
+        try:
+            self._q.put_nowait((snap, a_raw, a_t_end, w_raw, w_pos))
+            return True
+        except Full:
+            self.dropped += 1
+            return False
+
+    def _assemble(self, snap, a_raw, a_t_end, w_raw, w_pos):
+        audio = self._ordered(*a_raw)
+        feat, post, doa, w_ts = (self._ordered(r, *w_pos) for r in w_raw)
+        snap.update(audio=audio, audio_t0=a_t_end - audio.shape[0] / self.mic_rate,
+                    features=feat, posteriors=post, doa=doa, window_ts=w_ts)
+        return snap
+
+    # ---- 백그라운드 writer ----
+    def _write_loop(self):
+        while self._running or not self._q.empty():
+            try:
+                item = self._q.get(timeout=0.2)
+            except Empty:
+                continue
+            try:
+                snap = self._assemble(*item)
+                os.makedirs(self.out_dir, exist_ok=True)
+                stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(snap["snap_ts"]))
+                name = f"fr_{stamp}_{int(snap['snap_ts'] * 1000) % 1000:03d}_{snap['reason']}.npz"
+                path = os.path.join(self.out_dir, name)
+                tmp = path + ".part"
+                with open(tmp, "wb") as f:
+                    np.savez_compressed(f, **snap)
+                os.replace(tmp, path)
+                self.saved += 1
+                self._enforce_quota()
+            except Exception as e:
+                print("[FLIGHT] 저장 실패:", e)
+
+    def _enforce_quota(self):
+        files = []
+        for n in os.listdir(self.out_dir):
+            if n.startswith("fr_") and n.endswith(".npz"):
+                p = os.path.join(self.out_dir, n)
+                st = os.stat(p)
+                files.append((st.st_mtime, st.st_size, p))
+        total = sum(f[1] for f in files)
+        for _, size, p in sorted(files):
+            if total <= self.quota_bytes:
+                break
+            try:
+                os.remove(p); total -= size
+            except OSError:
+                pass
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        self._writer.join(timeout)
+
+
+def load_snapshot(path):
+    with np.load(path, allow_pickle=False) as z:
+        out = {k: z[k] for k in z.files}
+    # 0차원 배열(스칼라 메타데이터)은 파이썬 값으로
+    out = {k: (v.item() if v.ndim == 0 else v) for k, v in out.items()}
+    out["class_names"] = [str(c) for c in out["class_names"]]
+    return out
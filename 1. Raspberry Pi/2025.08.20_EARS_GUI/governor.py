@@ -0,0 +1,157 @@
+# ========================== governor.py ==========================
+# - SysfsProbe: SoC 온도(/sys/class/thermal), 클럭 상한 비율(cpufreq scaling_max / cpuinfo_max),
+#               Raspberry Pi 펌웨어 스로틀 비트(get_throttled) 읽기
+#   · 현재 클럭(scaling_cur_freq)은 유휴 시 ondemand가 낮추므로 스로틀 판단에 쓰지 않음
+#   · root 경로를 바꾸면 가짜 sysfs 디렉터리로 시뮬레이션 가능(차량 고온/스로틀 재현)
+# - Governor  : 온도·스로틀·감지 백로그(버퍼에 쌓인 오디오 초)를 보고 단계(level)를 올리고/내림
+#   · 올릴 때는 즉시, 내릴 때는 cool_ticks 동안 연속으로 여유가 있을 때만(히스테리시스)
+#   · 단계별 knob: 추론 간격(hop), BLAS 스레드 수, 카메라 해상도/fps, 캐스케이드 임계 가산(게이팅 강도)
+#   · 변경마다 이벤트 기록(print + METRICS + TRACER + events 목록)
+# - 실제 knob 적용은 apply_fn(knobs) 콜백이 담당(워커 구조를 이 모듈이 알 필요 없음)
+
+import glob, os, threading, time
+from metrics import METRICS
+from tracing import TRACER
+
+# level 0 = 정상, 숫자가 클수록 절약
+LEVELS = (
+    dict(hop_sec=0.3, threads=4, cam_w=640, cam_h=480, cam_fps=15, screen_boost=0.00),
+    dict(hop_sec=0.4, threads=2, cam_w=640, cam_h=480, cam_fps=10, screen_boost=0.05),
+    dict(hop_sec=0.6, threads=2, cam_w=320, cam_h=240, cam_fps=10, screen_boost=0.10),
+    dict(hop_sec=0.6, threads=1, cam_w=320, cam_h=240, cam_fps=5,  screen_boost=0.20),
+)
+
+
+THROTTLED_PATH = "sys/devices/platform/soc/soc:firmware/get_throttled"
+
+
+def _read_int(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class SysfsProbe:
+    def __init__(self, root="/"):
+        self.root = root
+
+    def _p(self, rel):
+        return os.path.join(self.root, rel)
+
+    def temp_c(self):
+        vals = [_read_int(p) for p in glob.glob(self._p("sys/class/thermal/thermal_zone*/temp"))]
+        vals = [v for v in vals if v is not None]
+        return max(vals) / 1000.0 if vals else None
+
+    def freq_cap_ratio(self):
+        # 코어별 허용 최대 클럭(thermal/정책이 낮춘 상한) / 하드웨어 최대 클럭 중 최소값
+        ratios = []
+        for d in glob.glob(self._p("sys/devices/system/cpu/cpu[0-9]*/cpufreq")):
+            cap = _read_int(os.path.join(d, "scaling_max_freq"))
+            mx = _read_int(os.path.join(d, "cpuinfo_max_freq"))
+            if cap and mx:
+                ratios.append(cap / mx)
+        return min(ratios) if ratios else None
+
+    def throttled(self):
+        # RPi 펌웨어 get_throttled(16진수): 현재 상태 비트 1 클럭 제한, 2 스로틀, 3 소프트 온도 제한
+        try:
+            with open(self._p(THROTTLED_PATH)) as f:
+                return bool(int(f.read().strip(), 16) & 0xE)
+        except (OSError, ValueError):
+            return None
+
+
+class Governor:
+    def __init__(self, probe, backlog_fn, apply_fn, levels=LEVELS,
+                 hot_c=75.0, cool_c=68.0, throttle_ratio=0.8,
+                 backlog_hi=1.0, backlog_lo=0.3, cool_ticks=5, interval=1.0):
+        self.probe = probe
+        self.backlog_fn = backlog_fn     # () -> 처리 못 한 오디오(초)
+        self.apply_fn = apply_fn         # (knobs: dict) -> None
+        self.levels = levels
+        self.hot_c, self.cool_c = hot_c, cool_c
+        self.throttle_ratio = throttle_ratio
+        self.backlog_hi, self.backlog_lo = backlog_hi, backlog_lo
+        self.cool_ticks = cool_ticks
+        self.interval = interval
+        self.level = 0
+        self._calm = 0
+        self.events = []                 # (ts, old, new, reason)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def tick(self, now=None):
+        temp = self.probe.temp_c()
+        ratio = self.probe.freq_cap_ratio()
+        fw = self.probe.throttled()
+        try:
+            backlog = float(self.backlog_fn())
+        except Exception:
+            backlog = 0.0
+        if temp is not None: METRICS.gauge("soc_temp_c", temp)
+        if ratio is not None: METRICS.gauge("cpu_freq_cap_ratio", round(ratio, 3))
+        if fw is not None: METRICS.gauge("fw_throttled", int(fw))
+        METRICS.gauge("det_backlog_sec", round(backlog, 3))
+
+        hot = []
+        if temp is not None and temp >= self.hot_c: hot.append(f"temp {temp:.1f}C")
+        if ratio is not None and ratio < self.throttle_ratio: hot.append(f"freq cap {ratio * 100:.0f}%")
+        if fw: hot.append("fw throttled")
+        if backlog >= self.backlog_hi: hot.append(f"backlog {backlog:.2f}s")
+        calm = ((temp is None or temp < self.cool_c)
+                and (ratio is None or ratio >= self.throttle_ratio)
+                and not fw
+                and backlog < self.backlog_lo)
+
+        if hot and self.level < len(self.levels) - 1:
+            self._calm = 0
+            self._set(self.level + 1, ", ".join(hot), now)
+        elif calm and self.level > 0:
+            self._calm += 1
+            if self._calm >= self.cool_ticks:
+                self._calm = 0
+                self._set(self.level - 1, "cooled", now)
+        else:
+            self._calm = 0
+        return self.level
+
+    def _set(self, new, reason, now=None):
+        old, self.level = self.level, new
+        ts = time.time() if now is None else now
+        self.events.append((ts, old, new, reason))
+        METRICS.inc("governor_changes")
+        METRICS.gauge("governor_level", new)
+        TRACER.instant(f"governor {old}->{new}")
+        print(f"[GOV] level {old} → {new} ({reason})")
+        try:
+            self.apply_fn(dict(self.levels[new]))
+        except Exception as e:
+            print("[GOV] knob 적용 실패:", e)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.tick()
+
+    def start(self):
+        try:
+            self.apply_fn(dict(self.levels[self.level]))
+        except Exception as e:
+            print("[GOV] knob 적용 실패:", e)
+        self._thread = threading.Thread(target=self._loop, name="governor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def set_blas_threads(n):
+    # threadpoolctl이 있으면 NumPy BLAS 스레드 수를 런타임에 제한(없으면 무시)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return False
+    threadpool_limits(limits=int(n), user_api="blas")
+    return True
@@ -0,0 +1,228 @@
+# ========================== hud_render.py ==========================
+# - ChromeLayer      : 정적 화면 요소(가로/세로 구분선, 소리/방향 아이콘)를 한 번만 QPixmap에 그려 두고
+#                      paintEvent에서는 변경된(dirty) 영역만 복사 → 위젯별 paintEvent 여러 개를 하나로 대체
+# - FrameAtlas       : GIF를 표시 크기로 미리 디코드한 프레임 목록(QImage, 백그라운드 스레드)
+#                      메모리 한도(budget)를 넘으면 프레임을 솎아내고 지연 시간을 합산
+# - AtlasMovieWidget : FrameAtlas 재생(자기 영역만 update), 숨김 상태에서는 타이머 정지
+# - AtlasToggleLabel : SimpleToggleLabel과 같은 인터페이스(toggled, set_gif)를 FrameAtlas로 구현
+# - PaintProfiler    : (EARS_PROFILE_UI=1) 위젯 클래스별 repaint 횟수, GUI 스레드 지연, RSS를 METRICS로 기록
+# - FirstPaintProbe  : 위젯의 첫 paint 시점 = 프로세스 시작/부팅 이후 경과 초를 METRICS 게이지로 기록
+# - assets(AssetCache)를 넘기면 아이콘/GIF 프레임을 미리 축소된 캐시에서 읽음(asset_cache.py)
+
+import math, threading, time
+from PySide6.QtCore import Qt, QObject, QEvent, QTimer, Signal
+from PySide6.QtGui import QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QWidget
+from metrics import METRICS, process_age, rss_mb
+from asset_cache import decode_frames
+
+
+class ChromeLayer(QWidget):
+    def __init__(self, parent, size=(800, 480), hrules=(), vrules=(), icons=(), color=Qt.white, assets=None):
+        """
+        hrules: [(y, thickness)], vrules: [(x, y0, y1, thickness)]
+        icons : [(image_path, (x, y, w, h))] — 비율 유지 축소 후 사각형 중앙 배치(기존 QLabel과 동일)
+        """
+        super().__init__(parent)
+        self.setGeometry(0, 0, *size)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        self._cache = QPixmap(*size)
+        self._cache.fill(Qt.transparent)
+        p = QPainter(self._cache)
+        # 기존 HRule/VRule은 굵기 t 펜으로 위젯 경계에 선을 그려 절반만 보였음 → 같은 픽셀 폭으로 채움
+        for y, t in hrules:
+            p.fillRect(0, y, size[0], max(1, (t + 1) // 2), color)
+        for x, y0, y1, t in vrules:
+            if y1 < y0: y0, y1 = y1, y0
+            p.fillRect(x, y0, max(1, (t + 1) // 2), y1 - y0, color)
+        for path, (x, y, w, h) in icons:
+            img = assets.image(path, (w, h)) if assets else QImage(path)
+            if img.isNull():
+                continue
+            if img.width() > w or img.height() > h:
+                img = img.scaled(w, h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            p.drawImage(x + (w - img.width()) // 2, y + (h - img.height()) // 2, img)
+        p.end()
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        r = e.rect()
+        p.drawPixmap(r, self._cache, r)
+        p.end()
+
+
+class FrameAtlas:
+    def __init__(self, path, size, budget_bytes=16 << 20, assets=None):
+        self.path = path
+        self.assets = assets
+        self.w, self.h = size
+        self.budget = budget_bytes
+        self.frames = []          # [(QImage, delay_ms)]
+        self.bytes = 0
+        self.ready = threading.Event()
+
+    def load_async(self):
+        threading.Thread(target=self.load, name="atlas-decode", daemon=True).start()
+        return self
+
+    def load(self):
+        t0 = time.perf_counter()
+        size = (self.w, self.h)
+        frames = self.assets.frames(self.path, size) if self.assets else decode_frames(self.path, size)
+        # 메모리 한도 초과 시 step 간격으로 솎고 건너뛴 프레임의 지연을 합산(재생 길이 유지)
+        per = self.w * self.h * 4
+        keep = max(1, self.budget // per)
+        if len(frames) > keep:
+            step = math.ceil(len(frames) / keep)
+            frames = [(frames[i][0], sum(d for _, d in frames[i:i + step]))
+                      for i in range(0, len(frames), step)]
+        self.frames = frames
+        self.bytes = per * len(frames)
+        METRICS.observe("atlas_decode", time.perf_counter() - t0)
+        self.ready.set()
+        return self
+
+
+class AtlasMovieWidget(QWidget):
+    finished = Signal()
+
+    def __init__(self, atlas, parent=None, loop=True):
+        super().__init__(parent)
+        self.atlas = atlas
+        self.loop = loop
+        self._i = 0
+        self._playing = False
+        self._timer = QTimer(self); self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._advance)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+
+    def start(self):
+        self._playing = True
+        self._schedule()
+
+    def stop(self):
+        self._playing = False
+        self._timer.stop()
+
+    def _schedule(self):
+        if not self._playing or not self.isVisible():
+            return
+        if not self.atlas.ready.is_set():
+            self._timer.start(50)   # 디코드 완료 대기
+            return
+        self._timer.start(self.atlas.frames[self._i][1] if self.atlas.frames else 100)
+
+    def _advance(self):
+        n = len(self.atlas.frames)
+        if n:
+            if self._i + 1 >= n and not self.loop:
+                self._playing = False
+                self.finished.emit()
+                return
+            self._i = (self._i + 1) % n
+            self.update()
+        self._schedule()
+
+    def current(self):
+        if self.atlas.ready.is_set() and self.atlas.frames:
+            return self.atlas.frames[self._i][0]
+        return None
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        if self._playing: self._schedule()
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self._timer.stop()   # 숨김 중에는 프레임 진행/repaint 없음
+
+    def paintEvent(self, _):
+        img = self.current()
+        if img is None:
+            return
+        p = QPainter(self)
+        p.drawImage(self.rect(), img)
+        p.end()
+
+
+class AtlasToggleLabel(AtlasMovieWidget):
+    toggled = Signal(bool)
+
+    def __init__(self, still, atlas, parent=None):
+        # still: 경로 또는 (캐시에서 읽은) QImage
+        super().__init__(atlas, parent, loop=True)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, False)
+        self._still = QPixmap.fromImage(still) if isinstance(still, QImage) else QPixmap(still)
+        self._show_gif = False
+
+    def set_gif(self, show: bool):
+        if show != self._show_gif:
+            self._show_gif = show
+            self.start() if show else self.stop()
+            self.update()
+            self.toggled.emit(show)
+
+    def mousePressEvent(self, e):
+        if e.button() == Qt.LeftButton:
+            self.set_gif(not self._show_gif)
+
+    def paintEvent(self, _):
+        p = QPainter(self)
+        img = self.current() if self._show_gif else None
+        if img is not None:
+            p.drawImage(self.rect(), img)
+        else:
+            p.drawPixmap(self.rect(), self._still)
+        p.end()
+
+
+class PaintProfiler(QObject):
+    """앱 전체 이벤트 필터: Paint 이벤트 수(클래스별) + GUI 이벤트 루프 지연 + RSS."""
+
+    def __init__(self, app, lag_interval_ms=50):
+        super().__init__(app)
+        self._interval = lag_interval_ms / 1000.0
+        self._last = time.perf_counter()
+        app.installEventFilter(self)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start(lag_interval_ms)
+        METRICS.add_collector(self._rss)
+
+    def eventFilter(self, obj, ev):
+        if ev.type() == QEvent.Paint:
+            METRICS.inc(f"paint_{type(obj).__name__}")
+        return False
+
+    def _tick(self):
+        # 타이머가 늦게 불린 만큼 = GUI 스레드가 다른 일(주로 repaint)로 바빴던 시간
+        now = time.perf_counter()
+        METRICS.observe("gui_loop_lag", max(0.0, now - self._last - self._interval))
+        self._last = now
+
+    @staticmethod
+    def _rss():
+        mb = rss_mb()
+        return {} if mb is None else {"rss_mb": mb}
+
+
+class FirstPaintProbe(QObject):
+    def __init__(self, widget, name="first_paint"):
+        super().__init__(widget)
+        self.name = name
+        self._widget = widget
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, ev):
+        if ev.type() == QEvent.Paint:
+            self._widget.removeEventFilter(self)
+            QTimer.singleShot(0, self._record)   # paint가 끝난 뒤 기록
+        return False
+
+    def _record(self):
+        age, up = process_age()
+        if age is None:
+            return
+        METRICS.gauge(f"{self.name}_s", round(age, 3))
+        METRICS.gauge(f"boot_to_{self.name}_s", round(up, 3))
+        print(f"[UI] {self.name}: 프로세스 시작 후 {age:.2f}s (부팅 후 {up:.1f}s)")
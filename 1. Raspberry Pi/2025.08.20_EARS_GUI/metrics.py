@@ -0,0 +1,206 @@
+# ========================== metrics.py ==========================
+# - LatencyHistogram: HDR 방식(2의 거듭제곱 구간 × 16 선형 하위구간, 상대오차 ~6%) 지연 히스토그램
+# - Metrics         : 단계별 타이머/카운터/게이지 레지스트리 (전역 METRICS 하나를 모든 워커가 공유)
+#   · with METRICS.time("resample"): ...   /  METRICS.observe("serial_write", dt)
+#   · METRICS.inc("detections")  /  METRICS.gauge("det_backlog_samples", n)
+#   · add_collector(fn): 스크랩 시점에만 계산하는 값(큐 깊이 등)을 등록
+# - Prometheus text 포맷 출력 + 로컬 HTTP(/metrics) 엔드포인트 + 회전 파일 덤프
+# - process_age()/rss_mb(): 기동 시간·메모리 비교용(/proc), GUI와 헤드리스 데몬이 같은 방식으로 기록
+
+import os, threading, time, logging
+from logging.handlers import RotatingFileHandler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_SUB = 16          # 하위 구간 수(정밀도)
+_MAX_SHIFT = 40    # 2^40us(약 12일)까지 기록, 그 이상은 마지막 구간으로
+
+
+class LatencyHistogram:
+    """마이크로초 정수 단위로 기록, 초 단위로 조회."""
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (2 * _SUB + _MAX_SHIFT * _SUB)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def _index(us):
+        if us < 2 * _SUB:
+            return us
+        shift = min(us.bit_length() - 5, _MAX_SHIFT)
+        return 2 * _SUB + (shift - 1) * _SUB + min((us >> shift) - _SUB, _SUB - 1)
+
+    @staticmethod
+    def _value(idx):
+        # 구간 중앙값(us)
+        if idx < 2 * _SUB:
+            return float(idx)
+        shift = (idx - 2 * _SUB) // _SUB + 1
+        lo = ((idx - 2 * _SUB) % _SUB + _SUB) << shift
+        return lo + (1 << shift) / 2.0
+
+    def record(self, seconds):
+        us = int(seconds * 1e6) if seconds > 0 else 0
+        self.counts[self._index(us)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max: self.max = seconds
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if c and acc >= rank:
+                return min(self._value(i) / 1e6, self.max)
+        return self.max
+
+
+class _Timer:
+    __slots__ = ("m", "name", "t0")
+
+    def __init__(self, m, name):
+        self.m, self.name = m, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.m.observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class Metrics:
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, prefix="ears"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._hist = {}
+        self._counters = {}
+        self._gauges = {}
+        self._collectors = []
+
+    # ---- 기록(핫패스) ----
+    def time(self, name):
+        return _Timer(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            h = self._hist.get(name)
+            if h is None:
+                h = self._hist[name] = LatencyHistogram()
+            h.record(seconds)
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        self._gauges[name] = value
+
+    def add_collector(self, fn):
+        # fn() -> {gauge_name: value}; 스크랩/덤프 시점에만 호출
+        self._collectors.append(fn)
+
+    # ---- 조회 ----
+    def snapshot(self):
+        with self._lock:
+            hist = {k: (h.count, h.sum, h.max, [h.quantile(q) for q in self.QUANTILES])
+                    for k, h in self._hist.items()}
+            counters = dict(self._counters)
+        gauges = dict(self._gauges)
+        for fn in list(self._collectors):
+            try: gauges.update(fn())
+            except Exception: pass
+        return hist, counters, gauges
+
+    def render_prometheus(self):
+        hist, counters, gauges = self.snapshot()
+        p = self.prefix
+        out = [f"# TYPE {p}_stage_latency_seconds summary"]
+        for name in sorted(hist):
+            count, total, mx, qs = hist[name]
+            for q, v in zip(self.QUANTILES, qs):
+                out.append(f'{p}_stage_latency_seconds{{stage="{name}",quantile="{q}"}} {v:.6f}')
+            out.append(f'{p}_stage_latency_seconds_sum{{stage="{name}"}} {total:.6f}')
+            out.append(f'{p}_stage_latency_seconds_count{{stage="{name}"}} {count}')
+        out.append(f"# TYPE {p}_stage_latency_max_seconds gauge")
+        for name in sorted(hist):
+            out.append(f'{p}_stage_latency_max_seconds{{stage="{name}"}} {hist[name][2]:.6f}')
+        for name in sorted(counters):
+            out.append(f"# TYPE {p}_{name}_total counter")
+            out.append(f"{p}_{name}_total {counters[name]}")
+        for name in sorted(gauges):
+            out.append(f"# TYPE {p}_{name} gauge")
+            out.append(f"{p}_{name} {gauges[name]}")
+        return "\n".join(out) + "\n"
+
+    # ---- 내보내기 ----
+    def serve_http(self, port=9108, host="127.0.0.1"):
+        metrics = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404); return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *a):
+                pass  # 스크랩마다 stderr 출력하지 않음
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+    def start_file_dump(self, path, interval=10.0, max_bytes=1 << 20, backups=3):
+        log = logging.getLogger(f"{self.prefix}.metrics.file")
+        log.propagate = False
+        log.setLevel(logging.INFO)
+        log.addHandler(RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"))
+        stop = threading.Event()
+
+        def _loop():
+            while not stop.wait(interval):
+                try: log.info(f"# ts {time.time():.3f}\n" + self.render_prometheus())
+                except Exception: pass
+
+        threading.Thread(target=_loop, name="metrics-file", daemon=True).start()
+        return stop
+
+
+def process_age():
+    """(프로세스 시작 이후 초, 부팅 이후 초) — 인터프리터 기동/임포트 시간 포함."""
+    try:
+        with open("/proc/self/stat") as f:
+            start = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            up = float(f.read().split()[0])
+        return up - start / os.sysconf("SC_CLK_TCK"), up
+    except (OSError, ValueError, IndexError):
+        return None, None
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    return None
+
+
+METRICS = Metrics()
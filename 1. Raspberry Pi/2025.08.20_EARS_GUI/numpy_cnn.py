@@ -0,0 +1,244 @@
+# ========================== numpy_cnn.py ==========================
+# - TensorFlow 없이 감마톤 CNN(Conv2D/BN/ReLU/MaxPool/Dense)을 NumPy로 추론
+#   · export_npz(): SavedModel을 한 번 읽어 BatchNorm을 Conv 가중치/바이어스에 접어 넣은 .npz 생성
+#                   (BN은 linear Conv 바로 뒤만 접음, 지원하지 않는 구성은 ValueError)
+#   · NumpyCNN    : im2col + GEMM, 모든 중간 버퍼(패딩/패치/출력)를 로드 시 미리 할당해 재사용
+#                   predict(x, verbose=0)는 Keras와 같은 모양((N, classes))을 반환 → DetectionWorker에서 그대로 교체
+#   · load_model(): 경로로 백엔드 선택(.npz → NumpyCNN, 그 외 → Keras). 감지 워커/캐스케이드/오프라인 도구 공용
+# - CLI
+#   python numpy_cnn.py export <saved_model_dir> <out.npz>
+#   python numpy_cnn.py check  <saved_model_dir> <model.npz>   # Keras 대비 수치 일치 + RSS/임포트/지연 비교
+#   python numpy_cnn.py bench  <model.npz>                     # TF 없이 RSS/임포트/추론 지연만 측정
+#
+# .npz 구성: spec(JSON: 레이어 순서/형태) + L{i}_w / L{i}_b (float32)
+
+import json, sys, time
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from metrics import rss_mb
+
+
+# ===================== 내보내기(TF 필요, 개발 PC에서 1회) =====================
+def export_npz(saved_model_dir, out_path):
+    import tensorflow as tf
+    return export_model(tf.keras.models.load_model(saved_model_dir), out_path)
+
+
+def export_model(model, out_path):
+    # 로드된 Keras 모델 → .npz (테스트/노트북에서 직접 호출 가능)
+    layers = [l for l in model.layers if l.__class__.__name__ not in ("InputLayer", "Dropout")]
+    spec, arrays = {"input_shape": list(model.input_shape[1:]), "layers": []}, {}
+    i = 0
+    while i < len(layers):
+        l = layers[i]; kind = l.__class__.__name__; cfg = l.get_config()
+        if kind == "Conv2D":
+            if tuple(cfg["strides"]) != (1, 1) or cfg["padding"] != "same" or tuple(cfg["dilation_rate"]) != (1, 1):
+                raise ValueError(f"{l.name}: stride 1 / same padding Conv2D만 지원")
+            w, b = l.get_weights() if cfg["use_bias"] else (l.get_weights()[0], None)
+            if b is None: b = np.zeros(w.shape[-1], dtype=np.float32)
+            act = cfg["activation"]
+            # 바로 뒤 BatchNormalization → 채널별 scale/shift를 가중치에 접기
+            if i + 1 < len(layers) and layers[i + 1].__class__.__name__ == "BatchNormalization":
+                if act != "linear":
+                    # Conv(activation=...) → BN 이면 BN이 활성화 뒤에 적용되므로 가중치에 접을 수 없음
+                    raise ValueError(f"{l.name}: 활성화({act}) 뒤 BatchNormalization은 접을 수 없음 "
+                                     f"(Conv는 linear, 활성화는 BN 뒤 Activation 레이어로)")
+                bn = layers[i + 1]; bcfg = bn.get_config()
+                vals = dict(zip([v.name.split("/")[-1].split(":")[0] for v in bn.weights], bn.get_weights()))
+                gamma = vals.get("gamma", np.ones_like(b)); beta = vals.get("beta", np.zeros_like(b))
+                scale = gamma / np.sqrt(vals["moving_variance"] + bcfg["epsilon"])
+                w = w * scale; b = (b - vals["moving_mean"]) * scale + beta
+                i += 1
+            # BN 뒤의 Activation 레이어도 Conv에 합침
+            if i + 1 < len(layers) and layers[i + 1].__class__.__name__ == "Activation" and act == "linear":
+                act = layers[i + 1].get_config()["activation"]; i += 1
+            n = len(spec["layers"])
+            spec["layers"].append({"op": "conv", "k": list(w.shape[:2]), "act": act})
+            arrays[f"L{n}_w"] = w.astype(np.float32); arrays[f"L{n}_b"] = b.astype(np.float32)
+        elif kind == "MaxPooling2D":
+            strides = tuple(cfg["strides"] or cfg["pool_size"])
+            if tuple(cfg["pool_size"]) != (2, 2) or strides != (2, 2) or cfg["padding"] != "valid":
+                raise ValueError(f"{l.name}: 2x2/stride 2/valid padding MaxPooling만 지원")
+            spec["layers"].append({"op": "pool2"})
+        elif kind == "Flatten":
+            spec["layers"].append({"op": "flatten"})
+        elif kind == "Dense":
+            w, b = l.get_weights()
+            n = len(spec["layers"])
+            spec["layers"].append({"op": "dense", "act": cfg["activation"]})
+            arrays[f"L{n}_w"] = w.astype(np.float32); arrays[f"L{n}_b"] = b.astype(np.float32)
+        elif kind == "Activation":
+            spec["layers"].append({"op": "act", "act": cfg["activation"]})
+        else:
+            raise ValueError(f"지원하지 않는 레이어: {kind}({l.name})")
+        i += 1
+    np.savez(out_path, spec=np.array(json.dumps(spec)), **arrays)
+    return out_path
+
+
+# ===================== NumPy 추론 엔진 =====================
+def _activate(y, act):
+    if act == "relu":
+        np.maximum(y, 0, out=y)
+    elif act == "softmax":
+        y -= y.max(axis=-1, keepdims=True)
+        np.exp(y, out=y)
+        y /= y.sum(axis=-1, keepdims=True)
+    elif act not in ("linear", None):
+        raise ValueError(f"지원하지 않는 활성화: {act}")
+    return y
+
+
+class NumpyCNN:
+    def __init__(self, spec, arrays):
+        self.spec = spec
+        self.input_shape = tuple(spec["input_shape"])
+        self._plan = []
+        shape = self.input_shape   # (H, W, C)
+        for n, layer in enumerate(spec["layers"]):
+            op = layer["op"]
+            if op == "conv":
+                H, W, C = shape
+                kh, kw = layer["k"]
+                w = np.ascontiguousarray(arrays[f"L{n}_w"], dtype=np.float32)
+                cout = w.shape[-1]
+                ph, pw = kh // 2, kw // 2
+                pad = np.zeros((H + kh - 1, W + kw - 1, C), dtype=np.float32)   # 테두리 0은 고정
+                cols = np.empty((H * W, kh * kw * C), dtype=np.float32)
+                s0, s1, s2 = pad.strides
+                view = as_strided(pad, (H, W, kh, kw, C), (s0, s1, s0, s1, s2), writeable=False)
+                out = np.empty((H, W, cout), dtype=np.float32)
+                self._plan.append(("conv", dict(
+                    inner=pad[ph:ph + H, pw:pw + W], view=view, cols=cols,
+                    cols5=cols.reshape(H, W, kh, kw, C), w=w.reshape(-1, cout),
+                    b=arrays[f"L{n}_b"].astype(np.float32), out=out,
+                    out2=out.reshape(H * W, cout), act=layer["act"])))
+                shape = (H, W, cout)
+            elif op == "pool2":
+                H, W, C = shape
+                out = np.empty((H // 2, W // 2, C), dtype=np.float32)
+                self._plan.append(("pool2", dict(out=out)))
+                shape = out.shape
+            elif op == "flatten":
+                shape = (int(np.prod(shape)),)
+                self._plan.append(("flatten", {}))
+            elif op == "dense":
+                w = np.ascontiguousarray(arrays[f"L{n}_w"], dtype=np.float32)
+                out = np.empty((1, w.shape[1]), dtype=np.float32)
+                self._plan.append(("dense", dict(w=w, b=arrays[f"L{n}_b"].astype(np.float32),
+                                                 out=out, act=layer["act"])))
+                shape = (w.shape[1],)
+            elif op == "act":
+                self._plan.append(("act", dict(act=layer["act"])))
+            else:
+                raise ValueError(f"알 수 없는 op: {op}")
+        self.output_shape = shape
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            spec = json.loads(str(z["spec"]))
+            arrays = {k: z[k] for k in z.files if k != "spec"}
+        return cls(spec, arrays)
+
+    def _forward(self, x):
+        # x: (H, W, C) float32, 반환값은 내부 버퍼(다음 호출 시 덮어씀)
+        for op, p in self._plan:
+            if op == "conv":
+                np.copyto(p["inner"], x)
+                np.copyto(p["cols5"], p["view"])
+                np.matmul(p["cols"], p["w"], out=p["out2"])
+                p["out2"] += p["b"]
+                x = _activate(p["out"], p["act"])
+            elif op == "pool2":
+                o = p["out"]; h, w = o.shape[0] * 2, o.shape[1] * 2
+                np.maximum(x[0:h:2, 0:w:2], x[0:h:2, 1:w:2], out=o)
+                np.maximum(o, x[1:h:2, 0:w:2], out=o)
+                np.maximum(o, x[1:h:2, 1:w:2], out=o)
+                x = o
+            elif op == "flatten":
+                x = x.reshape(1, -1)
+            elif op == "dense":
+                np.matmul(x.reshape(1, -1), p["w"], out=p["out"])
+                p["out"] += p["b"]
+                x = _activate(p["out"], p["act"])
+            else:
+                x = _activate(x, p["act"])
+        return x
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == len(self.input_shape):
+            x = x[None, ...]
+        out = np.empty((x.shape[0],) + tuple(self.output_shape), dtype=np.float32)
+        for i in range(x.shape[0]):
+            out[i] = self._forward(x[i]).reshape(self.output_shape)
+        return out
+
+    __call__ = predict
+
+
+def load_model(path):
+    # .npz → TF 임포트 없이 NumPy 엔진(메모리/시작 시간 절감), 그 외 → 기존 Keras 경로
+    if str(path).endswith(".npz"):
+        return NumpyCNN.load(path)
+    import tensorflow as tf
+    return tf.keras.models.load_model(path)
+
+
+# ===================== 측정 유틸 =====================
+def _latency(predict, x, n=200):
+    predict(x)  # 워밍업
+    ts = []
+    for _ in range(n):
+        t0 = time.perf_counter(); predict(x); ts.append(time.perf_counter() - t0)
+    ts.sort()
+    return ts[len(ts) // 2] * 1000, ts[int(len(ts) * 0.99) - 1] * 1000
+
+
+def _bench(npz_path):
+    rss0 = rss_mb()
+    t0 = time.perf_counter()
+    model = NumpyCNN.load(npz_path)
+    t_load = time.perf_counter() - t0
+    x = np.random.default_rng(0).standard_normal((1,) + model.input_shape).astype(np.float32)
+    p50, p99 = _latency(model.predict, x)
+    print(f"[numpy] load {t_load * 1000:.1f} ms | RSS +{rss_mb() - rss0:.1f} MB (total {rss_mb():.1f} MB) "
+          f"| predict p50 {p50:.2f} ms p99 {p99:.2f} ms")
+    return model
+
+
+def _check(saved_model_dir, npz_path, n=32, tol=1e-4):
+    model = _bench(npz_path)
+    rss0 = rss_mb()
+    t0 = time.perf_counter()
+    import tensorflow as tf
+    t_import = time.perf_counter() - t0
+    keras = tf.keras.models.load_model(saved_model_dir)
+    t_load = time.perf_counter() - t0 - t_import
+    rng = np.random.default_rng(0)
+    # 실제 입력 범위(log-gammatone ≈ -14 ~ 0)에 가까운 난수
+    xs = (rng.standard_normal((n,) + model.input_shape) * 3.0 - 8.0).astype(np.float32)
+    ref = keras.predict(xs, verbose=0)
+    got = model.predict(xs)
+    err = float(np.abs(ref - got).max())
+    agree = float(np.mean(ref.argmax(-1) == got.argmax(-1)))
+    p50, p99 = _latency(lambda v: keras.predict(v, verbose=0), xs[:1], n=50)
+    print(f"[keras] import tf {t_import * 1000:.0f} ms, load {t_load * 1000:.0f} ms | RSS +{rss_mb() - rss0:.1f} MB "
+          f"| predict p50 {p50:.2f} ms p99 {p99:.2f} ms")
+    print(f"[parity] max|Δp| = {err:.2e} (tol {tol:.0e}), argmax 일치 {agree * 100:.1f}%")
+    return err <= tol
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("export", "check", "bench"):
+        print("usage: numpy_cnn.py export|check|bench ...")
+        print("  export <saved_model_dir> <out.npz>\n  check <saved_model_dir> <model.npz>\n  bench <model.npz>")
+        sys.exit(2)
+    cmd = sys.argv[1]
+    if cmd == "export":
+        print("[export]", export_npz(sys.argv[2], sys.argv[3]))
+    elif cmd == "check":
+        sys.exit(0 if _check(sys.argv[2], sys.argv[3]) else 1)
+    else:
+        _bench(sys.argv[2])
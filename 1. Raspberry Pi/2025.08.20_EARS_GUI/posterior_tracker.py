@@ -0,0 +1,95 @@
+# ========================== posterior_tracker.py ==========================
+# - PosteriorTracker: 세그먼트별 CNN 확률(posterior)을 시간축으로 누적해 이벤트를 확정
+#   · EMA 평활화  : 클래스별 지수이동평균으로 순간적인 튐(spike) 완화
+#   · N-of-M 확정 : 최근 M개 윈도우 중 N개 이상에서 EMA가 on_thr을 넘으면 확정(원시 확률이 아니라 평활값 기준
+#                   → 고립된 튐은 hit가 되지 않음, 대신 정상 시작은 약 1 hop 늦게 확정). 보고 confidence ≥ on_thr
+#   · 히스테리시스: 확정 후에는 EMA가 off_thr 아래로 떨어질 때까지 재확정하지 않음
+#   · onset 시각  : 이번 구간에서 원시 확률이 처음 on_thr을 넘은 윈도우의 시작 시각
+#   · 같은 윈도우에 여러 클래스가 확정 조건을 만족하면 EMA가 가장 높은 하나만 보고/래치(나머지는 다음 윈도우에서)
+# - 링버퍼/상태는 모두 (M, C) / (C,) NumPy 배열로 미리 할당(루프 내 할당 최소화)
+
+import numpy as np
+
+
+class PosteriorTracker:
+    def __init__(self, class_names, targets=('Horn', 'Siren'),
+                 alpha=0.6, on_thr=0.8, off_thr=0.5, n_confirm=2, m_window=3):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha는 (0, 1] 범위여야 합니다")
+        if off_thr > on_thr:
+            raise ValueError("off_thr는 on_thr 이하여야 합니다")
+        if not 1 <= n_confirm <= m_window:
+            raise ValueError("1 <= n_confirm <= m_window 이어야 합니다")
+
+        self.class_names = list(class_names)
+        # 추적 대상 클래스 인덱스(예: Horn/Siren, 'None'은 제외)
+        self._idx = np.array([self.class_names.index(c) for c in targets], dtype=np.intp)
+        self.targets = [self.class_names[i] for i in self._idx]
+        self.alpha, self.on_thr, self.off_thr = alpha, on_thr, off_thr
+        self.n_confirm, self.m_window = n_confirm, m_window
+
+        k = len(self._idx)
+        self._ema = np.zeros(k, dtype=np.float32)
+        self._hits = np.zeros((m_window, k), dtype=bool)   # N-of-M 링버퍼(EMA ≥ on_thr)
+        self._raw = np.zeros((m_window, k), dtype=bool)    # 원시 확률 ≥ on_thr(onset 판단용)
+        self._pos = 0
+        self._active = np.zeros(k, dtype=bool)             # 확정(래치) 상태
+        self._onset = np.full(k, np.nan)                   # 연속 구간 시작 시각
+        self._primed = False
+
+    def reset(self):
+        # 오디오 끊김(카메라/STT 중 감지 정지) 뒤에는 이전 구간과 이어 붙이지 않음
+        self._ema.fill(0.0)
+        self._hits.fill(False)
+        self._raw.fill(False)
+        self._pos = 0
+        self._active.fill(False)
+        self._onset.fill(np.nan)
+        self._primed = False
+
+    @property
+    def smoothed(self):
+        return dict(zip(self.targets, self._ema.tolist()))
+
+    def update(self, pred, t_start):
+        """
+        pred   : 모델 출력 확률 벡터(class_names 순서)
+        t_start: 해당 윈도우 첫 샘플의 시각(time.time() 기준)
+        반환   : 새로 확정된 이벤트가 있으면 (class, confidence, onset_ts), 없으면 None
+        """
+        p = np.asarray(pred, dtype=np.float32)[self._idx]
+
+        # EMA: 첫 윈도우는 그대로 시드(초기 0에서 끌어올리느라 늦어지지 않게)
+        if self._primed:
+            self._ema += self.alpha * (p - self._ema)
+        else:
+            self._ema[:] = p
+            self._primed = True
+
+        raw = p >= self.on_thr
+        self._hits[self._pos] = self._ema >= self.on_thr
+        self._raw[self._pos] = raw
+        self._pos = (self._pos + 1) % self.m_window
+
+        # onset: 원시 hit가 새로 시작된 클래스만 시각 기록, M개 윈도우 동안 아무 hit도 없으면 해제
+        start = raw & np.isnan(self._onset)
+        self._onset[start] = t_start
+        counts = self._hits.sum(axis=0)
+        quiet = (counts == 0) & ~self._raw.any(axis=0)
+        self._onset[quiet & ~self._active] = np.nan
+
+        # 히스테리시스 해제: EMA가 off_thr 아래 + 최근 hit 없음
+        release = self._active & (self._ema < self.off_thr) & (counts == 0)
+        if release.any():
+            self._active[release] = False
+            self._onset[release] = np.nan
+
+        confirm = ~self._active & (counts >= self.n_confirm)
+        if not confirm.any():
+            return None
+
+        # 동시에 여러 클래스가 확정되면 EMA가 가장 높은 것 하나만 보고/래치
+        cand = np.flatnonzero(confirm)
+        j = int(cand[np.argmax(self._ema[cand])])
+        self._active[j] = True
+        return self.targets[j], float(self._ema[j]), float(self._onset[j])
@@ -0,0 +1,420 @@
+# ========================== serial_sim.py ==========================
+# - 하드웨어 없이 경보 전송 경로(/dev/ttyACM0 Arduino, /dev/ttyAMA0 HC-06, 9600 baud)를 재현하는 pty 에뮬레이터
+#   · _UartPty     : pty 쌍(slave 경로를 pyserial로 열면 실제 포트와 동일), 9600 8N1 바이트 단위 전송 시간(10 bit/byte),
+#                    MCU RX 버퍼 64B(가득 차면 바이트 유실 → rx_overflow), TX 버퍼 64B(가득 차면 println이 블록)
+#   · ArduinoSim   : EARS_serial_raspberry.ino 동작 재현
+#                    setup: 리셋 후 boot초 대기 → "ping" 수신 시 "pong" / loop: checkSerialInput(readStringUntil '\n',
+#                    1초 타임아웃, trim, CLASS,ANGLE 분리, toInt) → [RECEIVED]/[STATE]/[BLOCKED]/[WARNING] 출력,
+#                    7초 eventLock → [UNLOCKED]/[AUTO], INIT 패턴(1초 간격 색 표시 후 4.5초 동안 매 loop 출력)
+#   · Hc06Sim      : 투명 UART→BT 브리지(응답 없음), 줄 수신 완료 + bt_latency 후 "전달"로 기록
+#   · 줄마다 {line, t_wire(마지막 바이트가 선로를 다 지난 시각), t_proc/t_delivered} 기록(time.time 기준)
+#     ArduinoSim은 응답 줄([RECEIVED]/[STATE]/[BLOCKED])이 호스트 쪽 선로를 다 지난 시각 t_echo/t_state도 기록
+# - CLI
+#   python serial_sim.py serve [--arduino-link /tmp/ttyACM0] [--bt-link /tmp/ttyAMA0] [--boot 2.0]
+#       → EARS_ARDUINO_PORT=/tmp/ttyACM0 EARS_BT_PORT=/tmp/ttyAMA0 로 GUI/데몬을 실행해 실제 경로 그대로 시험
+#   python serial_sim.py bench [--n 100] [--burst 5] [--gap 0.02] [--interval 0.5] [--hold 0] [--during-init] [--bt-latency 0.02]
+#       → EARS_ARDUINO_PORT/EARS_BT_PORT를 에뮬레이터로 지정하고 데몬의 실제 구성을 그대로 사용
+#         (_open_serial: 리셋 대기 + 핸드셰이크, _build_bus: arduino/bt sink, _drain_loop: RX 드레인, alert_hold_sec)
+#         on_detection(래치 → EventBus → sink → pyserial)에 합성 감지를 burst로 주입
+#         감지→선로 완료(det→wire), 감지→에코([RECEIVED]), 감지→상태([STATE]/[BLOCKED]) 송출, BT 전달 지연 p50/p95/max
+#         + 버스 drop, RX 유실, BLOCKED 수, 데몬 드레인 바이트/호스트 RX 잔량(드레인이 없으면 잔량이 쌓임)
+
+import os, select, sys, threading, time, tty
+from collections import deque
+
+BAUD = 9600
+RX_BUF = 64            # HardwareSerial RX 링버퍼
+TX_BUF = 64            # HardwareSerial TX 링버퍼
+EVENT_DURATION = 7.0   # 스케치 eventLock
+READ_TIMEOUT = 1.0     # Stream.setTimeout 기본값(readStringUntil)
+
+
+class _UartPty:
+    def __init__(self, name, baud=BAUD, link=None):
+        self.name = name
+        self.byte_sec = 10.0 / baud                  # start + 8 data + stop
+        self.master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.path = os.ttyname(self._slave)
+        self.link = link
+        if link:
+            if os.path.lexists(link):
+                os.remove(link)
+            os.symlink(self.path, link)
+        self._wire = deque()                         # (선로 통과 시각, byte) — 호스트 → 장치
+        self._wire_t = 0.0
+        self._rx = bytearray()
+        self._rx_last_t = 0.0                        # RX에 마지막으로 들어온 바이트의 선로 통과 시각
+        self._rx_nl = deque()                        # RX 안의 '\n'별 선로 통과 시각
+        self._tx = deque()                           # (선로 통과 시각, bytes) — 장치 → 호스트
+        self._tx_t = 0.0
+        self.rx_overflow = 0
+        self.lines = []                              # 처리 기록(dict)
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"sim-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(1.0)
+        for fd in (self.master, self._slave):
+            try: os.close(fd)
+            except OSError: pass
+        if self.link and os.path.islink(self.link):
+            os.remove(self.link)
+
+    def records(self):
+        with self._lock:
+            return list(self.lines)
+
+    def _record(self, **rec):
+        with self._lock:
+            self.lines.append(rec)
+
+    # ---------- 선로 ----------
+    def _pump(self, now):
+        r, _, _ = select.select([self.master], [], [], 0)
+        if r:
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                data = b""
+            for b in data:
+                self._wire_t = max(self._wire_t, now) + self.byte_sec
+                self._wire.append((self._wire_t, b))
+        while self._wire and self._wire[0][0] <= now:
+            t, b = self._wire.popleft()
+            if len(self._rx) >= RX_BUF:
+                self.rx_overflow += 1
+            else:
+                self._rx.append(b)
+                self._rx_last_t = t
+                if b == 10:
+                    self._rx_nl.append(t)
+        while self._tx and self._tx[0][0] <= now:
+            _, data = self._tx.popleft()
+            try:
+                os.write(self.master, data)
+            except OSError:
+                pass
+
+    def _next_due(self, now):
+        ts = [self._wire[0][0]] if self._wire else []
+        if self._tx: ts.append(self._tx[0][0])
+        return min(ts) - now if ts else 0.005
+
+    def println(self, s, vt):
+        # TX 버퍼에 못 들어가는 만큼 블록 → 호출 후의 가상 시각 반환
+        data = (s + "\r\n").encode("utf-8")
+        pending = max(0.0, self._tx_t - vt) / self.byte_sec
+        block = max(0.0, pending + len(data) - TX_BUF) * self.byte_sec
+        self._tx_t = max(self._tx_t, vt) + len(data) * self.byte_sec
+        self._tx.append((self._tx_t, data))
+        return vt + block
+
+    def _run(self):
+        busy_until = 0.0
+        while self._running:
+            now = time.time()
+            self._pump(now)
+            if now >= busy_until:
+                busy_until = self._step(now)
+            timeout = min(max(self._next_due(now), 0.0), 0.005)
+            if busy_until > now:
+                timeout = min(timeout, busy_until - now)
+            select.select([self.master], [], [], timeout)
+
+    def _step(self, now):
+        return now
+
+
+class ArduinoSim(_UartPty):
+    def __init__(self, baud=BAUD, link=None, boot=2.0):
+        super().__init__("arduino", baud, link)
+        self.boot_end = time.time() + boot           # setup(): while(!Serial) + delay(2000)
+        self.ready = False
+        self.event_lock = False
+        self.event_start = 0.0
+        self.init_mode = False
+        self.init_done = threading.Event()
+        self._init_phase, self._init_phase_t = 0, 0.0
+        self.current = ("NONE", -1)
+        self.blocked = 0
+
+    def _read_line(self, now):
+        # readStringUntil('\n'): '\n'까지(미포함), 마지막 바이트 후 1초가 지나면 타임아웃으로 있는 만큼
+        # → (문자열, 줄 끝이 선로를 지난 시각) / 아직 대기 중이면 (None, None)
+        i = self._rx.find(b"\n")
+        if i >= 0:
+            raw = bytes(self._rx[:i]); del self._rx[:i + 1]
+            return raw.decode("utf-8", "ignore"), self._rx_nl.popleft()
+        if now - self._rx_last_t >= READ_TIMEOUT:
+            raw = bytes(self._rx); self._rx.clear()
+            return raw.decode("utf-8", "ignore"), now
+        return None, None
+
+    def _step(self, now):
+        vt = now
+        if not self.ready:
+            if now < self.boot_end or not self._rx:
+                return now
+            line, _ = self._read_line(now)
+            if line == "ping":                        # 스케치는 trim 없이 비교
+                self.ready = True
+                vt = self.println("pong", vt)
+            return vt
+        # loop()
+        if self.event_lock and now - self.event_start >= EVENT_DURATION:
+            self.event_lock = False
+            vt = self.println("[UNLOCKED] 7초 이벤트 종료 → 다음 입력 수락 가능", vt)
+            vt = self.println("[AUTO] 7초 경과로 자동 종료", vt)
+            self.current = ("NONE", -1)
+        if self._rx:                                  # Serial.available() > 0
+            line, t_wire = self._read_line(now)
+            if line is None:
+                return vt                             # readStringUntil 안에서 대기(loop 정지)
+            vt = self._check_serial_input(line, t_wire, now, vt)
+        if self.init_mode:
+            vt = self._init_pattern(now, vt)
+        return vt
+
+    def _check_serial_input(self, line, t_wire, now, vt):
+        s = line.strip()
+        vt = self.println("[RECEIVED] 시리얼 입력: " + s, vt)
+        t_echo = self._tx_t                           # [RECEIVED] 마지막 바이트가 호스트 선로를 지나는 시각
+        cls, ang = s, "-1"
+        if "," in s:
+            cls, ang = s.split(",", 1)
+        cls, ang = cls.strip(), _to_int(ang.strip())
+        state = ""
+        if cls == "INIT":
+            if not self.init_mode:
+                self.init_mode = True
+                self._init_phase, self._init_phase_t = 0, now
+                self.init_done.clear()
+                state = "[STATE] INIT → 초기 패턴 시작"
+        elif self.event_lock:
+            state = "[BLOCKED] 7초 내 입력 무시됨"
+            self.blocked += 1
+        elif cls == "NONE":
+            self.current = ("NONE", -1)
+            state = "[STATE] NONE → 모든 동작 정지"
+        elif cls in ("SIREN", "HORN"):
+            self.event_lock = True
+            self.event_start = now
+            self.current = (cls, ang)
+            state = f"[STATE] {cls} → 시각/방향 동작 시작 @ {ang}도"
+        else:
+            state = "[WARNING] 유효하지 않은 문자열 수신: " + s
+        if state:
+            vt = self.println(state, vt)
+        self._record(line=s, t_wire=t_wire, t_proc=now, state=state.split(" ")[0],
+                     t_echo=t_echo, t_state=self._tx_t if state else None)
+        return vt
+
+    def _init_pattern(self, now, vt):
+        ph, dt = self._init_phase, now - self._init_phase_t
+        if ph < 3:
+            if dt > 1.0:
+                vt = self.println(("[INIT] 빨강 표시", "[INIT] 파랑 표시", "[INIT] 초록 표시")[ph], vt)
+                self._init_phase, self._init_phase_t = ph + 1, now
+            return vt
+        # 4.5초 동안 매 loop마다 출력 → TX 버퍼가 차서 loop 속도가 9600bps로 묶임
+        green = int(dt / 0.5) % 2 == 0
+        vt = self.println("[INIT] 깜빡임 초록 ON" if green else "[INIT] 깜빡임 초록 OFF", vt)
+        if dt > 4.5:
+            self.init_mode = False
+            vt = self.println("[INIT] 완료 및 종료", vt)
+            self.init_done.set()
+        return vt
+
+
+class Hc06Sim(_UartPty):
+    def __init__(self, baud=BAUD, link=None, bt_latency=0.02):
+        super().__init__("hc06", baud, link)
+        self.bt_latency = bt_latency
+
+    def _step(self, now):
+        while True:
+            i = self._rx.find(b"\n")
+            if i < 0:
+                return now
+            t_wire = self._rx_nl.popleft()
+            raw = bytes(self._rx[:i]); del self._rx[:i + 1]
+            self._record(line=raw.decode("utf-8", "ignore").strip(), t_wire=t_wire,
+                         t_delivered=t_wire + self.bt_latency)
+
+
+def _to_int(s):
+    # Arduino String.toInt(): 앞쪽 부호+숫자만, 없으면 0
+    i = 1 if s[:1] in ("+", "-") else 0
+    j = i
+    while j < len(s) and s[j].isdigit():
+        j += 1
+    return int(s[:j]) if j > i else 0
+
+
+# ===================== 벤치마크 =====================
+def _q(vals):
+    if not vals:
+        return "-"
+    v = sorted(vals)
+    return (f"p50 {v[len(v) // 2] * 1000:6.1f}  p95 {v[min(len(v) - 1, int(len(v) * 0.95))] * 1000:6.1f}  "
+            f"max {v[-1] * 1000:6.1f} ms  (n={len(v)})")
+
+
+class _BenchDetector:
+    # on_detection이 래치 해제 시 호출하는 reset_buffer만 필요
+    def reset_buffer(self):
+        pass
+
+
+async def _bench(n, burst, gap, interval, hold, during_init, bt_latency):
+    import asyncio
+    n = min(n, 360)   # 각도(i % 360)로 감지와 선로 기록을 대응
+    ard = ArduinoSim(boot=0.2).start()
+    bt = Hc06Sim(bt_latency=bt_latency).start()
+    # 데몬은 config.py의 포트를 쓰므로 임포트 전에 에뮬레이터 경로로 지정(serve 모드와 같은 방식)
+    os.environ["EARS_ARDUINO_PORT"], os.environ["EARS_BT_PORT"] = ard.path, bt.path
+    import ears_daemon as ed
+    from metrics import METRICS
+    if (ed.ARDUINO_PORT, ed.BT_PORT) != (ard.path, bt.path):
+        print("[bench] config가 이미 다른 포트로 임포트됨 → 새 프로세스에서 실행하세요")
+        ard.stop(); bt.stop(); return 1
+
+    loop = asyncio.get_running_loop()
+    d = ed.EarsDaemon(socket_path=None, bench=True, alert_hold_sec=hold)
+    d._loop, d._stop = loop, asyncio.Event()
+    d.det = _BenchDetector()
+    await loop.run_in_executor(None, d._open_serial)       # 리셋 대기(2초) + 핸드셰이크
+    if not ard.ready or d.bt is None:
+        print("[bench] 포트 열기/핸드셰이크 실패"); ard.stop(); bt.stop(); return 1
+    d._rx_task = asyncio.create_task(d._drain_loop())       # 데몬 run()과 같은 RX 드레인
+    if not during_init:
+        print("[bench] INIT 패턴 종료 대기(~7.5s, --during-init이면 생략)")
+        await loop.run_in_executor(None, ard.init_done.wait, 15.0)
+        await asyncio.sleep(0.3)
+    d._build_bus(log=False, socket=False)
+    drained0 = METRICS.snapshot()[1].get("serial_rx_drained_bytes", 0)
+
+    sent = {}          # 각도 → (감지 시각, Arduino 줄, BT 줄) — 래치를 통과해 sink로 발행된 것만
+    latched = 0
+    t_begin = time.time()
+    i = 0
+    while i < n:
+        for _ in range(burst):
+            if i >= n: break
+            now = time.time()
+            cls, ang = ("Siren", "Horn")[i % 2], i % 360
+            hold_before = d._hold_until
+            d.on_detection(cls, 0.95, ang, now - 0.3, now, i)
+            if d._hold_until != hold_before:
+                a_line, b_line = (p.decode().strip() for p in ed.build_payloads(cls, ang))
+                sent[ang] = (now, a_line, b_line)
+            else:
+                latched += 1
+            i += 1
+            if gap: await asyncio.sleep(gap)
+        await asyncio.sleep(interval)
+    # 9600bps로 남은 줄이 다 빠질 때까지 대기
+    deadline = time.time() + 10.0
+    while time.time() < deadline:
+        await asyncio.sleep(0.2)
+        if len(ard.records()) >= len(sent) and len(bt.records()) >= len(sent):
+            break
+    await asyncio.sleep(0.5)
+    stats = d.bus.stats()
+    d.bus.stop()
+    drained = METRICS.snapshot()[1].get("serial_rx_drained_bytes", 0) - drained0
+    with d._locks["arduino"]:
+        residual = d.arduino.in_waiting
+    d._stop.set()
+    d._rx_task.cancel()
+
+    def match(line, k):
+        # 줄 끝의 "CLASS,ANGLE"로 감지를 찾음(RX 유실로 깨진 줄은 제외)
+        for v in sent.values():
+            if line.endswith(v[k]) and (line == v[k] or line[-len(v[k]) - 1] == " "):
+                return v[0]
+        return None
+
+    w_ard, echo, state, w_bt, dl_bt = [], [], [], [], []
+    for r in ard.records():
+        t0 = match(r["line"], 1)
+        if t0 is None: continue
+        w_ard.append(r["t_wire"] - t0); echo.append(r["t_echo"] - t0)
+        if r["t_state"] is not None: state.append(r["t_state"] - t0)
+    for r in bt.records():
+        t0 = match(r["line"], 2)
+        if t0 is not None:
+            w_bt.append(r["t_wire"] - t0); dl_bt.append(r["t_delivered"] - t0)
+    print(f"[bench] detections {i} → 발행 {len(sent)}, 래치 {latched} (burst {burst}, gap {gap * 1000:.0f} ms, "
+          f"interval {interval} s, hold {hold} s) {time.time() - t_begin:.1f} s, "
+          f"{'INIT 패턴 중' if during_init else 'INIT 이후'}")
+    a_st, b_st = stats.get("arduino", {}), stats.get("bt", {})
+    print(f"  arduino: on-wire {len(w_ard)}/{len(sent)}, bus drop {a_st.get('dropped', 0)}, "
+          f"RX 유실 {ard.rx_overflow} B, BLOCKED {ard.blocked}")
+    print(f"    det→wire   {_q(w_ard)}")
+    print(f"    det→echo   {_q(echo)}")
+    print(f"    det→state  {_q(state)}")
+    print(f"    host RX    데몬 드레인 {drained} B, 잔량 {residual} B")
+    print(f"  bt     : on-wire {len(w_bt)}/{len(sent)}, bus drop {b_st.get('dropped', 0)}, "
+          f"RX 유실 {bt.rx_overflow} B (bt_latency {bt_latency * 1000:.0f} ms)")
+    print(f"    det→wire   {_q(w_bt)}")
+    print(f"    det→phone  {_q(dl_bt)}")
+    for port in (d.arduino, d.bt):
+        port.close()
+    ard.stop(); bt.stop()
+    return 0 if w_ard and w_bt and residual < 256 else 1
+
+
+def _serve(arduino_link, bt_link, boot):
+    ard = ArduinoSim(link=arduino_link, boot=boot).start()
+    bt = Hc06Sim(link=bt_link).start()
+    print(f"[sim] Arduino {ard.path} → {arduino_link}, HC-06 {bt.path} → {bt_link} (Ctrl+C 종료)")
+    seen = [0, 0]
+    try:
+        while True:
+            time.sleep(0.2)
+            for k, dev in enumerate((ard, bt)):
+                recs = dev.records()
+                for r in recs[seen[k]:]:
+                    tail = r.get("state") or f"전달 +{dev.bt_latency * 1000:.0f}ms"
+                    print(f"[sim:{dev.name}] {r['line']!r} → {tail}")
+                seen[k] = len(recs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ard.stop(); bt.stop()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    opts = {}
+    for k in ("--arduino-link", "--bt-link", "--boot", "--n", "--burst", "--gap", "--interval", "--hold",
+              "--bt-latency"):
+        if k in args:
+            i = args.index(k); opts[k] = args[i + 1]; del args[i:i + 2]
+    during_init = "--during-init" in args
+    if during_init: args.remove("--during-init")
+    if args == ["serve"]:
+        _serve(opts.get("--arduino-link", "/tmp/ttyACM0"), opts.get("--bt-link", "/tmp/ttyAMA0"),
+               float(opts.get("--boot", 2.0)))
+    elif args == ["bench"]:
+        import asyncio
+        sys.exit(asyncio.run(_bench(int(opts.get("--n", 100)), int(opts.get("--burst", 5)),
+                                    float(opts.get("--gap", 0.02)), float(opts.get("--interval", 0.5)),
+                                    float(opts.get("--hold", 0)), during_init,
+                                    float(opts.get("--bt-latency", 0.02)))))
+    else:
+        print("usage: serial_sim.py serve [--arduino-link /tmp/ttyACM0] [--bt-link /tmp/ttyAMA0] [--boot 2.0]\n"
+              "       serial_sim.py bench [--n 100] [--burst 5] [--gap 0.02] [--interval 0.5] [--hold 0] "
+              "[--during-init] [--bt-latency 0.02]")
+        sys.exit(2)
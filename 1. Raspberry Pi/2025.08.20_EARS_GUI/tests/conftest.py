@@ -0,0 +1,4 @@
+# 모듈들이 EARS_GUI 폴더에서 평면 임포트(from metrics import ...)되므로 상위 폴더를 경로에 추가
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
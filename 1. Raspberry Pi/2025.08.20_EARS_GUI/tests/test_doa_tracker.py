@@ -0,0 +1,66 @@
+from doa_tracker import BearingTracker, _wrap
+
+HOP = 0.3
+
+
+def _feed(tr, doas, t0=0.0, weight=1.0):
+    for i, d in enumerate(doas):
+        tr.update(d, t0 + i * HOP, weight)
+    return tr.estimate()
+
+
+def test_wraps_across_zero():
+    # 355/5 교대 측정 → 평균은 180이 아니라 0 근처
+    b = _feed(BearingTracker(), [355, 5, 358, 2, 356, 4, 359, 1])
+    assert abs(_wrap(b.angle)) <= 3
+
+    # 350 → 10으로 경계를 넘어 움직이는 음원도 게이트에 걸리지 않고 따라감
+    tr = BearingTracker()
+    b = _feed(tr, [(350 + 2.5 * i) % 360 for i in range(9)])
+    assert tr.rejected == 0
+    assert abs(_wrap(b.angle - 10)) <= 5 and b.rate > 0
+
+
+def test_gate_rejects_outlier_then_reinitialises():
+    tr = BearingTracker(max_outliers=3)
+    _feed(tr, [90] * 6)
+    tr.update(270, 6 * HOP)                  # 반사/순간 튐 1회 → 버림
+    assert tr.rejected == 1 and abs(_wrap(tr.estimate().angle - 90)) <= 1
+    tr.update(270, 7 * HOP)
+    tr.update(270, 8 * HOP)                  # 연속 3회 → 새 음원으로 재초기화
+    b = tr.estimate()
+    assert tr.rejected == 3 and b.angle == 270 and b.rate == 0.0
+
+
+def test_measurement_noise_scales_with_posterior():
+    strong, weak, skip = BearingTracker(), BearingTracker(), BearingTracker()
+    for tr in (strong, weak, skip):
+        _feed(tr, [0, 0, 0])
+    strong.update(30, 3 * HOP, weight=1.0)
+    weak.update(30, 3 * HOP, weight=0.2)
+    skip.update(30, 3 * HOP, weight=0.01)    # min_weight 미만 → 예측만
+    pull = [_wrap(tr.theta) for tr in (strong, weak, skip)]
+    assert pull[0] > pull[1] > 0.0
+    assert abs(pull[2]) < 1e-9 and skip.updates == 3
+    assert skip.estimate().sigma > strong.estimate().sigma
+
+
+def test_confidence_grows_with_consistent_measurements():
+    tr = BearingTracker()
+    confs = []
+    for i in range(8):
+        tr.update(120, i * HOP)
+        confs.append(tr.estimate().conf)
+    assert all(b > a for a, b in zip(confs, confs[1:]))
+    assert confs[0] < 0.3 and confs[-1] > 0.8
+
+    # 같은 개수라도 대상 확률이 낮으면 신뢰도도 낮음
+    low = _feed(BearingTracker(), [120] * 8, weight=0.3)
+    assert low.conf < confs[-1]
+
+
+def test_stale_track_restarts():
+    tr = BearingTracker(stale_sec=2.0)
+    _feed(tr, [45] * 5)
+    tr.update(200, 5 * HOP + 3.0)            # 측정 공백 > stale_sec → 게이트 없이 새로 시작
+    assert tr.estimate().angle == 200 and tr.rejected == 0
@@ -0,0 +1,72 @@
+import os
+
+from governor import LEVELS, Governor, SysfsProbe, THROTTLED_PATH
+
+
+def _write(root, rel, value):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(f"{value}\n")
+
+
+def _sysfs(root, temp_c=50.0, cur=600000, cap=1500000, mx=1500000, throttled=None, cores=4):
+    _write(root, "sys/class/thermal/thermal_zone0/temp", int(temp_c * 1000))
+    for c in range(cores):
+        d = f"sys/devices/system/cpu/cpu{c}/cpufreq"
+        _write(root, f"{d}/scaling_cur_freq", cur)
+        _write(root, f"{d}/scaling_max_freq", cap)
+        _write(root, f"{d}/cpuinfo_max_freq", mx)
+    if throttled is not None:
+        _write(root, THROTTLED_PATH, throttled)
+
+
+def _governor(root, backlog=0.0):
+    applied = []
+    gov = Governor(SysfsProbe(str(root)), lambda: backlog, applied.append, cool_ticks=2)
+    return gov, applied
+
+
+def test_idle_cool_cpu_is_not_throttled(tmp_path):
+    # 유휴 ondemand로 현재 클럭이 낮아도(600/1500 MHz) 상한이 그대로면 단계를 올리지 않음
+    _sysfs(tmp_path, temp_c=50.0, cur=600000, throttled="0")
+    gov, applied = _governor(tmp_path)
+    for _ in range(5):
+        assert gov.tick(now=0.0) == 0
+    assert applied == [] and gov.events == []
+
+
+def test_frequency_cap_raises_then_recovers(tmp_path):
+    _sysfs(tmp_path, cap=1000000)
+    gov, applied = _governor(tmp_path)
+    assert gov.probe.freq_cap_ratio() == 1000000 / 1500000
+    assert gov.tick(now=0.0) == 1
+    assert applied[-1] == LEVELS[1]
+    _sysfs(tmp_path, cap=1500000)                 # thermal 상한 해제
+    levels = [gov.tick(now=float(t)) for t in range(1, 5)]
+    assert levels == [1, 0, 0, 0]                 # cool_ticks=2 연속 여유 후 한 단계 하강
+
+
+def test_firmware_throttle_bits(tmp_path):
+    _sysfs(tmp_path, throttled="50004")           # 과거 비트(16~)만이 아니라 현재 스로틀(비트 2)
+    gov, _ = _governor(tmp_path)
+    assert gov.probe.throttled() is True
+    assert gov.tick(now=0.0) == 1
+    _write(tmp_path, THROTTLED_PATH, "50000")    # 과거 발생 기록만 남음 → 현재는 정상
+    assert gov.probe.throttled() is False
+
+
+def test_hot_or_backlog_climbs_and_saturates(tmp_path):
+    _sysfs(tmp_path, temp_c=80.0)
+    gov, _ = _governor(tmp_path)
+    levels = [gov.tick(now=float(t)) for t in range(6)]
+    assert levels == [1, 2, 3, 3, 3, 3]
+    _sysfs(tmp_path / "b", temp_c=50.0)
+    gov, _ = _governor(tmp_path / "b", backlog=2.0)
+    assert gov.tick(now=0.0) == 1 and "backlog" in gov.events[-1][3]
+
+
+def test_missing_sysfs_is_neutral(tmp_path):
+    gov, _ = _governor(tmp_path)
+    assert gov.probe.temp_c() is None and gov.probe.freq_cap_ratio() is None and gov.probe.throttled() is None
+    assert gov.tick(now=0.0) == 0
@@ -0,0 +1,78 @@
+import json
+import numpy as np
+import pytest
+
+from numpy_cnn import NumpyCNN, export_model
+
+
+def _ref_forward(x, w1, b1, wd, bd):
+    # 직접 루프 conv(same, stride 1) → relu → 2x2 maxpool → dense → softmax
+    H, W, C = x.shape
+    kh, kw, _, cout = w1.shape
+    pad = np.pad(x, ((kh // 2, kh // 2), (kw // 2, kw // 2), (0, 0)))
+    y = np.empty((H, W, cout))
+    for i in range(H):
+        for j in range(W):
+            y[i, j] = np.tensordot(pad[i:i + kh, j:j + kw], w1, axes=3) + b1
+    y = np.maximum(y, 0)
+    y = y[:H // 2 * 2, :W // 2 * 2].reshape(H // 2, 2, W // 2, 2, cout).max(axis=(1, 3))
+    z = y.reshape(-1) @ wd + bd
+    z = np.exp(z - z.max())
+    return z / z.sum()
+
+
+def test_matches_reference_forward():
+    rng = np.random.default_rng(0)
+    spec = {"input_shape": [8, 6, 1], "layers": [
+        {"op": "conv", "k": [3, 3], "act": "relu"}, {"op": "pool2"}, {"op": "flatten"},
+        {"op": "dense", "act": "softmax"}]}
+    arrays = {"L0_w": rng.standard_normal((3, 3, 1, 4)).astype(np.float32),
+              "L0_b": rng.standard_normal(4).astype(np.float32),
+              "L3_w": rng.standard_normal((4 * 3 * 4, 3)).astype(np.float32),
+              "L3_b": rng.standard_normal(3).astype(np.float32)}
+    model = NumpyCNN(json.loads(json.dumps(spec)), arrays)
+    xs = rng.standard_normal((4, 8, 6, 1)).astype(np.float32)
+    got = model.predict(xs)
+    ref = np.stack([_ref_forward(x, arrays["L0_w"], arrays["L0_b"], arrays["L3_w"], arrays["L3_b"]) for x in xs])
+    assert got.shape == (4, 3)
+    np.testing.assert_allclose(got, ref, atol=1e-5)
+
+
+def _keras_model(tf, conv_act="linear", bn=True, pool_padding="valid"):
+    L = tf.keras.layers
+    layers = [tf.keras.Input((16, 12, 1)), L.Conv2D(4, 3, padding="same", activation=conv_act)]
+    if bn:
+        layers.append(L.BatchNormalization())
+    if conv_act == "linear":
+        layers.append(L.Activation("relu"))
+    layers += [L.MaxPooling2D(2, padding=pool_padding), L.Flatten(), L.Dense(3, activation="softmax")]
+    model = tf.keras.Sequential(layers)
+    if bn:
+        # 기본값(평균 0, 분산 1)이면 접기 오류가 드러나지 않으므로 통계를 임의로 설정
+        bnl = next(l for l in model.layers if l.__class__.__name__ == "BatchNormalization")
+        rng = np.random.default_rng(1)
+        bnl.set_weights([rng.uniform(0.5, 1.5, 4), rng.normal(0, 0.5, 4), rng.normal(0, 0.5, 4),
+                         rng.uniform(0.5, 2.0, 4)])
+    return model
+
+
+def test_keras_parity(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    tf.keras.utils.set_random_seed(0)
+    keras = _keras_model(tf)
+    path = export_model(keras, str(tmp_path / "m.npz"))
+    model = NumpyCNN.load(path)
+    xs = (np.random.default_rng(0).standard_normal((8, 16, 12, 1)) * 3.0 - 8.0).astype(np.float32)
+    np.testing.assert_allclose(model.predict(xs), keras.predict(xs, verbose=0), atol=1e-4)
+
+
+def test_rejects_bn_after_activation(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    with pytest.raises(ValueError):
+        export_model(_keras_model(tf, conv_act="relu"), str(tmp_path / "m.npz"))
+
+
+def test_rejects_same_padding_pool(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    with pytest.raises(ValueError):
+        export_model(_keras_model(tf, pool_padding="same"), str(tmp_path / "m.npz"))
@@ -0,0 +1,58 @@
+import math
+
+from posterior_tracker import PosteriorTracker
+
+CLASSES = ['Horn', 'None', 'Siren']
+
+
+def _p(horn=0.0, siren=0.0):
+    return [horn, max(0.0, 1.0 - horn - siren), siren]
+
+
+def _run(tr, seq, hop=0.25):
+    out = []
+    for i, (horn, siren) in enumerate(seq):
+        out.append(tr.update(_p(horn, siren), i * hop))
+    return out
+
+
+def test_isolated_spikes_do_not_confirm():
+    # 0.81 튐 두 번 사이에 0.1로 떨어지면 EMA가 on_thr 아래라 확정되지 않아야 함
+    tr = PosteriorTracker(CLASSES)
+    assert _run(tr, [(0.0, 0.81), (0.0, 0.1), (0.0, 0.81)]) == [None, None, None]
+
+
+def test_n_of_m_confirms_on_smoothed_hits():
+    tr = PosteriorTracker(CLASSES)
+    out = _run(tr, [(0.0, 0.05), (0.0, 0.95), (0.0, 0.95), (0.0, 0.95)])
+    # EMA: 0.05 → 0.59 → 0.806(hit) → 0.892(hit) → 2-of-3 확정
+    assert out[:3] == [None, None, None]
+    cls, conf, onset = out[3]
+    assert cls == 'Siren' and conf >= tr.on_thr
+    assert onset == 0.25        # 원시 확률이 처음 넘은 윈도우
+
+
+def test_hysteresis_blocks_reconfirm_until_release():
+    tr = PosteriorTracker(CLASSES)
+    out = _run(tr, [(0.0, 0.9)] * 3 + [(0.0, 0.6)] * 3 + [(0.0, 0.9)] * 3)
+    assert [o[0] for o in out if o] == ['Siren']      # 0.6 구간은 off_thr 위 → 래치 유지
+
+    tr.reset()
+    out = _run(tr, [(0.0, 0.9)] * 3 + [(0.0, 0.0)] * 4 + [(0.0, 0.9)] * 5)
+    hits = [o for o in out if o]
+    assert [o[0] for o in hits] == ['Siren', 'Siren']
+    assert hits[1][2] == 7 * 0.25      # 해제 후 onset은 두 번째 구간 시작으로 새로 기록
+
+
+def test_onset_cleared_after_quiet_window():
+    tr = PosteriorTracker(CLASSES)
+    _run(tr, [(0.0, 0.0), (0.0, 0.81)] + [(0.0, 0.0)] * 3)
+    assert all(math.isnan(v) for v in tr._onset)
+
+
+def test_simultaneous_classes_latch_only_reported_one():
+    tr = PosteriorTracker(CLASSES)
+    out = _run(tr, [(0.85, 0.9)] * 3)
+    assert out[0] is None
+    assert out[1][0] == 'Siren'
+    assert out[2][0] == 'Horn'       # 같이 넘은 Horn도 다음 윈도우에서 보고
@@ -0,0 +1,111 @@
+# ========================== tracing.py ==========================
+# - Tracer: 스레드/프로세스를 가로지르는 구간(span) 기록 → Chrome trace JSON(Perfetto에서 열림)
+#   · 세그먼트마다 correlation id(cid)를 붙여 워커 → 시그널 → GUI → sink/카메라까지 한 줄로 추적
+#   · 기록은 미리 할당한 고정 크기 링(리스트)에 슬롯 단위로 덮어씀 (락 없음: itertools.count는 GIL 하에서 원자적)
+#   · 비활성 상태에서는 enabled 플래그 확인 1회로 끝남(핫패스 비용 최소)
+# - dump(path): 링 내용을 Chrome trace 포맷으로 저장 (숨김 버튼 길게 누르기 / SIGUSR1)
+
+import itertools, json, os, threading, time
+
+_PID = os.getpid()
+
+
+class _Span:
+    __slots__ = ("tr", "name", "cid", "t0")
+
+    def __init__(self, tr, name, cid):
+        self.tr, self.name, self.cid = tr, name, cid
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tr.complete(self.name, self.t0, time.perf_counter(), self.cid)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    def __init__(self, capacity=1 << 15, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._ring = [None] * capacity
+        self._seq = itertools.count()
+        self._cid = itertools.count(1)
+        self._thread_names = {}
+        # perf_counter 기준점: 덤프 시 us 단위 상대 시각으로 변환
+        self._t_base = time.perf_counter()
+
+    def next_cid(self):
+        return next(self._cid)
+
+    def name_thread(self, name):
+        # QThread는 threading 모듈에 Dummy-N으로만 보이므로 트레이스용 이름을 직접 등록
+        self._thread_names[threading.get_ident()] = name
+
+    def _put(self, rec):
+        self._ring[next(self._seq) % self.capacity] = rec
+
+    # ---- 기록 ----
+    def span(self, name, cid=None):
+        return _Span(self, name, cid) if self.enabled else _NO_SPAN
+
+    def complete(self, name, t0, t1, cid=None):
+        # t0/t1: time.perf_counter() 값 (METRICS와 같은 타이밍을 재사용할 때)
+        if self.enabled:
+            self._put(("X", name, t0, t1 - t0, threading.get_ident(), cid))
+
+    def instant(self, name, cid=None):
+        if self.enabled:
+            self._put(("i", name, time.perf_counter(), 0.0, threading.get_ident(), cid))
+
+    def flow_start(self, name, cid):
+        # 시그널 hop 출발(다른 스레드의 flow_end와 cid로 연결)
+        if self.enabled and cid is not None:
+            self._put(("s", name, time.perf_counter(), 0.0, threading.get_ident(), cid))
+
+    def flow_end(self, name, cid):
+        if self.enabled and cid is not None:
+            self._put(("f", name, time.perf_counter(), 0.0, threading.get_ident(), cid))
+
+    # ---- 덤프 ----
+    def events(self):
+        recs = [r for r in list(self._ring) if r is not None]
+        recs.sort(key=lambda r: r[2])
+        names = {t.ident: t.name for t in threading.enumerate()}
+        names.update(self._thread_names)
+        out = [{"ph": "M", "name": "thread_name", "pid": _PID, "tid": tid, "args": {"name": n}}
+               for tid, n in names.items()]
+        for ph, name, ts, dur, tid, cid in recs:
+            ev = {"ph": ph, "name": name, "cat": "ears", "pid": _PID, "tid": tid,
+                  "ts": round((ts - self._t_base) * 1e6, 1)}
+            if ph == "X":
+                ev["dur"] = round(dur * 1e6, 1)
+            elif ph == "i":
+                ev["s"] = "t"
+            else:
+                ev["id"] = cid
+                if ph == "f": ev["bp"] = "e"
+            if cid is not None:
+                ev["args"] = {"cid": cid}
+            out.append(ev)
+        return out
+
+    def dump(self, path):
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+        return path
+
+
+TRACER = Tracer(enabled=os.environ.get("EARS_TRACE", "0") == "1")
@@ -0,0 +1,181 @@
+# ========================== video_ring.py ==========================
+# - MjpegRing     : 압축된 MJPEG 프레임(bytes) + 시각을 개수/바이트 한도 안에서 보관하는 링
+#                   디코드는 하지 않음 → 보관 비용은 USB 읽기 + memcpy 뿐
+# - PrerollCamera : 가능성 높은 방향의 카메라 1대를 계속 열어 두고 원본 MJPEG을 링에 채우는 스레드
+#                   (CAP_PROP_CONVERT_RGB=0 → cap.read()가 디코드 없이 JPEG 바이트를 반환)
+#                   링 메모리/스레드 CPU 사용률을 METRICS로 보고
+#                   읽기 실패 시 지수 백오프, 연속 실패가 이어지면 재열기 → 그래도 안 되면 종료
+#                   (종료 후에는 UI의 DeviceRegistry 핫플러그 콜백이 장치 재연결 시 start()로 다시 시작)
+#                   start/stop/switch는 서로 다른 스레드에서 불려도 순서대로 처리(_ctl 락)
+# - decode(buf)   : 화면에 실제로 보여줄 프레임만 지연 디코드
+# - save_clip_async(frames, path): 링 구간을 .mjpeg(JPEG 연속 스트림)로 백그라운드 저장(재인코딩 없음)
+
+import os, threading, time
+from collections import deque
+import numpy as np
+import cv2
+from metrics import METRICS
+
+
+class MjpegRing:
+    def __init__(self, seconds=4.0, fps=15, max_bytes=8 << 20):
+        self._buf = deque(maxlen=max(1, int(seconds * fps)))
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def push(self, ts, data):
+        with self._lock:
+            if len(self._buf) == self._buf.maxlen:
+                self.bytes -= len(self._buf[0][1])
+            self._buf.append((ts, data))
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes and len(self._buf) > 1:
+                self.bytes -= len(self._buf.popleft()[1])
+
+    def since(self, t0):
+        with self._lock:
+            return [f for f in self._buf if f[0] >= t0]
+
+    def latest(self):
+        with self._lock:
+            return self._buf[-1] if self._buf else None
+
+    def at_or_before(self, ts):
+        # ts 이전(포함) 가장 최근 프레임
+        with self._lock:
+            best = None
+            for f in self._buf:
+                if f[0] > ts:
+                    break
+                best = f
+            return best
+
+    def clear(self):
+        with self._lock:
+            self._buf.clear(); self.bytes = 0
+
+    def __len__(self):
+        return len(self._buf)
+
+
+def decode(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class PrerollCamera:
+    def __init__(self, device, seconds=4.0, store_fps=15, width=640, height=480, max_bytes=8 << 20,
+                 max_fail=8, max_reopen=3):
+        self.device = device
+        self.max_fail = max_fail         # 연속 읽기 실패 → 캡처 해제 후 재열기
+        self.max_reopen = max_reopen     # 재열기 후에도 계속 실패하면 스레드 종료(핫플러그 재연결 시 다시 start)
+        self.store_fps = store_fps
+        self.width, self.height = width, height
+        self.ring = MjpegRing(seconds, store_fps, max_bytes)
+        self._stop = threading.Event()
+        self._ctl = threading.RLock()    # start/stop/switch 직렬화(핫플러그·방향 전환 스레드가 겹칠 수 있음)
+        self._thread = None
+        self.cpu_pct = 0.0
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._ctl:
+            if self.is_running():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name=f"preroll-{os.path.basename(self.device)}",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=1.0):
+        with self._ctl:
+            self._stop.set()
+            if self._thread:
+                self._thread.join(timeout)
+            self.ring.clear()
+
+    def switch(self, device):
+        # 방향이 바뀌면 다른 카메라로 옮겨 열기(이전 링은 버림)
+        with self._ctl:
+            if device == self.device and self.is_running():
+                return
+            self.stop()
+            self.device = device
+            self.start()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.device, cv2.CAP_V4L2)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_FPS, 30)
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)   # 디코드 없이 원본 JPEG 바이트
+        return cap
+
+    def _loop(self):
+        cap = self._open()
+        if cap is None:
+            print(f"[PREROLL] 카메라 열기 실패: {self.device}")
+            return
+        try:
+            interval = 1.0 / self.store_fps
+            last = 0.0
+            fails = reopens = 0
+            w0, c0 = time.time(), time.thread_time()
+            while not self._stop.is_set():
+                ok, raw = cap.read()
+                if not ok or raw is None:
+                    # 분리/정지된 카메라는 read()가 즉시 실패 → 백오프(최대 1초)로 코어 점유 방지
+                    fails += 1
+                    METRICS.inc("preroll_read_fail")
+                    if fails >= self.max_fail:
+                        cap.release()
+                        if reopens >= self.max_reopen or self._stop.wait(1.0):
+                            print(f"[PREROLL] 읽기 연속 실패, 중지: {self.device}")
+                            return
+                        reopens += 1
+                        cap = self._open()
+                        if cap is None:
+                            print(f"[PREROLL] 카메라 재열기 실패: {self.device}")
+                            return
+                        fails = 0
+                    else:
+                        self._stop.wait(min(1.0, 0.02 * (1 << fails)))
+                    continue
+                fails = reopens = 0
+                now = time.time()
+                if now - last < interval:
+                    continue
+                last = now
+                self.ring.push(now, raw.tobytes())
+                if now - w0 >= 5.0:
+                    self.cpu_pct = (time.thread_time() - c0) / (now - w0) * 100.0
+                    METRICS.gauge("preroll_cpu_pct", round(self.cpu_pct, 2))
+                    METRICS.gauge("preroll_ring_bytes", self.ring.bytes)
+                    METRICS.gauge("preroll_ring_frames", len(self.ring))
+                    w0, c0 = now, time.thread_time()
+        finally:
+            if cap is not None:
+                cap.release()
+
+
+def save_clip_async(frames, path):
+    # frames: [(ts, jpeg_bytes)] → JPEG을 이어 붙인 .mjpeg (ffplay/VLC로 재생)
+    def _write():
+        try:
+            d = os.path.dirname(path)
+            if d: os.makedirs(d, exist_ok=True)
+            with open(path + ".part", "wb") as f:
+                for _, data in frames:
+                    f.write(data)
+            os.replace(path + ".part", path)
+        except Exception as e:
+            print("[PREROLL] 클립 저장 실패:", e)
+    t = threading.Thread(target=_write, name="clip-writer", daemon=True)
+    t.start()
+    return t